@@ -15,7 +15,7 @@ from alpha101_factory.data.loader import (fetch_spot, fetch_klines_from_spot,
                           check_klines_integrity, load_or_fetch_symbol)
 from alpha101_factory.data.universe import load_universe
 from alpha101_factory.factors.tmp_features import build_tmp_all
-from alpha101_factory.pipeline.compute_factor import compute_and_save
+from alpha101_factory.pipeline.compute_factor import compute_and_save_many
 from alpha101_factory.factors.registry import list_factors
 from alpha101_factory.config import ADJUST
 from alpha101_factory.viz.factor_summary import generate_all_factor_visuals
@@ -50,8 +50,7 @@ def cmd_factor(args):
     symbols = None
     if args.stock:
         symbols = [args.stock]
-    for n in names:
-        compute_and_save(n, symbols=symbols)
+    compute_and_save_many(names, symbols=symbols)
 
 
 def cmd_visualize(args):
@@ -77,6 +76,7 @@ def cmd_visualize(args):
         heatmap_top=args.heatmap_top,
         limit=args.limit if args.limit > 0 else None,
         save=not args.dry_run,
+        max_workers=args.workers or None,
     )
 
     if not result:
@@ -135,6 +135,7 @@ def main():
     p5.add_argument("--heatmap-top", type=int, default=12, help="auto-selected heatmap symbols upper bound")
     p5.add_argument("--limit", type=int, default=0, help="limit number of factors when --all")
     p5.add_argument("--dry-run", action="store_true", help="return figures without saving images")
+    p5.add_argument("--workers", type=int, default=0, help="render processes (0: auto, 1: sequential)")
     p5.set_defaults(func=cmd_visualize)
 
     args = ap.parse_args()
@@ -44,5 +44,16 @@ END_DATE   = os.getenv("ALPHA101_END", "20250917")     # "YYYYMMDD" 或空
 MAX_WORKERS = int(os.getenv("ALPHA101_MAX_WORKERS", "1"))
 REQUEST_PAUSE = float(os.getenv("ALPHA101_PAUSE", "0.6"))
 
+# 本地计算并发（因子批量计算等）：0=os.cpu_count()
+CPU_WORKERS = int(os.getenv("ALPHA101_CPU_WORKERS", "0")) or (os.cpu_count() or 1)
+# 本地 parquet 并发读取的线程数（I/O 密集，pyarrow 解码时释放 GIL）
+IO_WORKERS = int(os.getenv("ALPHA101_IO_WORKERS", "8"))
+# 安装了 polars 时用其读取单个 parquet 文件（Rust 解码，不经 pandas 元数据还原）；默认关闭
+PREFER_POLARS = os.getenv("ALPHA101_PREFER_POLARS", "0") == "1"
+# 控制台只输出 WARNING 及以上（文件日志不受影响）
+LOG_QUIET = os.getenv("ALPHA101_QUIET", "0") == "1"
+# 因子计算时同一份长表上时序算子结果的缓存上限（MB）
+PANEL_CACHE_MB = int(os.getenv("ALPHA101_PANEL_CACHE_MB", "1024"))
+
 # 体量控制：0=全量，>0 表示只抓 N 支用于调试
 LIMIT_STOCKS = int(os.getenv("ALPHA101_LIMIT", "0"))
@@ -1,12 +1,6 @@
 # -*- coding: utf-8 -*-
 """
-Import factor modules so their @register decorators run.
-If you add new files inside this package, either import them here
-or rely on registry.ensure_loaded() which will auto-discover too.
+Factor modules register themselves via @register when imported.
+They are discovered and imported on demand by registry.get_factor /
+registry.list_factors, so importing this package stays cheap.
 """
-# Explicit imports (safe & fast)
-from . import alphas_basic  # noqa: F401
-try:
-    from . import alphas_more  # noqa: F401
-except Exception:
-    pass
@@ -11,23 +11,24 @@ sys.path.append(str(Path(__file__).resolve().parents[2]))
 
 import numpy as np
 import pandas as pd
-from alpha101_factory.factors.base import Factor
+from alpha101_factory.factors.base import Factor, Panel, align_rows
 from alpha101_factory.factors.registry import register
 from alpha101_factory.utils import ops
 
 
-def _cs_rank(df: pd.DataFrame, s: pd.Series) -> pd.Series:
+def _cs_rank(df: pd.DataFrame, s) -> pd.Series:
     """
     计算截面排名。
     
     对给定的Series按时间截面进行排名计算，返回百分位排名。
+    同一日期的行在Panel上排成连续块，由`ops.cs_rank_grouped`一次算完所有截面。
     
     Args:
         df: 包含datetime和symbol列的DataFrame
-        s: 需要计算排名的Series
+        s: 列名（结果在Panel上缓存，多个因子共用），需要计算排名的Series（按索引与df对齐）或与df等长的数组
         
     Returns:
-        按时间截面排名的Series，值为0-1之间的百分位排名
+        按时间截面排名的Series（索引与df一致），值为0-1之间的百分位排名
         
     Raises:
         KeyError: 当DataFrame中缺少必要的datetime或symbol列时
@@ -36,18 +37,20 @@ def _cs_rank(df: pd.DataFrame, s: pd.Series) -> pd.Series:
     try:
         if not isinstance(df, pd.DataFrame):
             raise ValueError("df必须是pandas DataFrame")
-        if not isinstance(s, pd.Series):
-            raise ValueError("s必须是pandas Series")
+        if not isinstance(s, (str, pd.Series, np.ndarray)):
+            raise ValueError("s必须是列名、pandas Series或numpy数组")
             
         # 检查必要的列是否存在
         required_cols = ["datetime", "symbol"]
         missing_cols = [col for col in required_cols if col not in df.columns]
         if missing_cols:
             raise KeyError(f"DataFrame缺少必要的列: {missing_cols}")
-            
-        idx = pd.MultiIndex.from_frame(df[required_cols], names=required_cols)
-        s_indexed = pd.Series(s.values, index=idx)
-        return s_indexed.groupby(level=0).rank(pct=True)
+
+        if isinstance(s, pd.Series) and isinstance(s.index, pd.MultiIndex):
+            # [datetime, symbol] 索引的结果按df行顺序构造，按位置对齐
+            s = s.to_numpy()
+        out = Panel.of(df).cs(s, ops.cs_rank_grouped)
+        return pd.Series(out, index=df.index)
         
     except Exception as e:
         raise RuntimeError(f"计算截面排名时发生错误: {str(e)}") from e
@@ -83,14 +86,177 @@ def _g(df: pd.DataFrame, col: str, fn, *args):
             
         if col is None:
             # 当col为None时，对整个DataFrame的每个分组应用函数
-            return df.groupby("symbol", group_keys=False).apply(lambda x: fn(x, *args))
-        else:
-            # 对指定列按symbol分组应用函数
-            return df.groupby("symbol", group_keys=False)[col].apply(lambda x: fn(x, *args))
+            return df.groupby("symbol", group_keys=False, observed=True).apply(lambda x: fn(x, *args))
+        kernel = ops.grouped_kernel(fn)
+        if kernel is not None:
+            # 已注册分组内核的算子：整体调用内核，不走groupby
+            return _grouped(df, col, kernel, *args)
+        out = _g_slices(df, col, fn, *args)
+        if out is not None:
+            return out
+        # 函数结果与分组不一一对应（例如引用了整张表），保留原groupby语义
+        return df.groupby("symbol", group_keys=False, observed=True)[col].apply(lambda x: fn(x, *args))
             
     except Exception as e:
         raise RuntimeError(f"按分组应用函数时发生错误: {str(e)}") from e
 
+
+def _g_slices(df: pd.DataFrame, col: str, fn, *args):
+    """
+    沿Panel的块边界逐段调用fn，替代groupby。
+
+    每段以带原索引标签的Series传入fn，结果按段写回后还原为df的行顺序。
+
+    Args:
+        df: 包含symbol列的DataFrame
+        col: 要处理的列名
+        fn: 要应用的函数
+        *args: 传递给函数的额外参数
+
+    Returns:
+        与df索引对齐的结果Series；若某段结果的长度或索引与输入段不一致，返回None
+    """
+    panel = Panel.of(df)
+    values = df[col].to_numpy()[panel.order]
+    labels = panel.labels
+    offs = panel.offsets
+    out = np.empty(len(values), dtype=float)
+    for s, e in zip(offs[:-1], offs[1:]):
+        res = fn(pd.Series(values[s:e], index=labels[s:e], name=col), *args)
+        if isinstance(res, pd.Series):
+            if len(res) != e - s or not res.index.equals(labels[s:e]):
+                return None
+            res = res.to_numpy()
+        elif not isinstance(res, np.ndarray) or res.shape != (e - s,):
+            return None
+        out[s:e] = res
+    return panel.series(out, name=col)
+
+
+def _grouped(df: pd.DataFrame, col, kernel, *args) -> pd.Series:
+    """
+    对指定列调用分组内核（ops中的 *_grouped 函数）。
+
+    先把列排成按symbol连续的块，整体调用一次内核，再还原为df的行顺序。
+    col为列名时结果在Panel上缓存，重复的子表达式只计算一次。
+
+    Args:
+        df: 包含symbol列的DataFrame
+        col: 要处理的列名，或与df行对齐的Series
+        kernel: 签名为 kernel(values, offsets, *args) 的分组内核
+        *args: 传递给内核的额外参数
+
+    Returns:
+        与df行顺序、索引一致的结果Series
+    """
+    panel = Panel.of(df)
+    return panel.series(panel.ts(col, kernel, *args))
+
+
+def _ts(df: pd.DataFrame, x, fn, *args) -> pd.Series:
+    """
+    按symbol分组对列或中间结果计算时序算子。
+
+    与`_g`不同，x可以是与df行对齐的中间结果，无需先assign成新列；
+    fn须为已注册分组内核的ops算子（rolling_*、delta、delay、ts_rank等）。
+
+    Args:
+        df: 包含symbol列的DataFrame
+        x: 列名，或与df行对齐的Series
+        fn: ops中的时序算子
+        *args: 传递给算子的额外参数
+
+    Returns:
+        与df行顺序、索引一致的结果Series
+
+    Raises:
+        ValueError: 当fn没有对应的分组内核时
+    """
+    kernel = ops.grouped_kernel(fn)
+    if kernel is None:
+        raise ValueError(f"算子 {getattr(fn, '__name__', fn)} 没有对应的分组内核")
+    return _grouped(df, x, kernel, *args)
+
+
+def _ts2(df: pd.DataFrame, x, y, fn, *args) -> pd.Series:
+    """
+    按symbol分组计算双输入时序算子（滚动相关系数、协方差）。
+
+    x与y按同一块布局排列后整体调用一次内核，组内不再用`.loc`按索引取另一列。
+
+    Args:
+        df: 包含symbol列的DataFrame
+        x: 列名，或与df行对齐的Series
+        y: 列名，或与df行对齐的Series
+        fn: ops.rolling_corr 或 ops.rolling_cov
+        *args: 传递给算子的额外参数（窗口大小）
+
+    Returns:
+        与df行顺序、索引一致的结果Series
+
+    Raises:
+        ValueError: 当fn没有对应的分组内核时
+    """
+    kernel = ops.pair_kernel(fn)
+    if kernel is None:
+        raise ValueError(f"算子 {getattr(fn, '__name__', fn)} 没有对应的分组内核")
+    panel = Panel.of(df)
+    xs, ys = (panel.col(v) if isinstance(v, str) else panel.take(v) for v in (x, y))
+    return panel.series(kernel(xs, ys, panel.offsets, *args))
+
+
+def _arr(df: pd.DataFrame, s) -> np.ndarray:
+    """
+    将中间结果按df的行顺序对齐为ndarray。
+
+    `_g`的返回值按symbol分组拼接，行顺序与df不同；传给`ops.evaluate`
+    之前需先按索引对齐，否则逐元素运算会错位。
+
+    Args:
+        df: 原始长表
+        s: Series或与df等长的数组
+
+    Returns:
+        与df行顺序一致的float数组
+    """
+    return np.asarray(align_rows(s, df.index), dtype=float)
+
+def _div(df: pd.DataFrame, num, den) -> pd.Series:
+    """
+    按df行对齐后逐元素相除，分母为0处为NaN（替代 num / den.replace(0, np.nan)）。
+
+    Args:
+        df: 原始长表
+        num: Series或与df等长的数组
+        den: Series或与df等长的数组
+
+    Returns:
+        与df索引对齐的结果Series
+    """
+    return pd.Series(ops.safe_div(_arr(df, num), _arr(df, den)), index=df.index)
+
+
+def _less(df: pd.DataFrame, a, b, negate: bool = False) -> pd.Series:
+    """
+    逐元素比较 a < b，结果直接写入工作精度的浮点缓冲（1.0/0.0）。
+
+    np.less 直接输出到 float 数组，不生成中间 bool 数组再 astype。
+
+    Args:
+        df: 原始长表
+        a: Series或与df等长的数组
+        b: Series或与df等长的数组
+        negate: 为True时取负（1.0 -> -1.0）
+
+    Returns:
+        与df索引对齐的结果Series
+    """
+    out = np.empty(len(df), dtype=ops.float_dtype())
+    np.less(_arr(df, a), _arr(df, b), out=out)
+    if negate:
+        np.negative(out, out=out)
+    return pd.Series(out, index=df.index)
+
 # ===== Alpha因子实现 =====
 
 @register
@@ -140,8 +306,7 @@ class Alpha001(Factor):
                           df["close"])
             
             # 计算时间序列排名
-            val = _g(df.assign(part=part), "part", 
-                    lambda s: ops.ts_rank(s**2, 5))
+            val = _ts(df, part**2, ops.ts_rank, 5)
             
             # 计算截面排名并调整
             out = _cs_rank(df, val) - 0.5
@@ -161,6 +326,7 @@ class Alpha003(Factor):
     """
     name = "Alpha003"
     requires = ["open", "volume"]
+    ranks = ["open", "volume"]
     
     def compute(self, df: pd.DataFrame) -> pd.Series:
         """
@@ -184,11 +350,7 @@ class Alpha003(Factor):
             if missing_cols:
                 raise KeyError(f"DataFrame缺少必要的列: {missing_cols}")
             
-            val = -_g(df, "open", 
-                     lambda s: ops.rolling_corr(
-                         ops.cs_rank(s), 
-                         ops.cs_rank(df.loc[s.index, "volume"]), 
-                         10))
+            val = -_ts2(df, _cs_rank(df, "open"), _cs_rank(df, "volume"), ops.rolling_corr, 10)
             
             return Factor.as_cs_series(df, val)
             
@@ -271,11 +433,10 @@ class Alpha005(Factor):
                 raise KeyError(f"DataFrame缺少必要的列: {missing_cols}")
             
             # 计算开盘价的10期移动平均
-            a = df.groupby("symbol")["open"].apply(
-                lambda s: ops.rolling_sum(s, 10) / 10)
+            a = _g(df, "open", ops.rolling_sum, 10) / 10
             
             # 计算开盘价与均值的差异的截面排名
-            b = ops.cs_rank(df["open"] - a.values)
+            b = ops.cs_rank(df["open"] - a)
             
             # 计算收盘价与VWAP差异的截面排名的绝对值负值
             c = -np.abs(ops.cs_rank(df["close"] - df["vwap"]))
@@ -318,8 +479,7 @@ class Alpha006(Factor):
             if missing_cols:
                 raise KeyError(f"DataFrame缺少必要的列: {missing_cols}")
             
-            val = -_g(df, "open", 
-                     lambda s: ops.rolling_corr(s, df.loc[s.index, "volume"], 10))
+            val = -_ts2(df, "open", "volume", ops.rolling_corr, 10)
             
             return Factor.as_cs_series(df, val)
             
@@ -336,6 +496,7 @@ class Alpha009(Factor):
     """
     name = "Alpha009"
     requires = ["close"]
+    common = [("close", ops.delta, 1)]
     
     def compute(self, df: pd.DataFrame) -> pd.Series:
         """
@@ -388,6 +549,7 @@ class Alpha010(Factor):
     """
     name = "Alpha010"
     requires = ["close"]
+    common = [("close", ops.delta, 1)]
     
     def compute(self, df: pd.DataFrame) -> pd.Series:
         """
@@ -416,15 +578,13 @@ class Alpha010(Factor):
             d1 = _g(df, "close", ops.delta, 1)
             
             # 判断上升趋势：4期内最小变化大于0
-            cond1 = _g(df, "close", 
-                       lambda s: ops.rolling_min(ops.delta(s, 1), 4)) > 0
+            cond1 = _ts(df, d1, ops.rolling_min, 4) > 0
             
             # 判断下降趋势：4期内最大变化小于0
-            cond2 = _g(df, "close", 
-                       lambda s: ops.rolling_max(ops.delta(s, 1), 4)) < 0
+            cond2 = _ts(df, d1, ops.rolling_max, 4) < 0
             
             # 根据趋势方向决定因子值并进行截面排名
-            val = ops.cs_rank(np.where(cond1, d1, np.where(cond2, d1, -d1)))
+            val = _cs_rank(df, np.where(cond1, d1, np.where(cond2, d1, -d1)))
             
             return Factor.as_cs_series(df, val)
             
@@ -465,16 +625,13 @@ class Alpha011(Factor):
                 raise KeyError(f"DataFrame缺少必要的列: {missing_cols}")
             
             # VWAP与收盘价差异的3期时间序列排名
-            a = _g(df, "vwap", 
-                   lambda s: ops.ts_rank(s - df.loc[s.index, "close"], 3))
+            a = _ts(df, df["vwap"] - df["close"], ops.ts_rank, 3)
             
             # 收盘价与VWAP差异的3期时间序列排名
-            b = _g(df, "vwap", 
-                   lambda s: ops.ts_rank(df.loc[s.index, "close"] - s, 3))
+            b = _ts(df, df["close"] - df["vwap"], ops.ts_rank, 3)
             
             # 成交量3期变化的3期时间序列排名
-            c = _g(df, "volume", 
-                   lambda s: ops.ts_rank(ops.delta(s, 3), 3))
+            c = _ts(df, _g(df, "volume", ops.delta, 3), ops.ts_rank, 3)
             
             # 组合三个排名
             val = (ops.cs_rank(a) + ops.cs_rank(b)) * ops.cs_rank(c)
@@ -494,6 +651,7 @@ class Alpha012(Factor):
     """
     name = "Alpha012"
     requires = ["close", "volume"]
+    common = [("close", ops.delta, 1)]
     
     def compute(self, df: pd.DataFrame) -> pd.Series:
         """
@@ -536,6 +694,7 @@ class Alpha013(Factor):
     """
     name = "Alpha013"
     requires = ["close", "volume"]
+    ranks = ["close", "volume"]
     
     def compute(self, df: pd.DataFrame) -> pd.Series:
         """
@@ -559,11 +718,7 @@ class Alpha013(Factor):
             if missing_cols:
                 raise KeyError(f"DataFrame缺少必要的列: {missing_cols}")
             
-            val = -_g(df, "close", 
-                      lambda s: ops.rolling_cov(
-                          ops.cs_rank(s), 
-                          ops.cs_rank(df.loc[s.index, "volume"]), 
-                          5))
+            val = -_ts2(df, _cs_rank(df, "close"), _cs_rank(df, "volume"), ops.rolling_cov, 5)
             
             return Factor.as_cs_series(df, val)
             
@@ -603,15 +758,16 @@ class Alpha014(Factor):
                 raise KeyError(f"DataFrame缺少必要的列: {missing_cols}")
             
             # 收益率3期变化的截面排名负值
-            returns_rank = -ops.cs_rank(_g(df, "returns", ops.delta, 3))
+            returns_rank = -_cs_rank(df, _g(df, "returns", ops.delta, 3))
             
             # 开盘价与成交量的10期滚动相关系数
-            open_volume_corr = _g(df, "open", 
-                                 lambda s: ops.rolling_corr(s, df.loc[s.index, "volume"], 10))
+            open_volume_corr = _ts2(df, "open", "volume", ops.rolling_corr, 10)
             
-            val = returns_rank * open_volume_corr
+            val = ops.evaluate("returns_rank * open_volume_corr",
+                               returns_rank=_arr(df, returns_rank),
+                               open_volume_corr=_arr(df, open_volume_corr))
             
-            return Factor.as_cs_series(df, val)
+            return Factor.as_cs_series(df, pd.Series(val))
             
         except Exception as e:
             raise RuntimeError(f"计算Alpha014因子时发生错误: {str(e)}") from e
@@ -626,6 +782,7 @@ class Alpha016(Factor):
     """
     name = "Alpha016"
     requires = ["high", "volume"]
+    ranks = ["high", "volume"]
     
     def compute(self, df: pd.DataFrame) -> pd.Series:
         """
@@ -649,11 +806,7 @@ class Alpha016(Factor):
             if missing_cols:
                 raise KeyError(f"DataFrame缺少必要的列: {missing_cols}")
             
-            val = -_g(df, "high", 
-                      lambda s: ops.rolling_cov(
-                          ops.cs_rank(s), 
-                          ops.cs_rank(df.loc[s.index, "volume"]), 
-                          5))
+            val = -_ts2(df, _cs_rank(df, "high"), _cs_rank(df, "volume"), ops.rolling_cov, 5)
             
             return Factor.as_cs_series(df, val)
             
@@ -694,15 +847,13 @@ class Alpha018(Factor):
                 raise KeyError(f"DataFrame缺少必要的列: {missing_cols}")
             
             # 收盘价与开盘价差异绝对值的5期滚动标准差
-            a = _g(df, "close", 
-                   lambda s: ops.rolling_std(np.abs(s - df.loc[s.index, "open"]), 5))
+            a = _ts(df, np.abs(df["close"] - df["open"]), ops.rolling_std, 5)
             
             # 收盘价与开盘价的差异
             b = df["close"] - df["open"]
             
             # 收盘价与开盘价的10期滚动相关系数
-            c = _g(df, "close", 
-                   lambda s: ops.rolling_corr(s, df.loc[s.index, "open"], 10))
+            c = _ts2(df, "close", "open", ops.rolling_corr, 10)
             
             # 组合三个值并进行截面排名
             val = -ops.cs_rank(a + b + c)
@@ -722,6 +873,7 @@ class Alpha019(Factor):
     """
     name = "Alpha019"
     requires = ["close", "returns"]
+    delays = [("close", 7)]
     
     def compute(self, df: pd.DataFrame) -> pd.Series:
         """
@@ -745,14 +897,19 @@ class Alpha019(Factor):
             if missing_cols:
                 raise KeyError(f"DataFrame缺少必要的列: {missing_cols}")
             
-            # 计算价格变化的方向
-            price_change = df["close"] - _g(df, "close", ops.delay, 7) + _g(df, "close", ops.delta, 7)
+            # 收盘价的7期延迟与7期变化
+            close_delay7 = self.get_delay(df, "close", 7)
+            close_delta7 = _g(df, "close", ops.delta, 7)
             
             # 计算250期收益率累计和的排名
-            returns_sum_rank = ops.cs_rank(1 + _g(df, "returns", ops.rolling_sum, 250))
+            rank_sum250 = _cs_rank(df, 1 + _g(df, "returns", ops.rolling_sum, 250))
             
-            # 组合计算因子值
-            val = -np.sign(price_change) * (1 + returns_sum_rank)
+            # 价格变化方向与排名一次融合计算
+            val = ops.evaluate("-sign(close - close_delay7 + close_delta7) * (1.0 + rank_sum250)",
+                               close=_arr(df, df["close"]),
+                               close_delay7=_arr(df, close_delay7),
+                               close_delta7=_arr(df, close_delta7),
+                               rank_sum250=_arr(df, rank_sum250))
             
             return Factor.as_cs_series(df, pd.Series(val))
             
@@ -769,6 +926,7 @@ class Alpha020(Factor):
     """
     name = "Alpha020"
     requires = ["open", "high", "low", "close"]
+    delays = [("high", 1), ("close", 1), ("low", 1)]
     
     def compute(self, df: pd.DataFrame) -> pd.Series:
         """
@@ -793,17 +951,18 @@ class Alpha020(Factor):
                 raise KeyError(f"DataFrame缺少必要的列: {missing_cols}")
             
             # 开盘价与前一天最高价差异的截面排名
-            rank1 = -ops.cs_rank(df["open"] - _g(df, "high", ops.delay, 1))
+            rank1 = -_cs_rank(df, df["open"] - self.get_delay(df, "high", 1))
             
             # 开盘价与前一天收盘价差异的截面排名
-            rank2 = ops.cs_rank(df["open"] - _g(df, "close", ops.delay, 1))
+            rank2 = _cs_rank(df, df["open"] - self.get_delay(df, "close", 1))
             
             # 开盘价与前一天最低价差异的截面排名
-            rank3 = ops.cs_rank(df["open"] - _g(df, "low", ops.delay, 1))
+            rank3 = _cs_rank(df, df["open"] - self.get_delay(df, "low", 1))
             
-            val = rank1 * rank2 * rank3
+            val = ops.evaluate("rank1 * rank2 * rank3",
+                               rank1=_arr(df, rank1), rank2=_arr(df, rank2), rank3=_arr(df, rank3))
             
-            return Factor.as_cs_series(df, val)
+            return Factor.as_cs_series(df, pd.Series(val))
             
         except Exception as e:
             raise RuntimeError(f"计算Alpha020因子时发生错误: {str(e)}") from e
@@ -818,6 +977,7 @@ class Alpha021(Factor):
     """
     name = "Alpha021"
     requires = ["close", "volume"]
+    common = [("volume", ops.adv, 20)]
     
     def compute(self, df: pd.DataFrame) -> pd.Series:
         """
@@ -851,7 +1011,7 @@ class Alpha021(Factor):
             s2 = _g(df, "close", lambda s: ops.rolling_sum(s, 2) / 2)
             
             # 成交量20期移动平均
-            adv20 = _g(df, "volume", lambda s: ops.adv(s, 20))
+            adv20 = _g(df, "volume", ops.adv, 20)
             
             # 价格趋势条件
             cond = ((s8 + sd8) < s2) * (-1) + ((s2 < (s8 - sd8)) * 1)
@@ -901,11 +1061,10 @@ class Alpha022(Factor):
                 raise KeyError(f"DataFrame缺少必要的列: {missing_cols}")
             
             # 最高价与成交量的5期滚动相关系数
-            corr = _g(df, "high", 
-                      lambda s: ops.rolling_corr(s, df.loc[s.index, "volume"], 5))
+            corr = _ts2(df, "high", "volume", ops.rolling_corr, 5)
             
             # 相关系数的5期变化
-            corr_delta = _g(df, None, lambda *_: ops.delta(corr, 5))
+            corr_delta = _ts(df, corr, ops.delta, 5)
             
             # 收盘价20期滚动标准差的截面排名
             close_std_rank = ops.cs_rank(_g(df, "close", ops.rolling_std, 20))
@@ -974,6 +1133,7 @@ class Alpha025(Factor):
     """
     name = "Alpha025"
     requires = ["returns", "vwap", "high", "close", "volume"]
+    common = [("volume", ops.adv, 20)]
     
     def compute(self, df: pd.DataFrame) -> pd.Series:
         """
@@ -997,7 +1157,7 @@ class Alpha025(Factor):
                 raise KeyError(f"DataFrame缺少必要的列: {missing_cols}")
             
             # 成交量20期移动平均
-            adv20 = _g(df, "volume", lambda s: ops.adv(s, 20))
+            adv20 = _g(df, "volume", ops.adv, 20)
             
             # 组合计算：收益率负值 * 平均成交量 * VWAP * 价格区间
             val = ops.cs_rank((-df["returns"]) * adv20 * df["vwap"] * (df["high"] - df["close"]))
@@ -1042,14 +1202,13 @@ class Alpha026(Factor):
                 raise KeyError(f"DataFrame缺少必要的列: {missing_cols}")
             
             # 成交量5期时间序列排名
-            a = _g(df, "volume", lambda s: ops.ts_rank(s, 5))
+            a = _g(df, "volume", ops.ts_rank, 5)
             
             # 最高价5期时间序列排名
-            b = _g(df, "high", lambda s: ops.ts_rank(s, 5))
+            b = _g(df, "high", ops.ts_rank, 5)
             
             # 计算相关系数的3期滚动最大值
-            val = -_g(df, None, 
-                      lambda *_: ops.rolling_max(ops.rolling_corr(a, b, 5), 3))
+            val = -_ts(df, _ts2(df, a, b, ops.rolling_corr, 5), ops.rolling_max, 3)
             
             return Factor.as_cs_series(df, val)
             
@@ -1105,6 +1264,7 @@ class Alpha034(Factor):
     """
     name = "Alpha034"
     requires = ["returns", "close"]
+    common = [("close", ops.delta, 1)]
     
     def compute(self, df: pd.DataFrame) -> pd.Series:
         """
@@ -1175,18 +1335,18 @@ class Alpha035(Factor):
                 raise KeyError(f"DataFrame缺少必要的列: {missing_cols}")
             
             # 成交量32期时间序列排名
-            a = _g(df, "volume", lambda s: ops.ts_rank(s, 32))
+            a = _g(df, "volume", ops.ts_rank, 32)
             
             # 价格区间16期时间序列排名
-            b = 1 - _g(df, None, 
-                       lambda *_: ops.ts_rank(((df["close"] + df["high"]) - df["low"]), 16))
+            b = _ts(df, (df["close"] + df["high"]) - df["low"], ops.ts_rank, 16)
             
             # 收益率32期时间序列排名
-            c = 1 - _g(df, "returns", lambda s: ops.ts_rank(s, 32))
+            c = _g(df, "returns", ops.ts_rank, 32)
             
-            val = a * b * c
+            val = ops.evaluate("a * (1 - b) * (1 - c)",
+                               a=_arr(df, a), b=_arr(df, b), c=_arr(df, c))
             
-            return Factor.as_cs_series(df, val)
+            return Factor.as_cs_series(df, pd.Series(val))
             
         except Exception as e:
             raise RuntimeError(f"计算Alpha035因子时发生错误: {str(e)}") from e
@@ -1224,7 +1384,7 @@ class Alpha038(Factor):
                 raise KeyError(f"DataFrame缺少必要的列: {missing_cols}")
             
             # 收盘价10期时间序列排名
-            close_ts_rank = _g(df, "close", lambda s: ops.ts_rank(s, 10))
+            close_ts_rank = _g(df, "close", ops.ts_rank, 10)
             
             # 收盘价与开盘价比率的截面排名
             close_open_ratio_rank = ops.cs_rank(df["close"] / df["open"])
@@ -1257,7 +1417,7 @@ class Alpha040(Factor):
             因子值的Series
         """
         try:
-            val = (- ops.cs_rank(_g(df,"high", ops.rolling_std, 10))) * _g(df,"high", lambda s: ops.rolling_corr(s, df.loc[s.index,"volume"], 10))
+            val = (- ops.cs_rank(_g(df,"high", ops.rolling_std, 10))) * _ts2(df, "high", "volume", ops.rolling_corr, 10)
             return Factor.as_cs_series(df, val)
         except Exception as e:
             raise RuntimeError(f"计算Alpha040因子时发生错误: {str(e)}") from e
@@ -1333,8 +1493,8 @@ class Alpha043(Factor):
             因子值的Series
         """
         try:
-            adv20 = _g(df,"volume", lambda s: ops.adv(s, 20))
-            val = _g(df, None, lambda *_: ops.ts_rank(df["volume"]/adv20, 20)) * _g(df,"close", lambda s: ops.ts_rank(- ops.delta(s,7), 8))
+            adv20 = _g(df,"volume", ops.adv, 20)
+            val = _ts(df, df["volume"]/adv20, ops.ts_rank, 20) * _ts(df, -_g(df,"close", ops.delta, 7), ops.ts_rank, 8)
             return Factor.as_cs_series(df, val)
         except Exception as e:
             raise RuntimeError(f"计算Alpha043因子时发生错误: {str(e)}") from e
@@ -1361,8 +1521,8 @@ class Alpha045(Factor):
         """
         try:
             a = ops.cs_rank(_g(df,"close", lambda s: ops.rolling_sum(ops.delay(s,5), 20)/20))
-            b = _g(df,"close", lambda s: ops.rolling_corr(s, df.loc[s.index,"volume"], 2))
-            c = _g(df,"close", lambda s: ops.rolling_corr(_g(df,"close", lambda s2: ops.rolling_sum(s2,5)), _g(df,"close", lambda s2: ops.rolling_sum(s2,20)), 2))
+            b = _ts2(df, "close", "volume", ops.rolling_corr, 2)
+            c = _grouped(df, "close", ops.sum_pair_corr_grouped, 5, 20, 2)
             val = - (a * b * ops.cs_rank(c))
             return Factor.as_cs_series(df, val)
         except Exception as e:
@@ -1388,8 +1548,10 @@ class Alpha046(Factor):
             因子值的Series
         """
         try:
-            a = (_g(df,"close", ops.delay,20) - _g(df,"close", ops.delay,10))/10 - (_g(df,"close", ops.delay,10) - df["close"])/10
-            val = np.where(a > 0.25, -1, np.where(a < 0, 1, -1*(df["close"] - _g(df,"close", ops.delay,1))))
+            close = _arr(df, df["close"])
+            d1, d10, d20 = (_arr(df, _g(df,"close", ops.delay,k)) for k in (1, 10, 20))
+            a = ops.evaluate("(d20 - d10)/10 - (d10 - close)/10", d20=d20, d10=d10, close=close)
+            val = ops.evaluate("where(a > 0.25, -1.0, where(a < 0, 1.0, -(close - d1)))", a=a, close=close, d1=d1)
             return Factor.as_cs_series(df, pd.Series(val))
         except Exception as e:
             raise RuntimeError(f"计算Alpha046因子时发生错误: {str(e)}") from e
@@ -1414,8 +1576,10 @@ class Alpha049(Factor):
             因子值的Series
         """
         try:
-            a = (_g(df,"close", ops.delay,20) - _g(df,"close", ops.delay,10))/10 - (_g(df,"close", ops.delay,10) - df["close"])/10
-            val = np.where(a < -0.1, 1, -1*(df["close"] - _g(df,"close", ops.delay,1)))
+            close = _arr(df, df["close"])
+            d1, d10, d20 = (_arr(df, _g(df,"close", ops.delay,k)) for k in (1, 10, 20))
+            a = ops.evaluate("(d20 - d10)/10 - (d10 - close)/10", d20=d20, d10=d10, close=close)
+            val = ops.evaluate("where(a < -0.1, 1.0, -(close - d1))", a=a, close=close, d1=d1)
             return Factor.as_cs_series(df, pd.Series(val))
         except Exception as e:
             raise RuntimeError(f"计算Alpha049因子时发生错误: {str(e)}") from e
@@ -1429,6 +1593,7 @@ class Alpha050(Factor):
     """
     name = "Alpha050"
     requires = ["volume","vwap"]
+    ranks = ["volume", "vwap"]
     def compute(self, df: pd.DataFrame) -> pd.Series:
         """
         计算Alpha050因子值。
@@ -1440,8 +1605,8 @@ class Alpha050(Factor):
             因子值的Series
         """
         try:
-            val = - _g(df, None, lambda *_: ops.rolling_max(
-                ops.cs_rank(_g(df,"volume", lambda s: ops.rolling_corr(ops.cs_rank(s), ops.cs_rank(df.loc[s.index,"vwap"]), 5))), 5))
+            corr = _ts2(df, _cs_rank(df, "volume"), _cs_rank(df, "vwap"), ops.rolling_corr, 5)
+            val = - _ts(df, _cs_rank(df, corr), ops.rolling_max, 5)
             return Factor.as_cs_series(df, val)
         except Exception as e:
             raise RuntimeError(f"计算Alpha050因子时发生错误: {str(e)}") from e
@@ -1466,8 +1631,10 @@ class Alpha051(Factor):
             因子值的Series
         """
         try:
-            a = (_g(df,"close", ops.delay,20) - _g(df,"close", ops.delay,10))/10 - (_g(df,"close", ops.delay,10) - df["close"])/10
-            val = np.where(a < -0.05, 1, -1*(df["close"] - _g(df,"close", ops.delay,1)))
+            close = _arr(df, df["close"])
+            d1, d10, d20 = (_arr(df, _g(df,"close", ops.delay,k)) for k in (1, 10, 20))
+            a = ops.evaluate("(d20 - d10)/10 - (d10 - close)/10", d20=d20, d10=d10, close=close)
+            val = ops.evaluate("where(a < -0.05, 1.0, -(close - d1))", a=a, close=close, d1=d1)
             return Factor.as_cs_series(df, pd.Series(val))
         except Exception as e:
             raise RuntimeError(f"计算Alpha051因子时发生错误: {str(e)}") from e
@@ -1493,8 +1660,14 @@ class Alpha052(Factor):
             因子值的Series
         """
         try:
-            part = (- _g(df,"low", lambda s: ops.rolling_min(s,5)) + _g(df,"low", lambda s: ops.delay(ops.rolling_min(s,5),5))) * ops.cs_rank((_g(df,"returns", ops.rolling_sum,240) - _g(df,"returns", ops.rolling_sum,20))/220) * _g(df,"volume", lambda s: ops.ts_rank(s,5))
-            return Factor.as_cs_series(df, part)
+            low_min5 = _g(df,"low", lambda s: ops.rolling_min(s,5))
+            low_min5_d5 = _g(df,"low", lambda s: ops.delay(ops.rolling_min(s,5),5))
+            ret_rank = _cs_rank(df, (_g(df,"returns", ops.rolling_sum,240) - _g(df,"returns", ops.rolling_sum,20))/220)
+            vol_rank = _g(df,"volume", ops.ts_rank, 5)
+            part = ops.evaluate("(low_min5_d5 - low_min5) * ret_rank * vol_rank",
+                                low_min5=_arr(df, low_min5), low_min5_d5=_arr(df, low_min5_d5),
+                                ret_rank=_arr(df, ret_rank), vol_rank=_arr(df, vol_rank))
+            return Factor.as_cs_series(df, pd.Series(part))
         except Exception as e:
             raise RuntimeError(f"计算Alpha052因子时发生错误: {str(e)}") from e
 
@@ -1518,8 +1691,8 @@ class Alpha053(Factor):
             因子值的Series
         """
         try:
-            x = ((df["close"] - df["low"]) - (df["high"] - df["close"])) / (df["close"] - df["low"]).replace(0,np.nan)
-            val = - _g(df, None, lambda *_: ops.delta(x, 9))
+            x = _div(df, (df["close"] - df["low"]) - (df["high"] - df["close"]), df["close"] - df["low"])
+            val = - _ts(df, x, ops.delta, 9)
             return Factor.as_cs_series(df, val)
         except Exception as e:
             raise RuntimeError(f"计算Alpha053因子时发生错误: {str(e)}") from e
@@ -1533,6 +1706,7 @@ class Alpha055(Factor):
     """
     name = "Alpha055"
     requires = ["close","high","low","volume"]
+    ranks = ["volume"]
     def compute(self, df: pd.DataFrame) -> pd.Series:
         """
         计算Alpha055因子值。
@@ -1544,8 +1718,9 @@ class Alpha055(Factor):
             因子值的Series
         """
         try:
-            num = (df["close"] - _g(df,"low", lambda s: ops.rolling_min(s,12))) / (_g(df,"high", lambda s: ops.rolling_max(s,12)) - _g(df,"low", lambda s: ops.rolling_min(s,12))).replace(0,np.nan)
-            val = - _g(df, None, lambda *_: ops.rolling_corr(ops.cs_rank(num), ops.cs_rank(df["volume"]), 6))
+            low12 = _g(df,"low", ops.rolling_min, 12)
+            num = _div(df, df["close"] - low12, _g(df,"high", ops.rolling_max, 12) - low12)
+            val = - _ts2(df, _cs_rank(df, num), _cs_rank(df, "volume"), ops.rolling_corr, 6)
             return Factor.as_cs_series(df, val)
         except Exception as e:
             raise RuntimeError(f"计算Alpha055因子时发生错误: {str(e)}") from e
@@ -1570,8 +1745,8 @@ class Alpha060(Factor):
             因子值的Series
         """
         try:
-            x = (((df["close"]-df["low"]) - (df["high"]-df["close"])) / (df["high"]-df["low"]).replace(0,np.nan)) * df["volume"]
-            val = - ( 2*ops.cs_rank(ops.decay_linear(x, 10)) - ops.cs_rank(_g(df,"close", lambda s: ops.ts_rank(s,10))) )
+            x = _div(df, (df["close"]-df["low"]) - (df["high"]-df["close"]), df["high"]-df["low"]) * df["volume"]
+            val = - ( 2*ops.cs_rank(ops.decay_linear(x, 10)) - ops.cs_rank(_g(df,"close", ops.ts_rank, 10)) )
             return Factor.as_cs_series(df, val)
         except Exception as e:
             raise RuntimeError(f"计算Alpha060因子时发生错误: {str(e)}") from e
@@ -1611,6 +1786,7 @@ class Alpha024(Factor):
     """
     name = "Alpha024"
     requires = ["close"]
+    delays = [("close", 100)]
     def compute(self, df: pd.DataFrame) -> pd.Series:
         """
         计算Alpha024因子值。
@@ -1622,8 +1798,8 @@ class Alpha024(Factor):
             因子值的Series
         """
         try:
-            s100 = _g(df,"close", lambda s: ops.rolling_sum(s,100) / 100)
-            d = _g(df,"close", lambda s: ops.delta(ops.rolling_sum(s,100)/100, 100)) / _g(df,"close", lambda s: ops.delay(s,100))
+            s100 = _g(df,"close", ops.rolling_sum, 100) / 100
+            d = _ts(df, s100, ops.delta, 100) / self.get_delay(df, "close", 100)
             cond = (d <= 0.05)
             val = np.where(cond, - (df["close"] - _g(df,"close", ops.rolling_min, 100)),
                                   - _g(df,"close", ops.delta, 3))
@@ -1651,12 +1827,11 @@ class Alpha030(Factor):
             因子值的Series
         """
         try:
-            s5 = _g(df,"volume", lambda s: ops.rolling_sum(s,5))
-            s20 = _g(df,"volume", lambda s: ops.rolling_sum(s,20))
-            sig = (1.0 - _cs_rank(df, (np.sign(ops.delta(_g(df,"close", ops.delay,1),1)) +
-                                       np.sign(ops.delta(_g(df,"close", ops.delay,2),1)) +
-                                       np.sign(ops.delta(_g(df,"close", ops.delay,3),1)))))
-            val = (sig * s5) / s20.replace(0,np.nan)
+            s5 = _g(df,"volume", ops.rolling_sum, 5)
+            s20 = _g(df,"volume", ops.rolling_sum, 20)
+            # sign(delta(delay(close,k),1)) 对 k=1..3 求和，单遍融合计算
+            sig = 1.0 - _cs_rank(df, _grouped(df, "close", ops.sign_delta_sum_grouped, 3))
+            val = _div(df, sig * s5, s20)
             return Factor.as_cs_series(df, val)
         except Exception as e:
             raise RuntimeError(f"计算Alpha030因子时发生错误: {str(e)}") from e
@@ -1669,7 +1844,7 @@ class Alpha031(Factor):
     该因子由三个子项相加：价格动量、短期跌幅、以及成交量与低价的相关性方向。
     """
     name = "Alpha031"
-    requires = ["close","volume"]
+    requires = ["close","volume","low"]
     def compute(self, df: pd.DataFrame) -> pd.Series:
         """
         计算Alpha031因子值。
@@ -1681,10 +1856,10 @@ class Alpha031(Factor):
             因子值的Series
         """
         try:
-            a = ops.cs_rank(ops.decay_linear(- _cs_rank(_g(df,"close", lambda s: ops.delta(s,10))), 10))
-            b = ops.cs_rank(- _g(df,"close", ops.delta, 3))
-            adv20 = _g(df,"volume", lambda s: ops.adv(s,20))
-            c = np.sign(ops.cs_rank(_g(df,"volume", lambda s: ops.rolling_corr(adv20, df.loc[s.index,"low"] if "low" in df.columns else s, 12))))
+            a = _cs_rank(df, _ts(df, - _cs_rank(df, _g(df,"close", ops.delta, 10)), ops.decay_linear, 10))
+            b = _cs_rank(df, - _g(df,"close", ops.delta, 3))
+            adv20 = _g(df,"volume", ops.adv, 20)
+            c = np.sign(_cs_rank(df, _ts2(df, adv20, "low", ops.rolling_corr, 12)))
             val = a + b + c
             return Factor.as_cs_series(df, val)
         except Exception as e:
@@ -1699,6 +1874,7 @@ class Alpha032(Factor):
     """
     name = "Alpha032"
     requires = ["close","vwap"]
+    delays = [("close", 5)]
     def compute(self, df: pd.DataFrame) -> pd.Series:
         """
         计算Alpha032因子值。
@@ -1710,8 +1886,8 @@ class Alpha032(Factor):
             因子值的Series
         """
         try:
-            part1 = ops.cs_rank((_g(df,"close", lambda s: ops.rolling_sum(s,7)/7) - df["close"]))
-            part2 = 20 * ops.cs_rank(_g(df,"close", lambda s: ops.rolling_corr(df.loc[s.index,"vwap"], _g(df,"close", ops.delay,5), 230)))
+            part1 = _cs_rank(df, (_g(df,"close", ops.rolling_sum, 7)/7 - df["close"]))
+            part2 = 20 * _cs_rank(df, _ts2(df, "vwap", self.get_delay(df, "close", 5), ops.rolling_corr, 230))
             return Factor.as_cs_series(df, part1 + part2)
         except Exception as e:
             raise RuntimeError(f"计算Alpha032因子时发生错误: {str(e)}") from e
@@ -1720,12 +1896,13 @@ class Alpha032(Factor):
 class Alpha036(Factor):
     name = "Alpha036"
     requires = ["close","open","volume","vwap","returns"]
+    delays = [("volume", 1)]
     def compute(self, df: pd.DataFrame) -> pd.Series:
-        a = 2.21 * ops.cs_rank(_g(df, None, lambda *_: ops.rolling_corr(df["close"]-df["open"], _g(df,"volume", ops.delay,1), 15)))
-        b = 0.7 * ops.cs_rank(df["open"] - df["close"])
-        c = 0.73 * ops.cs_rank(_g(df, None, lambda *_: ops.ts_rank(ops.delay(-df["returns"],6), 5)))
-        d = ops.cs_rank(np.abs(_g(df, None, lambda *_: ops.rolling_corr(df["vwap"], _g(df,"volume", lambda s: ops.adv(s,20)), 6))))
-        e = 0.6 * ops.cs_rank((_g(df,"close", lambda s: ops.rolling_sum(s,200)/200) - df["open"]) * (df["close"] - df["open"]))
+        a = 2.21 * _cs_rank(df, _ts2(df, df["close"]-df["open"], self.get_delay(df, "volume", 1), ops.rolling_corr, 15))
+        b = 0.7 * _cs_rank(df, df["open"] - df["close"])
+        c = 0.73 * _cs_rank(df, _ts(df, _ts(df, -df["returns"], ops.delay, 6), ops.ts_rank, 5))
+        d = _cs_rank(df, np.abs(_ts2(df, "vwap", _g(df,"volume", ops.adv, 20), ops.rolling_corr, 6)))
+        e = 0.6 * _cs_rank(df, (_g(df,"close", ops.rolling_sum, 200)/200 - df["open"]) * (df["close"] - df["open"]))
         val = a + b + c + d + e
         return Factor.as_cs_series(df, val)
 
@@ -1734,8 +1911,8 @@ class Alpha037(Factor):
     name = "Alpha037"
     requires = ["open","close"]
     def compute(self, df: pd.DataFrame) -> pd.Series:
-        a = ops.cs_rank(_g(df, None, lambda *_: ops.rolling_corr(ops.delay(df["open"]-df["close"],1), df["close"], 200)))
-        b = ops.cs_rank(df["open"] - df["close"])
+        a = _cs_rank(df, _ts2(df, _ts(df, df["open"]-df["close"], ops.delay, 1), "close", ops.rolling_corr, 200))
+        b = _cs_rank(df, df["open"] - df["close"])
         return Factor.as_cs_series(df, a + b)
 
 @register
@@ -1743,28 +1920,31 @@ class Alpha039(Factor):
     name = "Alpha039"
     requires = ["close","volume","returns"]
     def compute(self, df: pd.DataFrame) -> pd.Series:
-        adv20 = _g(df,"volume", lambda s: ops.adv(s,20))
-        part = - ops.cs_rank(_g(df,"close", lambda s: ops.delta(s,7)) * (1 - ops.cs_rank(ops.decay_linear(df["volume"]/adv20, 9))))
-        val = part * (1 + ops.cs_rank(_g(df,"returns", lambda s: ops.rolling_sum(s,250))))
+        adv20 = _g(df,"volume", ops.adv, 20)
+        part = - _cs_rank(df, _g(df,"close", ops.delta, 7) * (1 - _cs_rank(df, _ts(df, df["volume"]/adv20, ops.decay_linear, 9))))
+        val = part * (1 + _cs_rank(df, _g(df,"returns", ops.rolling_sum, 250)))
         return Factor.as_cs_series(df, val)
 
 @register
 class Alpha044(Factor):
     name = "Alpha044"
     requires = ["high","volume"]
+    ranks = ["volume"]
     def compute(self, df: pd.DataFrame) -> pd.Series:
-        val = - _g(df,"high", lambda s: ops.rolling_corr(s, ops.cs_rank(df.loc[s.index,"volume"]), 5))
+        volume_rank = _cs_rank(df, "volume")
+        val = - _ts2(df, "high", volume_rank, ops.rolling_corr, 5)
         return Factor.as_cs_series(df, val)
 
 @register
 class Alpha047(Factor):
     name = "Alpha047"
     requires = ["close","high","vwap","volume"]
+    delays = [("vwap", 5)]
     def compute(self, df: pd.DataFrame) -> pd.Series:
-        adv20 = _g(df,"volume", lambda s: ops.adv(s,20))
-        part1 = (ops.cs_rank(1/df["close"]) * df["volume"]) / adv20
-        part2 = (df["high"] * ops.cs_rank(df["high"]-df["close"])) / (_g(df,"high", lambda s: ops.rolling_sum(s,5))/5)
-        val = part1 * part2 - ops.cs_rank(df["vwap"] - _g(df,"vwap", ops.delay,5))
+        adv20 = _g(df,"volume", ops.adv, 20)
+        part1 = (_cs_rank(df, 1/df["close"]) * df["volume"]) / adv20
+        part2 = (df["high"] * _cs_rank(df, df["high"]-df["close"])) / (_g(df,"high", ops.rolling_sum, 5)/5)
+        val = part1 * part2 - _cs_rank(df, df["vwap"] - self.get_delay(df, "vwap", 5))
         return Factor.as_cs_series(df, val)
 
 @register
@@ -1772,28 +1952,31 @@ class Alpha054(Factor):
     name = "Alpha054"
     requires = ["low","close","open","high"]
     def compute(self, df: pd.DataFrame) -> pd.Series:
-        val = - ((df["low"] - df["close"]) * (df["open"]**5)) / ((df["low"] - df["high"]) * (df["close"]**5))
-        return Factor.as_cs_series(df, val)
+        # open**5 / close**5 合并为 (open/close)**5：一次除法、一次整数幂（numexpr 展开为乘法）
+        val = ops.evaluate("-((low - close) / (low - high)) * (open / close) ** 5",
+                           low=_arr(df, df["low"]), close=_arr(df, df["close"]),
+                           high=_arr(df, df["high"]), open=_arr(df, df["open"]))
+        return Factor.as_cs_series(df, pd.Series(val, index=df.index))
 
 @register
 class Alpha061(Factor):
     name = "Alpha061"
     requires = ["vwap","volume"]
     def compute(self, df: pd.DataFrame) -> pd.Series:
-        adv180 = _g(df,"volume", lambda s: ops.adv(s,180))
-        a = ops.cs_rank(df["vwap"] - _g(df,"vwap", lambda s: ops.rolling_min(s, int(16.1219))))
-        b = ops.cs_rank(_g(df, None, lambda *_: ops.rolling_corr(df["vwap"], adv180, int(17.9282))))
-        val = (a < b).astype(float)
+        adv180 = _g(df,"volume", ops.adv, 180)
+        a = _cs_rank(df, df["vwap"] - _g(df,"vwap", ops.rolling_min, int(16.1219)))
+        b = _cs_rank(df, _ts2(df, "vwap", adv180, ops.rolling_corr, int(17.9282)))
+        val = _less(df, a, b)
         return Factor.as_cs_series(df, val)
 
 @register
 class Alpha064(Factor):
     name = "Alpha064"
-    requires = ["open","low","vwap","close"]
+    requires = ["open","high","low","vwap","close","volume"]
     def compute(self, df: pd.DataFrame) -> pd.Series:
-        a = ops.cs_rank(_g(df, None, lambda *_: ops.rolling_corr((_g(df,"open", lambda s: 0.178404*s) + (df["low"]*(1-0.178404))), _g(df,"volume", lambda s: ops.adv(s,120)), int(16.6208))))
-        b = ops.cs_rank(_g(df, None, lambda *_: ops.delta((((df["high"]+df["low"])/2)*0.178404 + df["vwap"]*(1-0.178404)), int(3.69741))))
-        val = (a < b).astype(float) * -1
+        a = _cs_rank(df, _ts2(df, 0.178404*df["open"] + df["low"]*(1-0.178404), _g(df,"volume", ops.adv, 120), ops.rolling_corr, int(16.6208)))
+        b = _cs_rank(df, _ts(df, ((df["high"]+df["low"])/2)*0.178404 + df["vwap"]*(1-0.178404), ops.delta, int(3.69741)))
+        val = _less(df, a, b, negate=True)
         return Factor.as_cs_series(df, val)
 
 @register
@@ -1805,7 +1988,7 @@ class Alpha065(Factor):
     与开盘价相对近期低点的排名大小关系，取小于关系的负号。
     """
     name = "Alpha065"
-    requires = ["open","vwap","low"]
+    requires = ["open","vwap","low","volume"]
     def compute(self, df: pd.DataFrame) -> pd.Series:
         """
         计算Alpha065因子值。
@@ -1817,9 +2000,9 @@ class Alpha065(Factor):
             因子值的Series
         """
         try:
-            a = ops.cs_rank(_g(df, None, lambda *_: ops.rolling_corr(0.00817205*df["open"] + (1-0.00817205)*df["vwap"], _g(df,"volume", lambda s: ops.adv(s,60)), int(6.40374))))
-            b = ops.cs_rank(df["open"] - _g(df,"open", lambda s: ops.rolling_min(s, int(13.635))))
-            val = (a < b).astype(float) * -1
+            a = _cs_rank(df, _ts2(df, 0.00817205*df["open"] + (1-0.00817205)*df["vwap"], _g(df,"volume", ops.adv, 60), ops.rolling_corr, int(6.40374)))
+            b = _cs_rank(df, df["open"] - _g(df,"open", ops.rolling_min, int(13.635)))
+            val = _less(df, a, b, negate=True)
             return Factor.as_cs_series(df, val)
         except Exception as e:
             raise RuntimeError(f"计算Alpha065因子时发生错误: {str(e)}") from e
@@ -1844,8 +2027,8 @@ class Alpha071(Factor):
             因子值的Series
         """
         try:
-            a = _g(df, None, lambda *_: ops.ts_rank(ops.decay_linear(_g(df,"close", lambda s: ops.ts_rank(s, int(3.43976))), int(4.20501)), int(15.6948)))
-            b = _g(df, None, lambda *_: ops.ts_rank(ops.decay_linear(ops.cs_rank(((df["low"]+df["open"])-(df["vwap"]+df["vwap"]))**2), int(16.4662)), int(4.4388)))
+            a = _ts(df, _ts(df, _g(df,"close", ops.ts_rank, int(3.43976)), ops.decay_linear, int(4.20501)), ops.ts_rank, int(15.6948))
+            b = _ts(df, _ts(df, _cs_rank(df, ((df["low"]+df["open"])-(df["vwap"]+df["vwap"]))**2), ops.decay_linear, int(16.4662)), ops.ts_rank, int(4.4388))
             val = np.maximum(a, b)
             return Factor.as_cs_series(df, val)
         except Exception as e:
@@ -1861,6 +2044,7 @@ class Alpha083(Factor):
     """
     name = "Alpha083"
     requires = ["high","low","close","vwap","volume"]
+    ranks = ["volume"]
     def compute(self, df: pd.DataFrame) -> pd.Series:
         """
         计算Alpha083因子值。
@@ -1872,9 +2056,10 @@ class Alpha083(Factor):
             因子值的Series
         """
         try:
-            num = ops.cs_rank(ops.delay(((df["high"]-df["low"]) / (_g(df,"close", lambda s: ops.rolling_sum(s,5))/5)), 2)) * ops.cs_rank(ops.cs_rank(df["volume"]))
-            den = ((df["high"]-df["low"]) / (_g(df,"close", lambda s: ops.rolling_sum(s,5))/5)) / (df["vwap"] - df["close"]).replace(0,np.nan)
-            val = num / den.replace(0,np.nan)
+            hl = (df["high"]-df["low"]) / (_g(df,"close", ops.rolling_sum, 5)/5)
+            num = _cs_rank(df, _ts(df, hl, ops.delay, 2)) * _cs_rank(df, "volume")
+            den = _div(df, hl, df["vwap"] - df["close"])
+            val = _div(df, num, den)
             return Factor.as_cs_series(df, val)
         except Exception as e:
             raise RuntimeError(f"计算Alpha083因子时发生错误: {str(e)}") from e
@@ -1899,7 +2084,8 @@ class Alpha084(Factor):
             因子值的Series
         """
         try:
-            val = np.sign(_g(df,"close", ops.delta, int(4.96796))) * _g(df,"vwap", lambda s: ops.ts_rank(s - _g(df,"vwap", ops.rolling_max, int(15.3217)), int(20.7127)))
+            vwap_gap = df["vwap"] - _g(df,"vwap", ops.rolling_max, int(15.3217))
+            val = np.sign(_g(df,"close", ops.delta, int(4.96796))) * _ts(df, vwap_gap, ops.ts_rank, int(20.7127))
             return Factor.as_cs_series(df, val)
         except Exception as e:
             raise RuntimeError(f"计算Alpha084因子时发生错误: {str(e)}") from e
@@ -1912,7 +2098,7 @@ class Alpha085(Factor):
     两个相关性项的截面排名做幂运算。
     """
     name = "Alpha085"
-    requires = ["high","close","volume"]
+    requires = ["high","low","close","volume"]
     def compute(self, df: pd.DataFrame) -> pd.Series:
         """
         计算Alpha085因子值。
@@ -1924,9 +2110,10 @@ class Alpha085(Factor):
             因子值的Series
         """
         try:
-            a = _g(df, None, lambda *_: ops.rolling_corr(0.876703*df["high"] + (1-0.876703)*df["close"], _g(df,"volume", lambda s: ops.adv(s,30)), int(9.61331)))
-            b = _g(df, None, lambda *_: ops.rolling_corr(_g(df,"close", lambda s: ops.ts_rank((df["high"]+df["low"])/2, int(3.70596))), _g(df,"volume", lambda s: ops.ts_rank(df["volume"], int(10.1595))), int(7.11408)))
-            val = ops.cs_rank(a) ** ops.cs_rank(b)
+            a = _ts2(df, 0.876703*df["high"] + (1-0.876703)*df["close"], _g(df,"volume", ops.adv, 30), ops.rolling_corr, int(9.61331))
+            b = _ts2(df, _ts(df, (df["high"]+df["low"])/2, ops.ts_rank, int(3.70596)), _g(df,"volume", ops.ts_rank, int(10.1595)),
+                     ops.rolling_corr, int(7.11408))
+            val = _cs_rank(df, a) ** _cs_rank(df, b)
             return Factor.as_cs_series(df, val)
         except Exception as e:
             raise RuntimeError(f"计算Alpha085因子时发生错误: {str(e)}") from e
@@ -1952,9 +2139,10 @@ class Alpha086(Factor):
             因子值的Series
         """
         try:
-            a = _g(df,"close", lambda s: ops.ts_rank(ops.rolling_corr(s, _g(df,"volume", lambda s2: ops.adv(s2,20)) .groupby(level=0, group_keys=False) if False else _g(df,"volume", lambda s2: ops.adv(s2,20)), int(6.00049)), int(20.4195)))
-            b = ops.cs_rank((df["open"] + df["close"]) - (df["vwap"] + df["open"]))
-            val = (a < b).astype(float) * -1
+            adv20 = _g(df,"volume", ops.adv, 20)
+            a = _ts(df, _ts2(df, "close", adv20, ops.rolling_corr, int(6.00049)), ops.ts_rank, int(20.4195))
+            b = _cs_rank(df, (df["open"] + df["close"]) - (df["vwap"] + df["open"]))
+            val = _less(df, a, b, negate=True)
             return Factor.as_cs_series(df, val)
         except Exception as e:
             raise RuntimeError(f"计算Alpha086因子时发生错误: {str(e)}") from e
@@ -1979,10 +2167,11 @@ class Alpha094(Factor):
             因子值的Series
         """
         try:
-            adv60 = _g(df,"volume", lambda s: ops.adv(s,60))
-            a = ops.cs_rank(df["vwap"] - _g(df,"vwap", lambda s: ops.rolling_min(s, int(11.5783))))
-            b = _g(df, None, lambda *_: ops.ts_rank(ops.rolling_corr(_g(df,"vwap", lambda s: ops.ts_rank(s, int(19.6462))),
-                                                                     _g(df,"volume", lambda s: ops.ts_rank(adv60, int(4.02992))), int(18.0926)), int(2.70756)))
+            adv60 = _g(df,"volume", ops.adv, 60)
+            a = _cs_rank(df, df["vwap"] - _g(df,"vwap", ops.rolling_min, int(11.5783)))
+            corr = _ts2(df, _g(df,"vwap", ops.ts_rank, int(19.6462)), _ts(df, adv60, ops.ts_rank, int(4.02992)),
+                        ops.rolling_corr, int(18.0926))
+            b = _ts(df, corr, ops.ts_rank, int(2.70756))
             val = (a ** b) * -1
             return Factor.as_cs_series(df, val)
         except Exception as e:
@@ -2008,10 +2197,10 @@ class Alpha095(Factor):
             因子值的Series
         """
         try:
-            a = ops.cs_rank(_g(df, None, lambda *_: ops.rolling_corr(_g(df,"close", lambda s: ops.rolling_sum((df["high"]+df["low"])/2, int(19.1351))),
-                                                                     _g(df,"volume", lambda s: ops.adv(s,40)), int(12.8742))) ** 5)
-            b = _g(df,"open", lambda s: ops.ts_rank(s - _g(df,"open", lambda s2: ops.rolling_min(s2, int(12.4105))), 1))
-            val = (ops.cs_rank(df["open"] - _g(df,"open", lambda s: ops.rolling_min(s, int(12.4105)))) < a).astype(float)
+            a = _cs_rank(df, _ts2(df, _ts(df, (df["high"]+df["low"])/2, ops.rolling_sum, int(19.1351)),
+                                  _g(df,"volume", ops.adv, 40), ops.rolling_corr, int(12.8742)) ** 5)
+            open_gap = df["open"] - _g(df,"open", ops.rolling_min, int(12.4105))
+            val = _less(df, _cs_rank(df, open_gap), a)
             return Factor.as_cs_series(df, val)
         except Exception as e:
             raise RuntimeError(f"计算Alpha095因子时发生错误: {str(e)}") from e
@@ -2025,6 +2214,7 @@ class Alpha096(Factor):
     """
     name = "Alpha096"
     requires = ["vwap","volume","close"]
+    ranks = ["close", "vwap", "volume"]
     def compute(self, df: pd.DataFrame) -> pd.Series:
         """
         计算Alpha096因子值。
@@ -2036,13 +2226,26 @@ class Alpha096(Factor):
             因子值的Series
         """
         try:
-            a = _g(df, None, lambda *_: ops.ts_rank(ops.decay_linear(ops.rolling_corr(ops.cs_rank(df["vwap"]), ops.cs_rank(df["volume"]), int(3.83878)), int(4.16783)), int(8.38151)))
-            b = _g(df, None, lambda *_: ops.ts_rank(ops.decay_linear(ops.ts_rank(_g(df,"close", lambda s: ops.rolling_corr(ops.cs_rank(s), _g(df,"volume", lambda s2: ops.adv(s2,60)), int(4.13242))), int(7.45404)), int(14.0365)), int(13.4143)))
+            close_rank = _cs_rank(df, "close")
+            adv60 = _g(df,"volume", ops.adv, 60)
+            corr_a = _ts2(df, _cs_rank(df, "vwap"), _cs_rank(df, "volume"), ops.rolling_corr, int(3.83878))
+            a = _ts(df, _ts(df, corr_a, ops.decay_linear, int(4.16783)), ops.ts_rank, int(8.38151))
+            corr_b = _ts2(df, close_rank, adv60, ops.rolling_corr, int(4.13242))
+            b = _ts(df, _ts(df, _ts(df, corr_b, ops.ts_rank, int(7.45404)), ops.decay_linear, int(14.0365)), ops.ts_rank, int(13.4143))
             val = - np.maximum(a, b)
             return Factor.as_cs_series(df, val)
         except Exception as e:
             raise RuntimeError(f"计算Alpha096因子时发生错误: {str(e)}") from e
 
+# Alpha098 的窗口：论文中的小数窗口按 int() 截断
+_A098_SUM = int(26.4719)
+_A098_CORR_A = int(4.58418)
+_A098_CORR_B = int(20.8187)
+_A098_ARGMIN = int(8.62571)
+_A098_RANK1 = int(6.95668)
+_A098_RANK2 = int(8.07206)
+
+
 @register
 class Alpha098(Factor):
     """
@@ -2053,6 +2256,7 @@ class Alpha098(Factor):
     """
     name = "Alpha098"
     requires = ["vwap","volume","open"]
+    ranks = ["open"]
     def compute(self, df: pd.DataFrame) -> pd.Series:
         """
         计算Alpha098因子值。
@@ -2064,9 +2268,10 @@ class Alpha098(Factor):
             因子值的Series
         """
         try:
-            adv5 = _g(df,"volume", lambda s: ops.adv(s,5))
-            a = ops.cs_rank(_g(df, None, lambda *_: ops.rolling_corr(df["vwap"], _g(df,"volume", lambda s: ops.rolling_sum(adv5, int(26.4719))), int(4.58418))))
-            b = _g(df, None, lambda *_: ops.ts_rank(ops.ts_rank(ops.argmin(ops.rolling_corr(ops.cs_rank(df["open"]), _g(df,"volume", lambda s: ops.adv(s,15)), int(20.8187))), int(6.95668)), int(8.07206))) if hasattr(np, "argmin") else a*0
+            adv5_sum = _ts(df, _g(df,"volume", ops.adv, 5), ops.rolling_sum, _A098_SUM)
+            a = _cs_rank(df, _ts2(df, "vwap", adv5_sum, ops.rolling_corr, _A098_CORR_A))
+            corr = _ts2(df, _cs_rank(df, "open"), _g(df,"volume", ops.adv, 15), ops.rolling_corr, _A098_CORR_B)
+            b = _ts(df, _ts(df, _ts(df, corr, ops.argmin, _A098_ARGMIN), ops.ts_rank, _A098_RANK1), ops.ts_rank, _A098_RANK2)
             val = a - b
             return Factor.as_cs_series(df, val)
         except Exception as e:
@@ -2092,9 +2297,10 @@ class Alpha099(Factor):
             因子值的Series
         """
         try:
-            a = _g(df, None, lambda *_: ops.rolling_corr(_g(df,"close", lambda s: ops.rolling_sum((df["high"]+df["low"])/2, int(19.8975))), _g(df,"volume", lambda s: ops.adv(s,60)), int(8.8136)))
-            b = _g(df, None, lambda *_: ops.rolling_corr(df["low"], df["volume"], int(6.28259)))
-            val = (ops.cs_rank(a) < ops.cs_rank(b)).astype(float) * -1
+            a = _ts2(df, _ts(df, (df["high"]+df["low"])/2, ops.rolling_sum, int(19.8975)), _g(df,"volume", ops.adv, 60),
+                     ops.rolling_corr, int(8.8136))
+            b = _ts2(df, "low", "volume", ops.rolling_corr, int(6.28259))
+            val = _less(df, _cs_rank(df, a), _cs_rank(df, b), negate=True)
             return Factor.as_cs_series(df, val)
         except Exception as e:
             raise RuntimeError(f"计算Alpha099因子时发生错误: {str(e)}") from e
@@ -3,24 +3,257 @@ import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parents[2]))
 
+import threading
+import weakref
+from collections import OrderedDict
 from abc import ABC, abstractmethod
+import numpy as np
 import pandas as pd
-from typing import List, Dict
+from typing import List, Dict, Tuple
+
+from alpha101_factory.config import PANEL_CACHE_MB
+from alpha101_factory.utils import ops
+
+def align_rows(values, index: pd.Index):
+    """把与 df 行对应的 Series 对齐到 df 的行顺序。
+
+    仅当 values 的索引是 index 的一个排列（等长、标签唯一且全部出现在 index 中，
+    如按 symbol 分组后拼接的结果）时按标签重排；其他情况（默认 RangeIndex、
+    MultiIndex、标签不匹配等）一律按位置对齐，与 `.values` 的行为一致。
+
+    Args:
+        values: Series 或与 df 等长的数组。
+        index (pd.Index): df 的行索引。
+
+    Returns:
+        与 df 行顺序一致的 Series 或原数组。
+    """
+    if not isinstance(values, pd.Series):
+        return values
+    vi = values.index
+    if vi.equals(index) or isinstance(vi, (pd.RangeIndex, pd.MultiIndex)) \
+            or len(vi) != len(index) or not vi.is_unique or not index.is_unique:
+        return values.to_numpy()
+    if (index.get_indexer(vi) < 0).any():
+        return values.to_numpy()
+    return values.reindex(index)
+
 
 class Factor(ABC):
     """Factor base class."""
     name: str = "BaseFactor"
     # 需要的列（K线/中间变量）
     requires: List[str] = []
+    # 内核精度：默认 float32（因子值只用于排序，低位精度无关紧要）；置 True 以 float64 计算便于核对。
+    # 注意：长表加载时原始行情列已降为 float32（见 `compute_factor._PRICE_COLS`），fp64 因子拿到的
+    # 是 float32 舍入后的价格，只是内核以 float64 累加，并不能恢复输入精度
+    fp64: bool = False
+    # 用到的列滞后 (列名, 期数)；批量计算前统一预计算，多个因子共用同一份结果
+    delays: List[Tuple[str, int]] = []
+    # 用到的列截面排名（列名）；同上，批量计算前统一预计算
+    ranks: List[str] = []
+    # 用到的其他列上时序算子 (列名, ops 算子, *参数)，如 ("close", ops.delta, 1)；同上
+    common: List[tuple] = []
 
     @abstractmethod
     def compute(self, df: pd.DataFrame) -> pd.Series:
         """输入为长表（索引：datetime，列含 symbol），返回因子值（Series，MultiIndex: [datetime, symbol]）"""
         raise NotImplementedError
 
+    @staticmethod
+    def get_delay(df: pd.DataFrame, col: str, k: int) -> pd.Series:
+        """按symbol分组的 delay(df[col], k)，与df行对齐；结果在 Panel 上缓存，见 `prewarm_panel`。"""
+        panel = Panel.of(df)
+        return panel.series(panel.ts(col, ops.delay_grouped, k))
+
     @staticmethod
     def as_cs_series(df: pd.DataFrame, values: pd.Series) -> pd.Series:
-        # 统一 MultiIndex 截面索引
-        idx = pd.MultiIndex.from_frame(df[["datetime","symbol"]], names=["datetime","symbol"])
-        out = pd.Series(values.values, index=idx, name="value")
+        # 统一 MultiIndex 截面索引（每份 df 只构造一次，缓存在 Panel 上）
+        out = pd.Series(np.asarray(align_rows(values, df.index)), index=Panel.of(df).cs_index,
+                        name="value")
+        return out
+
+
+class Panel:
+    """长表的按symbol分块视图。
+
+    对同一个 DataFrame 只计算一次分组布局（行号排列 + 块边界），并缓存按块排列的列，
+    供各因子的时序计算直接按 offsets 切片，不再每次调用 groupby。
+    `ts` 还会缓存列上的时序算子结果，同一份 df 上重复出现的子表达式
+    （如多个因子共用的 adv20、rolling_sum(close, 5)）只计算一次。
+
+    Notes:
+        - 按 id(df) 缓存，df 被回收时自动清除；
+        - 缓存期间 df 视为只读（原地修改列不会反映到已缓存的列上）；
+        - 多线程共享同一份 df 时是线程安全的；
+        - 算子结果缓存按 LRU 淘汰，总量上限为 `PANEL_CACHE_MB`。
+    """
+    _cache: Dict[int, "Panel"] = {}
+    _cache_lock = threading.Lock()
+
+    def __init__(self, df: pd.DataFrame):
+        self._df = weakref.ref(df)
+        self.index = df.index
+        self.order, self.offsets = ops.group_layout(df["symbol"])
+        self._cols: Dict[tuple, np.ndarray] = {}
+        self._labels = None
+        self._dates = None
+        self._cs_index = None
+        self._memo: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._memo_bytes = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def of(cls, df: pd.DataFrame) -> "Panel":
+        """获取 df 对应的 Panel（按 id 缓存）。"""
+        key = id(df)
+        with cls._cache_lock:
+            panel = cls._cache.get(key)
+        if panel is not None and panel._df() is df:
+            return panel
+        panel = cls(df)
+        with cls._cache_lock:
+            cls._cache[key] = panel
+            weakref.finalize(df, cls._cache.pop, key, None)
+        return panel
+
+    @property
+    def dates(self) -> tuple:
+        """按 datetime 分块的布局 (order, offsets)，供截面计算使用。"""
+        if self._dates is None:
+            self._dates = ops.group_layout(self._df()["datetime"])
+        return self._dates
+
+    @property
+    def cs_index(self) -> pd.MultiIndex:
+        """与 df 行一一对应的 [datetime, symbol] MultiIndex（惰性构造一次）。"""
+        if self._cs_index is None:
+            df = self._df()
+            idx = pd.MultiIndex.from_frame(df[["datetime", "symbol"]], names=["datetime", "symbol"])
+            with self._lock:
+                if self._cs_index is None:
+                    self._cs_index = idx
+        return self._cs_index
+
+    def cs(self, x, kernel, *args) -> np.ndarray:
+        """按日期分块对列名或与 df 行对齐的序列调用截面内核。
+
+        Args:
+            x: 列名，或与 df 行对齐的 Series/数组。
+            kernel: 签名为 kernel(values, offsets, *args) 的分块内核（如 `ops.cs_rank_grouped`）。
+            *args: 传递给内核的额外参数。
+
+        Returns:
+            np.ndarray: 按 df 行顺序排列的结果；x 为列名时与 `ts` 共用缓存（只读）。
+        """
+        order, offsets = self.dates
+        if isinstance(x, str):
+            key = ("cs", x, kernel, args, ops.float_dtype())
+            return self._memoized(key, lambda: self.cs(self._df()[x], kernel, *args))
+        x = align_rows(x, self.index)
+        res = kernel(np.asarray(x, dtype=ops.float_dtype())[order], offsets, *args)
+        out = np.empty_like(res)
+        out[order] = res
+        return out
+
+    @property
+    def labels(self) -> pd.Index:
+        """按块排列后的行索引（与 `col` 返回的数组一一对应）。"""
+        if self._labels is None:
+            self._labels = self.index[self.order]
+        return self._labels
+
+    def col(self, name: str, dtype=None) -> np.ndarray:
+        """返回按块连续排列的列数组（dtype 默认取 ops 当前工作精度）。"""
+        dtype = np.dtype(dtype or ops.float_dtype())
+        key = (name, dtype)
+        arr = self._cols.get(key)
+        if arr is None:
+            arr = np.ascontiguousarray(self._df()[name].to_numpy(dtype=dtype)[self.order])
+            with self._lock:
+                arr = self._cols.setdefault(key, arr)
+        return arr
+
+    def take(self, values) -> np.ndarray:
+        """将与 df 行对齐的 Series/数组排成按块连续的数组。"""
+        arr = np.asarray(align_rows(values, self.index), dtype=ops.float_dtype())
+        return np.ascontiguousarray(arr[self.order])
+
+    def ts(self, x, kernel, *args) -> np.ndarray:
+        """对列名或与 df 行对齐的序列调用分组内核，返回按块排列的结果。
+
+        Args:
+            x: 列名，或与 df 行对齐的 Series/数组。
+            kernel: 签名为 kernel(values, offsets, *args) 的分组内核（见 `ops.grouped_kernel`）。
+            *args: 传递给内核的额外参数（需可哈希）。
+
+        Returns:
+            np.ndarray: 按块排列的只读结果；x 为列名时按 (列名, 内核, 参数, 精度) 缓存。
+        """
+        if not isinstance(x, str):
+            return kernel(self.take(x), self.offsets, *args)
+        key = (x, kernel, args, ops.float_dtype())
+        return self._memoized(key, lambda: kernel(self.col(x), self.offsets, *args))
+
+    def _memoized(self, key: tuple, compute) -> np.ndarray:
+        """按 key 读取算子结果缓存，未命中时调用 compute() 计算并写入（LRU，总量上限 `PANEL_CACHE_MB`）。"""
+        with self._lock:
+            out = self._memo.get(key)
+            if out is not None:
+                self._memo.move_to_end(key)
+                return out
+        out = compute()
+        out.setflags(write=False)
+        with self._lock:
+            if key not in self._memo:
+                self._memo[key] = out
+                self._memo_bytes += out.nbytes
+                while self._memo_bytes > PANEL_CACHE_MB * 2**20 and len(self._memo) > 1:
+                    _, old = self._memo.popitem(last=False)
+                    self._memo_bytes -= old.nbytes
+        return out
+
+    def to_native(self, values: np.ndarray) -> np.ndarray:
+        """将按块排列的结果还原为 df 的行顺序。"""
+        out = np.empty_like(values)
+        out[self.order] = values
         return out
+
+    def series(self, values: np.ndarray, name=None) -> pd.Series:
+        """将按块排列的结果还原为与 df 索引对齐的 Series。"""
+        return pd.Series(self.to_native(values), index=self.index, name=name)
+
+
+def prewarm_panel(df: pd.DataFrame, factors) -> int:
+    """预计算一组因子声明的共用中间结果，写入 df 对应 Panel 的缓存。
+
+    包括列滞后（`Factor.delays`）、列的截面排名（`Factor.ranks`）与列上的其他时序算子
+    （`Factor.common`）各自的并集，各按因子的工作精度计算一次。
+
+    Args:
+        df (pd.DataFrame): 因子计算所用的长表。
+        factors: 因子类或实例的可迭代对象。
+
+    Returns:
+        int: 预计算的结果数量。
+    """
+    delays, ranks, common = set(), set(), set()
+    for fac in factors:
+        dtype = np.dtype(np.float64 if fac.fp64 else np.float32)
+        delays.update((col, int(k), dtype) for col, k in fac.delays if col in df.columns)
+        ranks.update((col, dtype) for col in fac.ranks if col in df.columns)
+        for col, fn, *args in fac.common:
+            kernel = ops.grouped_kernel(fn)
+            if kernel is not None and col in df.columns:
+                common.add((col, kernel, tuple(args), dtype))
+    panel = Panel.of(df)
+    for col, k, dtype in sorted(delays, key=lambda t: (t[0], t[1], t[2].itemsize)):
+        with ops.precision(dtype):
+            panel.ts(col, ops.delay_grouped, k)
+    for col, dtype in sorted(ranks, key=lambda t: (t[0], t[1].itemsize)):
+        with ops.precision(dtype):
+            panel.cs(col, ops.cs_rank_grouped)
+    for col, kernel, args, dtype in common:
+        with ops.precision(dtype):
+            panel.ts(col, kernel, *args)
+    return len(delays) + len(ranks) + len(common)
@@ -4,16 +4,18 @@
 
 本模块主要提供以下功能：
 1. 通过装饰器 `@register` 注册自定义因子类；
-2. 自动发现并加载 `alpha101_factory.factors` 包下的所有因子模块
-   （排除 `base.py` 与 `registry.py`，避免循环依赖）；
+2. 自动发现并按需加载 `alpha101_factory.factors` 包下的因子模块
+   （排除 `base.py`、`registry.py` 与 `tmp_features.py`）：`get_factor` 找到目标因子即停止导入，
+   `list_factors` 才会加载全部模块；
 3. 提供统一接口 `get_factor` 与 `list_factors` 来获取已注册的因子。
 
 该设计有助于实现因子库的模块化与可扩展性，便于在回测框架中动态调用。
 """
 
 import sys
+import threading
 from pathlib import Path
-from typing import Dict, Type
+from typing import Dict, List, Optional, Type
 import importlib
 import pkgutil
 
@@ -31,7 +33,11 @@ except ImportError as e:
 
 # ===== 全局注册表 =====
 _REGISTRY: Dict[str, Type[Factor]] = {}   # 存放因子名称 -> 因子类 的映射
-_LOADED: bool = False                    # 标记因子模块是否已加载
+_PENDING: Optional[List[str]] = None     # 尚未导入的因子模块（None 表示尚未扫描）
+_LOAD_LOCK = threading.Lock()
+
+# 不含因子定义的模块，扫描时跳过
+_SKIP_MODULES = ("base", "registry", "tmp_features")
 
 
 def register(cls: Type[Factor]) -> Type[Factor]:
@@ -56,41 +62,46 @@ def register(cls: Type[Factor]) -> Type[Factor]:
     return cls
 
 
-def _ensure_loaded() -> None:
-    """确保因子模块已加载。
+def _load_next() -> bool:
+    """导入下一个尚未加载的因子模块，使其中的 `@register` 生效。
 
-    使用 `pkgutil.iter_modules` 动态发现并导入 `alpha101_factory.factors`
-    包下的所有模块（除 base 与 registry），以便自动完成因子注册。
+    首次调用时用 `pkgutil.iter_modules` 扫描 `alpha101_factory.factors` 包。
+
+    Returns:
+        bool: 导入了一个模块返回 True；所有模块均已加载返回 False。
 
     Raises:
-        RuntimeError: 若包加载或模块导入过程中出现错误。
+        RuntimeError: 若包加载或扫描过程中出现错误。
     """
-    global _LOADED
-    if _LOADED:
-        return
-
-    try:
-        # 导入父包 alpha101_factory.factors
-        package = importlib.import_module(__package__)
-    except Exception as e:
-        raise RuntimeError(f"无法导入因子包 {__package__}") from e
-
-    try:
-        for _, mod_name, ispkg in pkgutil.iter_modules(package.__path__):
-            if ispkg:
-                continue
-            if mod_name in ("base", "registry"):
-                continue
+    global _PENDING
+    with _LOAD_LOCK:
+        if _PENDING is None:
             try:
-                # 动态导入模块，例如 alpha101_factory.factors.alphas_basic
-                importlib.import_module(f"{__package__}.{mod_name}")
-            except Exception as inner_e:
-                # 出现错误时不中断整体流程，仅打印警告
-                print(f"[警告] 无法加载模块 {mod_name}: {inner_e}")
-    except Exception as e:
-        raise RuntimeError("扫描因子包时出错，请检查包路径与模块定义") from e
+                # 导入父包 alpha101_factory.factors
+                package = importlib.import_module(__package__)
+            except Exception as e:
+                raise RuntimeError(f"无法导入因子包 {__package__}") from e
+            try:
+                _PENDING = [mod_name for _, mod_name, ispkg in pkgutil.iter_modules(package.__path__)
+                            if not ispkg and mod_name not in _SKIP_MODULES]
+            except Exception as e:
+                raise RuntimeError("扫描因子包时出错，请检查包路径与模块定义") from e
+        if not _PENDING:
+            return False
+        mod_name = _PENDING.pop(0)
+        try:
+            # 动态导入模块，例如 alpha101_factory.factors.alphas_basic
+            importlib.import_module(f"{__package__}.{mod_name}")
+        except Exception as inner_e:
+            # 出现错误时不中断整体流程，仅打印警告
+            print(f"[警告] 无法加载模块 {mod_name}: {inner_e}")
+        return True
+
 
-    _LOADED = True
+def _ensure_loaded() -> None:
+    """确保所有因子模块均已加载。"""
+    while _load_next():
+        pass
 
 
 def get_factor(name: str) -> Type[Factor]:
@@ -105,7 +116,9 @@ def get_factor(name: str) -> Type[Factor]:
     Raises:
         KeyError: 若因子名称不存在于注册表。
     """
-    _ensure_loaded()
+    # 逐个导入因子模块，找到即停止
+    while name not in _REGISTRY and _load_next():
+        pass
     if name not in _REGISTRY:
         raise KeyError(f"未找到因子: {name}")
     return _REGISTRY[name]
@@ -13,10 +13,18 @@
 
 import sys
 from pathlib import Path
+from typing import Optional
+import numpy as np
 import pandas as pd
 from loguru import logger
 from tqdm import tqdm
 
+try:
+    import pyarrow.dataset as pads
+    _PA = True
+except Exception:
+    _PA = False
+
 # 确保可以从项目根目录导入模块
 try:
     sys.path.append(str(Path(__file__).resolve().parents[2]))
@@ -24,13 +32,27 @@ except Exception as e:
     raise RuntimeError("无法设置 sys.path，请检查项目目录结构") from e
 
 # 项目内部依赖
-from alpha101_factory.config import PARQ_DIR_KLINES, PARQ_DIR_TMP, START_DATE, END_DATE, ADJUST
+from alpha101_factory.config import PARQ_DIR_KLINES, PARQ_DIR_TMP, START_DATE, END_DATE, ADJUST, CPU_WORKERS
 from alpha101_factory.utils.io import read_parquet, write_parquet
+from alpha101_factory.utils.log import setup_logger
+from alpha101_factory.utils.parallel import run_spawned
 from alpha101_factory.utils import ops
 
 # 定义常用 ADV 窗口
 ADV_WINDOWS = [5, 10, 20, 30, 40, 60, 120, 150, 180]
 
+# 以 float32 保存的派生特征列；因子值只用于排序，float32 精度足够，且读写与计算的数据量减半。
+# 原始 OHLCV/amount 在 tmp 文件中保持原精度，不在此列出；加载长表时只按 (symbol, datetime) 合并，
+# 随后由 `compute_factor._load_join` 统一降为 float32（见 `_PRICE_COLS`）。
+FLOAT32_COLS = ["returns", "vwap", *[f"adv{n}" for n in ADV_WINDOWS]]
+
+
+def _tmp_path(sym: str) -> Path:
+    """单只股票 tmp 文件的路径（是否带日期与复权标记取决于配置）。"""
+    if START_DATE and END_DATE:
+        return PARQ_DIR_TMP / f"{sym}_{START_DATE}_{END_DATE}_{ADJUST}.parquet"
+    return PARQ_DIR_TMP / f"{sym}.parquet"
+
 
 def build_tmp_for_symbol(sym: str) -> bool:
     """为单只股票构建中间特征文件 (tmp parquet)。
@@ -43,7 +65,7 @@ def build_tmp_for_symbol(sym: str) -> bool:
 
     Notes:
         - 必需字段: ["open","high","low","close","volume","amount","datetime","symbol"]
-        - 生成特征: 收益率、VWAP、不同窗口的 ADV
+        - 生成特征: 收益率、VWAP、不同窗口的 ADV（以 float32 保存，见 `FLOAT32_COLS`）
     """
     path_k = PARQ_DIR_KLINES / f"{sym}_{START_DATE}_{END_DATE}_{ADJUST}.parquet" if START_DATE and END_DATE else PARQ_DIR_KLINES / f"{sym}.parquet"
     try:
@@ -76,75 +98,133 @@ def build_tmp_for_symbol(sym: str) -> bool:
             df["close"], df["high"], df["low"], df["volume"], df["amount"]
         )
 
-        # 平均成交量 (ADV)
-        for n in ADV_WINDOWS:
-            df[f"adv{n}"] = ops.adv(df["volume"], n)
+        # 平均成交量 (ADV)：各窗口共用一次前缀和
+        for n, adv in ops.adv_many(df["volume"], ADV_WINDOWS).items():
+            df[f"adv{n}"] = adv
     except Exception as e:
         logger.error(f"计算特征失败: {sym}, 错误: {e}")
         return False
 
     # ===== 保存结果 =====
     try:
-        out = PARQ_DIR_TMP / f"{sym}_{START_DATE}_{END_DATE}_{ADJUST}.parquet" if START_DATE and END_DATE else PARQ_DIR_TMP / f"{sym}.parquet"
+        out = _tmp_path(sym)
         cols_to_save = [
             "symbol", "datetime", "open", "high", "low", "close",
             "volume", "amount", "returns", "vwap",
             *[f"adv{n}" for n in ADV_WINDOWS]
         ]
-        write_parquet(df[cols_to_save], out)
+        write_parquet(df[cols_to_save].astype({c: np.float32 for c in FLOAT32_COLS}), out)
         return True
     except Exception as e:
         logger.error(f"保存 tmp 文件失败: {sym}, 错误: {e}")
         return False
 
 
-def build_tmp_all(symbols: list[str]) -> int:
+def _build_one(sym: str) -> bool:
+    """`build_tmp_for_symbol` 的异常兜底包装，供进程池调用（须为模块级函数以便序列化）。"""
+    try:
+        return build_tmp_for_symbol(sym)
+    except Exception as e:
+        logger.error(f"处理股票 {sym} 失败: {e}")
+        return False
+
+
+def build_tmp_all(symbols: list[str], max_workers: Optional[int] = None) -> int:
     """批量构建多个股票的中间特征文件。
 
+    各股票的构建互不依赖（读 K 线 → 计算特征 → 写 tmp），按股票分发到进程池并行执行。
+
     Args:
         symbols (list[str]): 股票代码列表。
+        max_workers (Optional[int]): 进程数，默认取 `CPU_WORKERS`；为 1 时在当前进程内串行执行。
 
     Returns:
         int: 成功生成 tmp 文件的数量。
     """
-    cnt = 0
-    for sym in tqdm(symbols, desc="构建 tmp"):
+    workers = max(1, min(max_workers or CPU_WORKERS, len(symbols)))
+    results = None
+    if workers > 1:
+        chunksize = max(1, min(8, len(symbols) // (workers * 4)))
+        # 子进程中重新初始化日志，避免沿用父进程的 handler 导致重复输出
+        results = run_spawned(_build_one, symbols, workers, initializer=setup_logger,
+                              chunksize=chunksize, desc="构建 tmp", fallback="改为串行构建")
+    if results is None:
+        results = [_build_one(sym) for sym in tqdm(symbols, desc="构建 tmp")]
+    cnt = sum(bool(ok) for ok in results)
+    logger.info(f"成功保存 tmp 特征文件数量: {cnt}")
+    return cnt
+
+
+def _load_dataset(paths: list[Path], columns: Optional[list[str]]) -> pd.DataFrame:
+    """用 pyarrow.dataset 一次扫描多个 parquet 文件，在 Arrow 中排序后转为 pandas。"""
+    ds = pads.dataset([str(p) for p in paths], format="parquet")
+    table = ds.to_table(columns=columns)
+    table = table.sort_by([("datetime", "ascending"), ("symbol", "ascending")])
+    return table.to_pandas(self_destruct=True)
+
+
+def _load_concat(paths: list[Path], columns: Optional[list[str]]) -> pd.DataFrame:
+    """逐个读取 parquet 文件后 concat（无 pyarrow 或 dataset 读取失败时的回退路径）。"""
+    dfs = []
+    for p in paths:
         try:
-            ok = build_tmp_for_symbol(sym)
-            if ok:
-                cnt += 1
+            tmp = read_parquet(p)
         except Exception as e:
-            logger.error(f"处理股票 {sym} 失败: {e}")
+            logger.error(f"读取 tmp 文件失败: {p.name}, 错误: {e}")
             continue
-    logger.info(f"成功保存 tmp 特征文件数量: {cnt}")
-    return cnt
+        if tmp.empty:
+            continue
+        dfs.append(tmp if columns is None else tmp[[c for c in columns if c in tmp.columns]])
+    if not dfs:
+        return pd.DataFrame()
+    df = pd.concat(dfs, ignore_index=True)
+    return df.sort_values(["datetime", "symbol"])
 
 
-def load_panel(symbols: list[str]) -> pd.DataFrame:
+def load_panel(symbols: list[str], columns: Optional[list[str]] = None) -> pd.DataFrame:
     """合并多个股票的 tmp 文件，生成长表形式的 DataFrame。
 
     Args:
         symbols (list[str]): 股票代码列表。
+        columns (Optional[list[str]]): 只读取这些列（datetime、symbol 总会读取）；默认读取全部列。
 
     Returns:
-        pd.DataFrame: 合并后的长表数据，按 datetime 和 symbol 排序。
+        pd.DataFrame: 合并后的长表数据，按 datetime 和 symbol 排序，`FLOAT32_COLS` 为 float32，
+                      symbol 为有序分类类型，datetime 为 datetime64。
                       若所有股票均无数据，则返回空 DataFrame。
+
+    Notes:
+        - 优先用 pyarrow.dataset 一次读取全部文件并在 Arrow 中排序，避免逐个构造 DataFrame 再 concat；
+        - 各文件 schema 不一致等导致 dataset 读取失败时，回退为逐个读取。
     """
-    dfs = []
+    paths = []
     for sym in symbols:
-        p = PARQ_DIR_TMP / f"{sym}_{START_DATE}_{END_DATE}_{ADJUST}.parquet" if START_DATE and END_DATE else PARQ_DIR_TMP / f"{sym}.parquet"
+        p = _tmp_path(sym)
+        if p.exists():
+            paths.append(p)
+        else:
+            logger.warning(f"文件不存在: {p}")
+    if columns is not None:
+        columns = ["datetime", "symbol", *[c for c in dict.fromkeys(columns) if c not in ("datetime", "symbol")]]
+
+    df = pd.DataFrame()
+    if paths and _PA:
         try:
-            tmp = read_parquet(p)
+            df = _load_dataset(paths, columns)
         except Exception as e:
-            logger.error(f"读取 tmp 文件失败: {sym}, 错误: {e}")
-            continue
-        if tmp.empty:
-            continue
-        dfs.append(tmp)
+            logger.warning(f"pyarrow.dataset 读取失败，改为逐个读取: {e}")
+            df = _load_concat(paths, columns)
+    elif paths:
+        df = _load_concat(paths, columns)
 
-    if not dfs:
+    if df.empty:
         logger.warning("未加载到任何 tmp 文件，返回空 DataFrame")
         return pd.DataFrame()
 
-    df = pd.concat(dfs, ignore_index=True)
-    return df.sort_values(["datetime", "symbol"]).reset_index(drop=True)
+    # 旧版本生成的 tmp 文件可能仍为 float64，统一为 float32
+    df = df.astype({c: np.float32 for c in FLOAT32_COLS if c in df.columns and df[c].dtype != np.float32})
+    # symbol 转为有序分类（整数编码），后续分组与排序不再逐个比较字符串
+    df["symbol"] = pd.Categorical(df["symbol"], categories=sorted(df["symbol"].unique()), ordered=True)
+    if not pd.api.types.is_datetime64_dtype(df["datetime"]):
+        df["datetime"] = pd.to_datetime(df["datetime"])
+    return df.reset_index(drop=True)
@@ -6,17 +6,24 @@
 1. 加载指定股票的 K线数据与临时特征数据（tmp features），并进行合并；
 2. 动态获取因子类，调用其 `compute` 方法计算因子值；
 3. 将计算结果保存为 Parquet 文件，存放在 `PARQ_DIR_FACT` 目录下；
-4. 提供 main 函数批量计算一组常见 Alpha 因子。
+4. 提供 main 函数批量计算一组常见 Alpha 因子（数据加载一次，因子间线程并行）。
+5. 已持有长表的调用方可直接用 `compute_and_save_df` 逐个计算，避免重复加载。
 
 适用于量化回测与因子库管理，确保数据处理与因子生成自动化。
 """
 
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
 import pandas as pd
 from loguru import logger
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Set, Tuple
 
 from alpha101_factory.utils.log import setup_logger
+from alpha101_factory.utils.parallel import run_spawned
 from alpha101_factory.config import (
     PARQ_DIR_KLINES,
     PARQ_DIR_TMP,
@@ -24,60 +31,322 @@ from alpha101_factory.config import (
     START_DATE,
     END_DATE,
     ADJUST,
+    CPU_WORKERS,
+    IO_WORKERS,
 )
-from alpha101_factory.utils.io import read_parquet, write_parquet
+from alpha101_factory.utils.io import read_parquet_mmap, read_table_mmap, write_parquet, write_table
 from alpha101_factory.factors.registry import get_factor
+from alpha101_factory.factors.base import Panel, prewarm_panel
+from alpha101_factory.utils import ops
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as pads
+    _PA = True
+except Exception:
+    _PA = False
+
+try:
+    import polars as pl
+    _PL = True
+except Exception:
+    _PL = False
+
+
+# K线表与 tmp 表按 (symbol, datetime) 外连接；tmp 表中与 K线重复的 OHLCV 列由同一份 K线生成、
+# 逐值相同，连接前直接丢弃，不再参与键比较
+_JOIN_KEYS = ["symbol", "datetime"]
+# 加载后统一降为 float32 的原始行情列：因子默认以 float32 计算（见 `Factor.fp64`），
+# 长表以 float32 常驻可使各算子读取的数据量减半
+_PRICE_COLS = ["open", "high", "low", "close", "volume", "amount"]
+
+
+def _file_suffix() -> str:
+    """K线/tmp 文件名中股票代码之后的部分（是否加上日期与复权标记取决于配置）。"""
+    if START_DATE and END_DATE:
+        return f"_{START_DATE}_{END_DATE}_{ADJUST}.parquet"
+    return ".parquet"
+
+
+def _paths(sym: str) -> Tuple[Path, Path]:
+    """单只股票的 (K线, tmp) 文件路径。"""
+    name = f"{sym}{_file_suffix()}"
+    return PARQ_DIR_KLINES / name, PARQ_DIR_TMP / name
+
+
+def _scan_symbols(directory: Path) -> Set[str]:
+    """用一次 os.scandir 列出目录中按当前配置命名的 parquet 文件对应的股票代码。"""
+    suffix = _file_suffix()
+    try:
+        with os.scandir(directory) as it:
+            return {e.name[:-len(suffix)] for e in it
+                    if e.name.endswith(suffix) and len(e.name) > len(suffix) and e.is_file()}
+    except OSError as e:
+        logger.warning(f"无法列出目录 {directory}: {e}")
+        return set()
+
+
+def _keep(name: str, columns: Optional[List[str]]) -> bool:
+    """列是否需要读取：连接键总会读取，columns 为 None 时读取全部列。"""
+    return name in _JOIN_KEYS or columns is None or name in columns
+
+
+def _load_one(sym: str, columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+    """读取单只股票的 K线与 tmp 表并合并；无数据或读取失败时返回 None。"""
+    try:
+        kline_path, tmp_path = _paths(sym)
+        k = read_parquet_mmap(kline_path, None if columns is None else [*_JOIN_KEYS, *columns])
+        t = read_parquet_mmap(tmp_path, None if columns is None else [*_JOIN_KEYS, *columns])
+
+        if k.empty or t.empty:
+            return None
+
+        # 外连接合并，保留所有信息
+        t = t[[c for c in t.columns if c in _JOIN_KEYS or c not in k.columns]]
+        return pd.merge(k, t, on=_JOIN_KEYS, how="outer", sort=True)
+    except Exception as e:
+        logger.error(f"加载或合并数据失败: {sym}, 错误: {e}")
+        return None
+
+
+def _load_one_arrow(sym: str, columns: Optional[List[str]] = None):
+    """`_load_one` 的 Arrow 版本：读取并在 Arrow 中连接单只股票的两张表；无数据或失败时返回 None。"""
+    try:
+        kline_path, tmp_path = _paths(sym)
+        k = read_table_mmap(kline_path, None if columns is None else [*_JOIN_KEYS, *columns])
+        t = read_table_mmap(tmp_path, None if columns is None else [*_JOIN_KEYS, *columns])
+        if k is None or t is None or k.num_rows == 0 or t.num_rows == 0:
+            return None
+        t = t.select([c for c in t.column_names if c in _JOIN_KEYS or c not in k.column_names])
+        return k.join(t, keys=_JOIN_KEYS, join_type="full outer")
+    except Exception as e:
+        logger.error(f"加载或合并数据失败: {sym}, 错误: {e}")
+        return None
+
+
+def _load_dataset(symbols: List[str], columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """用 pyarrow.dataset 一次扫描全部 K线与 tmp 文件，在 Arrow 中连接、排序后转为 pandas。"""
+    pairs = [_paths(sym) for sym in symbols]
+    if not pairs:
+        return pd.DataFrame()
+    k_ds = pads.dataset([str(k) for k, _ in pairs], format="parquet")
+    klines = k_ds.to_table(columns=[c for c in k_ds.schema.names if _keep(c, columns)], use_threads=True)
+    tmp_ds = pads.dataset([str(t) for _, t in pairs], format="parquet")
+    cols = [c for c in tmp_ds.schema.names
+            if c in _JOIN_KEYS or (_keep(c, columns) and c not in klines.column_names)]
+    tmp = tmp_ds.to_table(columns=cols, use_threads=True)
+    table = klines.join(tmp, keys=_JOIN_KEYS, join_type="full outer", use_threads=True)
+    table = table.sort_by([("datetime", "ascending"), ("symbol", "ascending")])
+    return table.to_pandas(self_destruct=True)
+
+
+def _load_polars(symbols: List[str], columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """用 polars 惰性扫描全部 K线与 tmp 文件，连接、排序由 Rust 多线程执行后转为 pandas。"""
+    pairs = [_paths(sym) for sym in symbols]
+    if not pairs:
+        return pd.DataFrame()
+    klines = pl.scan_parquet([str(k) for k, _ in pairs])
+    klines = klines.select([c for c in klines.collect_schema().names() if _keep(c, columns)])
+    tmp = pl.scan_parquet([str(t) for _, t in pairs])
+    k_cols = klines.collect_schema().names()
+    tmp = tmp.select([c for c in tmp.collect_schema().names()
+                      if c in _JOIN_KEYS or (_keep(c, columns) and c not in k_cols)])
+    out = (
+        klines.join(tmp, on=_JOIN_KEYS, how="full", coalesce=True)
+        .sort(["datetime", "symbol"])
+        .collect()
+    )
+    return out.to_pandas()
+
+
+def _load_threaded(symbols: List[str], columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """逐股票读取并合并（线程并发），无 pyarrow 或 dataset 读取失败时的回退路径。
+
+    有 pyarrow 时各股票的表保持为 Arrow 表，拼接只串联分块（不复制数据，各文件 schema 不一致时
+    放宽为兼容类型），排序后一次转为 pandas；否则逐股票合并 DataFrame 后 concat。
+    """
+    frames = []
+    workers = max(1, min(IO_WORKERS, len(symbols)))
+    load = _load_one_arrow if _PA else _load_one
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        futs = [ex.submit(load, sym, columns) for sym in symbols]
+        for fut in as_completed(futs):
+            m = fut.result()
+            if m is not None:
+                frames.append(m)
+    if not frames:
+        return pd.DataFrame()
+    if _PA:
+        table = pa.concat_tables(frames, promote_options="permissive")
+        table = table.sort_by([("datetime", "ascending"), ("symbol", "ascending")])
+        return table.to_pandas(split_blocks=True, self_destruct=True)
+    # 各股票的表已按 datetime 排好：按 symbol 顺序拼接后只需按 datetime 稳定排序，
+    # 同一时刻内保持 symbol 顺序；timsort 直接利用这些有序段，无需对两列做全量排序
+    frames.sort(key=lambda m: m["symbol"].iloc[0])
+    df = pd.concat(frames, ignore_index=True)
+    return df.sort_values("datetime", kind="stable")
 
 
-def _load_join(symbols: Optional[List[str]]) -> pd.DataFrame:
+def _load_join(symbols: Optional[List[str]], columns: Optional[List[str]] = None) -> pd.DataFrame:
     """加载并合并指定股票的 K线数据与临时特征表。
 
     Args:
         symbols (Optional[List[str]]): 股票代码列表；若为 None，则自动读取 tmp 目录中的全部股票。
+        columns (Optional[List[str]]): 只读取这些列（datetime、symbol 总会读取），见 `_needed_columns`；
+            默认读取全部列。
 
     Returns:
-        pd.DataFrame: 合并后的长表数据，按 [datetime, symbol] 排序。
+        pd.DataFrame: 合并后的长表数据，按 [datetime, symbol] 排序，OHLCV/amount 为 float32。
                       若无有效数据，返回空 DataFrame。
+
+    Notes:
+        - 安装了 polars 时优先用其惰性扫描（连接、排序在 Rust 中多线程执行）；
+        - 否则用 pyarrow.dataset 一次扫描全部文件，在 Arrow 中完成连接与排序，避免 N 次 pandas 合并；
+        - 各文件 schema 不一致等导致失败时，回退为逐股票读取（`IO_WORKERS` 个线程并发）；
+        - 两个目录各只列一次（`_scan_symbols`），缺少任一文件的股票直接跳过，不再逐个探测文件是否存在。
     """
+    tmp_syms = _scan_symbols(PARQ_DIR_TMP)
     if symbols is None:
-        symbols = sorted({p.stem for p in (PARQ_DIR_TMP).glob("*.parquet")})
+        symbols = sorted(tmp_syms)
+    available = tmp_syms & _scan_symbols(PARQ_DIR_KLINES)
+    missing = [sym for sym in symbols if sym not in available]
+    if missing:
+        logger.warning(f"{len(missing)} 只股票缺少 K线或 tmp 文件，已跳过: {missing[:10]}")
+    symbols = [sym for sym in symbols if sym in available]
 
-    dfs = []
-    for sym in symbols:
+    df = pd.DataFrame()
+    if _PL:
+        try:
+            df = _load_polars(symbols, columns)
+        except Exception as e:
+            logger.warning(f"polars 读取失败，改用 pyarrow: {e}")
+    if df.empty and _PA:
         try:
-            # 动态选择文件路径（是否加上日期与复权标记）
-            if START_DATE and END_DATE:
-                kline_path = PARQ_DIR_KLINES / f"{sym}_{START_DATE}_{END_DATE}_{ADJUST}.parquet"
-                tmp_path = PARQ_DIR_TMP / f"{sym}_{START_DATE}_{END_DATE}_{ADJUST}.parquet"
-            else:
-                kline_path = PARQ_DIR_KLINES / f"{sym}.parquet"
-                tmp_path = PARQ_DIR_TMP / f"{sym}.parquet"
-
-            k = read_parquet(kline_path)
-            t = read_parquet(tmp_path)
-
-            if k.empty or t.empty:
-                continue
-
-            # 外连接合并，保留所有信息
-            m = pd.merge(
-                k,
-                t,
-                on=["symbol", "datetime", "open", "high", "low", "close", "volume", "amount"],
-                how="outer",
-                sort=True,
-            )
-            dfs.append(m)
+            df = _load_dataset(symbols, columns)
         except Exception as e:
-            logger.error(f"加载或合并数据失败: {sym}, 错误: {e}")
-            continue
+            logger.warning(f"pyarrow.dataset 读取失败，改为逐个读取: {e}")
+            df = _load_threaded(symbols, columns)
+    elif df.empty:
+        df = _load_threaded(symbols, columns)
 
-    if not dfs:
+    if df.empty:
         logger.warning("未加载到任何有效数据。")
         return pd.DataFrame()
+    df = df.astype({c: np.float32 for c in _PRICE_COLS if c in df.columns and df[c].dtype != np.float32})
+    return df.reset_index(drop=True)
+
+
+def _needed_columns(classes) -> Optional[List[str]]:
+    """一组因子声明的输入列（`Factor.requires`）的并集；有因子未声明时返回 None（读取全部列）。"""
+    cols = {}
+    for cls in classes:
+        if not cls.requires:
+            return None
+        cols.update(dict.fromkeys(cls.requires))
+    return list(cols)
+
+
+def _key_table(df: pd.DataFrame):
+    """将 [datetime, symbol] 两列转为 Arrow 表，供各因子的输出共用（无 pyarrow 时返回 None）。"""
+    if not _PA:
+        return None
+    try:
+        return pa.Table.from_pandas(df[["datetime", "symbol"]], preserve_index=False)
+    except Exception as e:
+        logger.warning(f"构造共享键表失败，改为逐因子 reset_index: {e}")
+        return None
+
+
+def _compute_only(factor_name: str, df: pd.DataFrame) -> Optional[pd.Series]:
+    """在已加载的长表上计算单个因子（按因子的工作精度），失败时记录日志并返回 None。"""
+    try:
+        FactorCls = get_factor(factor_name)  # 动态获取因子类
+    except Exception as e:
+        logger.error(f"获取因子类失败: {factor_name}, 错误: {e}")
+        return None
+
+    try:
+        fac = FactorCls()
+        with ops.precision(np.float64 if fac.fp64 else np.float32):
+            return fac.compute(df)  # 结果为 MultiIndex: [datetime, symbol]
+    except Exception as e:
+        logger.error(f"因子 {factor_name} 计算失败: {e}")
+        return None
 
-    df = pd.concat(dfs, ignore_index=True)
-    return df.sort_values(["datetime", "symbol"]).reset_index(drop=True)
+
+def compute_and_save_df(factor_name: str, df: pd.DataFrame, keys=None) -> bool:
+    """在已加载的长表上计算单个因子并写出结果（不再重新加载数据）。
+
+    Args:
+        factor_name (str): 因子名称（需已注册到 registry）。
+        df (pd.DataFrame): `_load_join` 的结果；只读，多个线程可共享同一份。
+        keys: `_key_table(df)` 的结果；给出时因子值作为一列追加到共享键表后直接写出，
+              不再为每个因子 reset_index 重建 datetime/symbol 列。
+
+    Returns:
+        bool: 计算并保存成功返回 True。
+    """
+    s = _compute_only(factor_name, df)
+    if s is None:
+        return False
+
+    try:
+        out_path = PARQ_DIR_FACT / f"{factor_name}.parquet"
+        if keys is not None and len(s) == keys.num_rows and s.index is Panel.of(df).cs_index:
+            # as_cs_series 的结果按 df 行顺序排列，与共享键表逐行对应
+            write_table(keys.append_column("value", pa.array(s.to_numpy())), out_path)
+        else:
+            write_parquet(s.reset_index().rename(columns={0: "value"}), out_path)
+        logger.info(f"因子 {factor_name} 已保存至 {out_path}, 共 {len(s)} 行。")
+        return True
+    except Exception as e:
+        logger.error(f"保存因子 {factor_name} 失败: {e}")
+        return False
+
+
+# 进程池工作进程内共享的长表与键表（由 `_init_worker` 从 Arrow IPC 文件映射一次）
+_WORKER_DF: Optional[pd.DataFrame] = None
+_WORKER_KEYS = None
+
+
+def _spill_ipc(df: pd.DataFrame) -> str:
+    """将长表写为 Arrow IPC 文件（优先放在 /dev/shm 内存盘），供工作进程内存映射读取。"""
+    tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    fd, path = tempfile.mkstemp(prefix="alpha101_panel_", suffix=".arrow", dir=tmp_dir)
+    os.close(fd)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return path
+
+
+def _init_worker(path: str) -> None:
+    """工作进程初始化：重设日志，预热 numba 内核，内存映射读取共享长表（每个进程只读一次，不随任务序列化）。"""
+    global _WORKER_DF, _WORKER_KEYS
+    setup_logger()
+    ops.warmup_kernels()
+    with pa.memory_map(path) as src:
+        _WORKER_DF = pa.ipc.open_file(src).read_all().to_pandas()
+    _WORKER_KEYS = _key_table(_WORKER_DF)
+
+
+def _compute_one_factor(factor_name: str) -> bool:
+    """在工作进程的共享长表上计算并保存单个因子（须为模块级函数以便序列化）。"""
+    return compute_and_save_df(factor_name, _WORKER_DF, _WORKER_KEYS)
+
+
+def _run_processes(factor_names: List[str], df: pd.DataFrame, workers: int) -> Optional[int]:
+    """用进程池批量计算；进程池无法启动时返回 None，由调用方回退为线程池。"""
+    path = _spill_ipc(df)
+    try:
+        results = run_spawned(_compute_one_factor, factor_names, workers,
+                              initializer=_init_worker, initargs=(path,), fallback="改用线程池")
+        return None if results is None else sum(bool(ok) for ok in results)
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
 
 
 def compute_and_save(factor_name: str, symbols: Optional[List[str]] = None) -> None:
@@ -90,33 +359,82 @@ def compute_and_save(factor_name: str, symbols: Optional[List[str]] = None) -> N
     Side Effects:
         在 `PARQ_DIR_FACT` 目录下生成对应的因子结果文件。
     """
+    logger.info(f"开始计算因子 {factor_name}，股票范围: {('ALL' if symbols is None else len(symbols))}")
+
     try:
-        FactorCls = get_factor(factor_name)  # 动态获取因子类
-    except Exception as e:
-        logger.error(f"获取因子类失败: {factor_name}, 错误: {e}")
+        columns = _needed_columns([get_factor(factor_name)])
+    except Exception:
+        columns = None  # 由 compute_and_save_df 记录错误
+    df = _load_join(symbols, columns)
+    if df.empty:
+        logger.error("数据为空，请先运行 build_tmp 生成中间特征。")
         return
 
-    logger.info(f"开始计算因子 {factor_name}，股票范围: {('ALL' if symbols is None else len(symbols))}")
+    compute_and_save_df(factor_name, df)
+
+
+def compute_and_save_many(factor_names: List[str],
+                          symbols: Optional[List[str]] = None,
+                          max_workers: Optional[int] = None,
+                          executor: str = "thread") -> int:
+    """批量计算并保存多个因子：数据只加载一次，因子之间用线程池（或进程池）并行。
+
+    Args:
+        factor_names (List[str]): 因子名称列表。
+        symbols (Optional[List[str]]): 股票代码列表，若为 None 则处理全部股票。
+        max_workers (Optional[int]): 线程/进程数，默认取 `CPU_WORKERS`。
+        executor (str): "thread"（默认）或 "process"。进程池模式下长表写成 Arrow IPC 文件，
+            各工作进程内存映射读取一次，因子任务只传递名称。
+
+    Returns:
+        int: 成功保存的因子数量。
+
+    Notes:
+        - 各因子的 `compute` 只读共享的长表，互不依赖；
+        - 重计算集中在 numba (nogil) 内核与 NumPy/bottleneck 的 C 代码中，
+          这些代码执行时释放 GIL，因此线程可以真正并行；
+        - 进程池适合 GIL 内的 pandas 代码占比高的因子组合，但各进程的 Panel 缓存不共享，
+          也不做预计算；需要 pyarrow，且调用脚本须有 `if __name__ == "__main__":` 保护。
+    """
+    logger.info(f"开始批量计算 {len(factor_names)} 个因子，股票范围: {('ALL' if symbols is None else len(symbols))}")
 
-    df = _load_join(symbols)
+    classes = []
+    for name in factor_names:
+        try:
+            classes.append(get_factor(name))
+        except Exception:
+            continue  # 由 compute_and_save_df 记录错误
+
+    # 只读取这批因子声明用到的列
+    df = _load_join(symbols, _needed_columns(classes))
     if df.empty:
         logger.error("数据为空，请先运行 build_tmp 生成中间特征。")
-        return
+        return 0
 
-    try:
-        fac = FactorCls()
-        s = fac.compute(df)  # 结果为 MultiIndex: [datetime, symbol]
-    except Exception as e:
-        logger.error(f"因子 {factor_name} 计算失败: {e}")
-        return
+    workers = max(1, min(max_workers or CPU_WORKERS, len(factor_names)))
+    if executor == "process" and workers > 1 and _PA:
+        ok = _run_processes(factor_names, df, workers)
+        if ok is not None:
+            logger.info(f"批量计算完成：成功 {ok}/{len(factor_names)}")
+            return ok
 
-    try:
-        out = s.reset_index().rename(columns={0: "value"})
-        out_path = PARQ_DIR_FACT / f"{factor_name}.parquet"
-        write_parquet(out, out_path)
-        logger.info(f"因子 {factor_name} 已保存至 {out_path}, 共 {len(out)} 行。")
-    except Exception as e:
-        logger.error(f"保存因子 {factor_name} 失败: {e}")
+    # 先在主线程集中编译/加载 numba 内核，各线程不必在首个任务上排队等待编译
+    ops.warmup_kernels({np.float64 if cls.fp64 else np.float32 for cls in classes})
+    # 各因子共用的中间结果（Factor.delays / Factor.ranks / Factor.common）只计算一次
+    n_shared = prewarm_panel(df, classes)
+    logger.info(f"预计算共用中间结果 {n_shared} 个")
+
+    keys = _key_table(df)
+    ok = 0
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        futures = {ex.submit(compute_and_save_df, name, df, keys): name for name in factor_names}
+        for fut in as_completed(futures):
+            try:
+                ok += bool(fut.result())
+            except Exception as e:
+                logger.error(f"因子 {futures[fut]} 执行失败: {e}")
+    logger.info(f"批量计算完成：成功 {ok}/{len(factor_names)}")
+    return ok
 
 
 def main() -> None:
@@ -124,7 +442,7 @@ def main() -> None:
     setup_logger()
 
     # 自动扫描 tmp 目录下的股票池
-    symbols = sorted({p.stem for p in (PARQ_DIR_TMP).glob("*.parquet")})
+    symbols = sorted(_scan_symbols(PARQ_DIR_TMP))
     if not symbols:
         logger.error("未发现 tmp 文件，请先运行 build_tmp。")
         return
@@ -141,8 +459,7 @@ def main() -> None:
         "Alpha095", "Alpha096", "Alpha098", "Alpha099", "Alpha101",
     ]
 
-    for name in factor_list:
-        compute_and_save(name, symbols)
+    compute_and_save_many(factor_list, symbols)
 
 
 if __name__ == "__main__":
@@ -4,35 +4,152 @@ Parquet 文件读写工具模块
 
 本模块封装了对 Parquet 文件的常用读写操作：
 1. 提供 `read_parquet` 函数安全读取文件（若文件不存在则返回空 DataFrame）；
-2. 提供 `write_parquet` 函数安全写入文件（自动创建父目录）。
+2. 提供 `write_parquet` 函数安全写入文件（自动创建父目录）；
+3. 提供 `write_table` 函数直接写出 pyarrow.Table（不经 pandas 转换）；
+4. 提供 `read_parquet_mmap` / `read_table_mmap` 函数以内存映射方式读取（多进程共享操作系统页缓存）。
 
 适用于量化研究与数据处理中间结果的存取，增强了 I/O 操作的健壮性。
 """
 
 from pathlib import Path
+from typing import List, Optional
 import pandas as pd
 from loguru import logger
 
+from alpha101_factory.config import PREFER_POLARS
 
-def read_parquet(path: Path) -> pd.DataFrame:
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    _PA = True
+except Exception:
+    _PA = False
+
+try:
+    import polars as pl
+    _PL = True
+except Exception:
+    _PL = False
+
+# 写出参数：每个行组 128K 行、1MB 数据页、zstd 压缩；行组与页的数量适中，既利于扫描时按统计信息跳读，
+# 也避免默认单一大行组在写入时整体驻留内存
+ROW_GROUP_ROWS = 131072
+DATA_PAGE_SIZE = 1 << 20
+COMPRESSION = "zstd"
+COMPRESSION_LEVEL = 3
+
+
+def _write_arrow(table, path: Path) -> None:
+    """以 ParquetWriter 按批写出 Arrow 表（每批一个行组）。"""
+    with pq.ParquetWriter(
+        path,
+        table.schema,
+        compression=COMPRESSION,
+        compression_level=COMPRESSION_LEVEL,
+        data_page_size=DATA_PAGE_SIZE,
+        write_statistics=True,
+    ) as writer:
+        for batch in table.to_batches(max_chunksize=ROW_GROUP_ROWS):
+            writer.write_batch(batch)
+
+
+def _existing_columns(source, columns: Optional[List[str]]) -> Optional[List[str]]:
+    """columns 中存在于文件 schema 的列（按文件中的列顺序）；columns 为 None 时返回 None（读取全部列）。"""
+    if columns is None:
+        return None
+    wanted = set(columns)
+    return [c for c in pq.read_schema(source).names if c in wanted]
+
+
+def read_parquet(path: Path, columns: Optional[List[str]] = None) -> pd.DataFrame:
     """安全读取 Parquet 文件。
 
     Args:
         path (Path): 待读取的 Parquet 文件路径。
+        columns (Optional[List[str]]): 只读取这些列（文件中不存在的列忽略）；默认读取全部列。
 
     Returns:
         pd.DataFrame: 若文件存在且读取成功则返回 DataFrame，否则返回空 DataFrame。
+
+    Notes:
+        - 设置 `ALPHA101_PREFER_POLARS=1` 且安装了 polars 时优先用 polars 读取；
+          此时不还原 pandas 元数据（分类类型、索引），失败时回退为 `pd.read_parquet`。
     """
     if not path.exists():
         logger.warning(f"文件不存在: {path}")
         return pd.DataFrame()
 
     try:
-        return pd.read_parquet(path)
+        if _PA:
+            columns = _existing_columns(path, columns)
     except Exception as e:
         logger.error(f"读取 Parquet 文件失败: {path}, 错误: {e}")
         return pd.DataFrame()
 
+    if PREFER_POLARS and _PL:
+        try:
+            return pl.read_parquet(path, columns=columns).to_pandas()
+        except Exception as e:
+            logger.warning(f"polars 读取失败，改用 pandas: {path}, 错误: {e}")
+
+    try:
+        return pd.read_parquet(path, columns=columns)
+    except Exception as e:
+        logger.error(f"读取 Parquet 文件失败: {path}, 错误: {e}")
+        return pd.DataFrame()
+
+
+def read_table_mmap(path: Path, columns: Optional[List[str]] = None):
+    """以内存映射方式将 Parquet 文件读为 pyarrow.Table（不转换为 pandas）。
+
+    Args:
+        path (Path): 待读取的 Parquet 文件路径。
+        columns (Optional[List[str]]): 只读取这些列（文件中不存在的列忽略）；默认读取全部列。
+
+    Returns:
+        pyarrow.Table | None: 读取成功返回 Arrow 表；文件不存在或读取失败时记录日志并返回 None。
+
+    Notes:
+        - 文件经 `pyarrow.memory_map` 映射，多个进程读取同一文件时共享页缓存，不各自复制一份读缓冲；
+        - 需要 pyarrow，不可用时抛出 RuntimeError（调用方应改用 `read_parquet`）。
+    """
+    if not _PA:
+        raise RuntimeError("pyarrow 不可用，无法读取为 Arrow 表")
+
+    # 不预先调用 path.exists()：调用方通常已按目录列表筛过文件，缺失时由打开失败处理
+    try:
+        with pa.memory_map(str(path), "r") as source:
+            return pq.read_table(source, columns=_existing_columns(source, columns))
+    except FileNotFoundError:
+        logger.warning(f"文件不存在: {path}")
+        return None
+    except Exception as e:
+        logger.error(f"读取 Parquet 文件失败: {path}, 错误: {e}")
+        return None
+
+
+def read_parquet_mmap(path: Path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """以内存映射方式读取 Parquet 文件，语义同 `read_parquet`。
+
+    Args:
+        path (Path): 待读取的 Parquet 文件路径。
+        columns (Optional[List[str]]): 只读取这些列（文件中不存在的列忽略）；默认读取全部列。
+
+    Returns:
+        pd.DataFrame: 若文件存在且读取成功则返回 DataFrame，否则返回空 DataFrame。
+
+    Notes:
+        - 经 `read_table_mmap` 读取；
+        - 转为 pandas 时每列单独成块（split_blocks）并随转换释放 Arrow 内存，避免块合并的额外拷贝；
+        - 无 pyarrow 时回退为 `read_parquet`。
+    """
+    if not _PA:
+        return read_parquet(path, columns)
+    table = read_table_mmap(path, columns)
+    if table is None:
+        return pd.DataFrame()
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
 
 def write_parquet(df: pd.DataFrame, path: Path) -> None:
     """安全写入 DataFrame 至 Parquet 文件。
@@ -43,11 +160,37 @@ def write_parquet(df: pd.DataFrame, path: Path) -> None:
 
     Notes:
         - 自动创建父目录；
-        - 若写入失败会捕获异常并记录日志。
+        - 若写入失败会捕获异常并记录日志；
+        - 有 pyarrow 时用 `ParquetWriter` 分行组写出（zstd 压缩），否则回退为 `df.to_parquet`。
+    """
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if _PA:
+            _write_arrow(pa.Table.from_pandas(df, preserve_index=False), path)
+        else:
+            df.to_parquet(path, index=False)
+        logger.info(f"成功写入 Parquet 文件: {path}")
+    except Exception as e:
+        logger.error(f"写入 Parquet 文件失败: {path}, 错误: {e}")
+
+
+def write_table(table, path: Path) -> None:
+    """安全写入 pyarrow.Table 至 Parquet 文件。
+
+    Args:
+        table (pyarrow.Table): 待写入的列式表。
+        path (Path): 输出文件路径。
+
+    Notes:
+        - 自动创建父目录；
+        - 若写入失败会捕获异常并记录日志；
+        - 需要 pyarrow，不可用时抛出 RuntimeError（调用方应改用 `write_parquet`）。
     """
+    if not _PA:
+        raise RuntimeError("pyarrow 不可用，无法直接写出 Arrow 表")
     try:
         path.parent.mkdir(parents=True, exist_ok=True)
-        df.to_parquet(path, index=False)
+        _write_arrow(table, path)
         logger.info(f"成功写入 Parquet 文件: {path}")
     except Exception as e:
         logger.error(f"写入 Parquet 文件失败: {path}, 错误: {e}")
@@ -17,7 +17,7 @@ sys.path.append(str(Path(__file__).resolve().parents[2]))
 
 from loguru import logger
 from pathlib import Path
-from alpha101_factory.config import LOG_DIR
+from alpha101_factory.config import LOG_DIR, LOG_QUIET
 
 
 def setup_logger() -> logger:
@@ -27,7 +27,8 @@ def setup_logger() -> logger:
         logger: 配置完成的 loguru 日志对象。
 
     Notes:
-        - 控制台日志：实时打印；
+        - 控制台日志：直接写入 sys.stderr（不经 Python 回调逐行 print），
+          设置 `ALPHA101_QUIET=1` 时只输出 WARNING 及以上；
         - 文件日志：写入 LOG_DIR/alpha101.log，自动分割 (5 MB)；
         - 若日志目录不可用，将仅输出到控制台。
     """
@@ -41,7 +42,13 @@ def setup_logger() -> logger:
 
     # ===== 控制台日志 =====
     try:
-        logger.add(lambda msg: print(msg, end=""))  # 直接打印到标准输出
+        logger.add(
+            sys.stderr,
+            format="{time:HH:mm:ss} | {level} | {message}",
+            level="WARNING" if LOG_QUIET else "INFO",
+            colorize=True,
+            enqueue=True,           # 多线程写入经队列串行化，不在调用线程上持锁写流
+        )
     except Exception as e:
         print(f"[警告] 控制台日志配置失败: {e}")
 
@@ -5,11 +5,19 @@
 本模块实现了常见的时间序列滚动计算、截面计算和金融因子研究所需的基础函数。
 支持可选的性能加速库：
     - bottleneck: 用于加速滚动窗口的求和、最值、均值、标准差等操作。
-    - numba: 用于加速循环逻辑，如 ts_rank 与线性衰减加权平均。
+    - numba: 用于加速循环逻辑，如 ts_rank 与线性衰减加权平均；按 symbol 分块的并行内核见 `ops_nb`。
+    - numexpr: 用于将多步逐元素运算融合为一次分块、多线程的遍历。
 
 即便上述库不可用，本模块也会回退至 pandas 实现，保证工业环境下的稳定性。
+
+numba 内核的输入/输出精度由 `precision` 上下文控制（默认 float64），
+内核内部的累加始终使用 float64。
 """
 
+import threading
+from contextlib import contextmanager
+from functools import partial
+
 import numpy as np
 import pandas as pd
 
@@ -26,6 +34,18 @@ try:
 except Exception:
     _NUMBA = False
 
+try:
+    import numexpr as ne
+    _NE = True
+except Exception:
+    _NE = False
+
+try:
+    from alpha101_factory.utils import ops_nb
+    _NB = True
+except Exception:
+    _NB = False
+
 
 # ============================================================================
 # 内部辅助函数
@@ -43,6 +63,36 @@ def _as_series(x: np.ndarray, idx) -> pd.Series:
     return pd.Series(x, index=idx)
 
 
+# ============================================================================
+# 计算精度
+# ============================================================================
+_PRECISION = threading.local()
+
+
+def float_dtype() -> np.dtype:
+    """返回当前线程的内核工作精度（默认 float64）。"""
+    return getattr(_PRECISION, "dtype", np.dtype(np.float64))
+
+
+@contextmanager
+def precision(dtype):
+    """在上下文内切换当前线程的内核工作精度。
+
+    Args:
+        dtype: np.float32 或 np.float64。
+
+    Notes:
+        - float32 使内核的访存量减半，适合只用于排序的因子值；
+        - 设置按线程隔离，线程池中并行计算的因子互不影响。
+    """
+    prev = float_dtype()
+    _PRECISION.dtype = np.dtype(dtype)
+    try:
+        yield
+    finally:
+        _PRECISION.dtype = prev
+
+
 # ============================================================================
 # 时间序列滚动窗口函数
 # ============================================================================
@@ -116,11 +166,11 @@ def rolling_corr(s1: pd.Series, s2: pd.Series, n: int) -> pd.Series:
 # 时间序列排名 (ts_rank)
 # ============================================================================
 if _NUMBA:
-    @njit(cache=True)
+    @njit(cache=True, nogil=True)
     def _ts_rank_last(arr: np.ndarray, n: int) -> np.ndarray:
         """Numba 加速版 ts_rank，返回窗口最后一个元素的分位排名。"""
         m = arr.size
-        out = np.empty(m, dtype=np.float64)
+        out = np.empty(m, dtype=arr.dtype)
         out[:] = np.nan
         for i in range(n - 1, m):
             cnt = 0.0
@@ -147,8 +197,13 @@ def ts_rank(s: pd.Series, n: int) -> pd.Series:
     Returns:
         pd.Series: 每个位置对应的 ts_rank 值。
     """
-    arr = s.to_numpy(dtype=float)
+    arr = s.to_numpy(dtype=float_dtype())
     try:
+        if _NB:
+            # 与分组内核同一实现（大窗口走树状数组）
+            out = np.empty_like(arr)
+            ops_nb._ts_rank_block(arr, 0, arr.size, n, out)
+            return _as_series(out, s.index)
         if _NUMBA:
             return _as_series(_ts_rank_last(arr, n), s.index)
     except Exception:
@@ -166,13 +221,13 @@ def ts_rank(s: pd.Series, n: int) -> pd.Series:
 # 线性衰减加权平均 (decay_linear)
 # ============================================================================
 if _NUMBA:
-    @njit(cache=True)
+    @njit(cache=True, nogil=True)
     def _decay_linear(arr: np.ndarray, n: int) -> np.ndarray:
         """Numba 加速版线性衰减加权平均。"""
         w = np.arange(1, n + 1, dtype=np.float64)
         w = w / w.sum()
         m = arr.size
-        out = np.empty(m, dtype=np.float64)
+        out = np.empty(m, dtype=arr.dtype)
         out[:] = np.nan
         for i in range(n - 1, m):
             acc = 0.0
@@ -191,8 +246,12 @@ if _NUMBA:
 
 def decay_linear(s: pd.Series, n: int) -> pd.Series:
     """计算线性衰减加权平均，越新的值权重越大。"""
-    arr = s.to_numpy(dtype=float)
+    arr = s.to_numpy(dtype=float_dtype())
     try:
+        if _NB:
+            out = np.empty_like(arr)
+            ops_nb._decay_linear_block(arr, 0, arr.size, n, out)
+            return _as_series(out, s.index)
         if _NUMBA:
             return _as_series(_decay_linear(arr, n), s.index)
     except Exception:
@@ -202,12 +261,47 @@ def decay_linear(s: pd.Series, n: int) -> pd.Series:
     return s.rolling(n, min_periods=n).apply(lambda x: np.dot(x, w), raw=True)
 
 
+# ============================================================================
+# 窗口内最小值位置 (argmin)
+# ============================================================================
+def argmin(s: pd.Series, n: int) -> pd.Series:
+    """计算滚动窗口内最小值的位置（0 表示窗口中最早的一期，相等时取较早者）。
+
+    Args:
+        s (pd.Series): 输入序列。
+        n (int): 滚动窗口大小。
+
+    Returns:
+        pd.Series: 每个位置对应窗口内最小值的偏移量。
+    """
+    arr = s.to_numpy(dtype=float_dtype())
+    try:
+        if _NB:
+            out = np.empty_like(arr)
+            ops_nb._argmin_block(arr, 0, arr.size, n, out)
+            return _as_series(out, s.index)
+    except Exception:
+        pass
+    return s.rolling(n, min_periods=n).apply(np.argmin, raw=True)
+
+
 # ============================================================================
 # 基础变换函数
 # ============================================================================
 def delay(s: pd.Series, n: int = 1) -> pd.Series:
-    """计算滞后 n 期。"""
-    return s.shift(n)
+    """计算滞后 n 期。
+
+    Notes:
+        - n > 0 时直接对底层数组做一次切片拷贝，绕开 pandas.shift 的通用路径；
+        - 其他情况回退至 pandas.shift。
+    """
+    if n <= 0:
+        return s.shift(n)
+    arr = s.to_numpy(dtype=float_dtype())
+    out = np.full(arr.size, np.nan, dtype=arr.dtype)
+    if n < arr.size:
+        out[n:] = arr[:-n]
+    return _as_series(out, s.index)
 
 
 def delta(s: pd.Series, n: int = 1) -> pd.Series:
@@ -226,10 +320,9 @@ def vwap_from_amount(close: pd.Series, high: pd.Series, low: pd.Series,
 
     Notes:
         - 使用成交额 / 成交量。
-        - 避免成交量为 0 的除零问题。
+        - 成交量为 0 处结果为 NaN（`safe_div` 一次掩码除法，不复制 volume）。
     """
-    v = volume.replace(0, np.nan)
-    return amount / v
+    return _as_series(safe_div(amount, volume), amount.index)
 
 
 def adv(volume: pd.Series, n: int) -> pd.Series:
@@ -243,18 +336,424 @@ def adv(volume: pd.Series, n: int) -> pd.Series:
     return volume.rolling(n, min_periods=n).mean()
 
 
+def adv_many(volume: pd.Series, windows) -> dict[int, pd.Series]:
+    """一次计算多个窗口的平均成交量。
+
+    共用一次前缀和：每个窗口的和为两段前缀和之差，对 volume 只读取一遍。
+    与 `adv` 一致，窗口内存在 NaN 时结果为 NaN。
+
+    Args:
+        volume (pd.Series): 成交量序列。
+        windows: 窗口大小列表。
+
+    Returns:
+        dict[int, pd.Series]: 窗口大小 -> n 日均量。
+    """
+    v = volume.to_numpy(dtype=np.float64)
+    valid = ~np.isnan(v)
+    cs = np.concatenate(([0.0], np.cumsum(np.where(valid, v, 0.0))))
+    cnt = np.concatenate(([0], np.cumsum(valid)))
+    out = {}
+    for n in windows:
+        res = np.full(v.size, np.nan)
+        if 0 < n <= v.size:
+            full = (cnt[n:] - cnt[:-n]) == n
+            res[n - 1:] = np.where(full, (cs[n:] - cs[:-n]) / n, np.nan)
+        out[n] = _as_series(res, volume.index)
+    return out
+
+
+def safe_div(num, den) -> np.ndarray:
+    """逐元素 num / den，den 为 0 处结果为 NaN。
+
+    一次 np.divide(where=den != 0) 写入预填 NaN 的输出，不生成 den.replace(0, nan) 的副本；
+    输出为当前工作精度。
+
+    Args:
+        num: 分子（数组、Series 或标量）。
+        den: 分母（与 num 等长的数组或 Series）。
+
+    Returns:
+        np.ndarray: 相除结果。
+    """
+    num = np.asarray(num, dtype=np.float64)
+    den = np.asarray(den, dtype=np.float64)
+    out = np.full(np.broadcast(num, den).shape, np.nan, dtype=float_dtype())
+    np.divide(num, den, out=out, where=den != 0)
+    return out
+
+
 # ============================================================================
 # 截面计算工具（同一时间点跨股票）
 # ============================================================================
 def cs_rank(s: pd.Series) -> pd.Series:
-    """截面分位数排名：对每个时间点上的股票进行排序。"""
-    return s.groupby(level=0).rank(pct=True)
+    """截面分位数排名：对每个时间点上的股票进行排序。
+
+    Notes:
+        按索引第 0 层分块后整体调用一次 `cs_rank_grouped`，不再逐个时间点走 groupby。
+    """
+    order, offsets = group_layout(s.index.get_level_values(0))
+    out = np.empty(len(s), dtype=float_dtype())
+    out[order] = cs_rank_grouped(s.to_numpy(dtype=float_dtype())[order], offsets)
+    return pd.Series(out, index=s.index, name=s.name)
 
 
 def cs_zscore(s: pd.Series) -> pd.Series:
-    """截面标准化 (Z-score)。"""
-    g = s.groupby(level=0)
-    return (s - g.transform("mean")) / g.transform("std")
+    """截面标准化 (Z-score)，标准差为样本标准差 (ddof=1)，NaN 不参与统计。
+
+    Notes:
+        各时间点的计数、均值与离差平方和用 `np.bincount` 一次算出（float64 累加），
+        不再逐组 transform。
+    """
+    codes, uniques = pd.factorize(s.index.get_level_values(0))
+    x = s.to_numpy(dtype=np.float64)
+    ok = ~np.isnan(x) & (codes >= 0)
+    k = len(uniques)
+    cnt = np.bincount(codes[ok], minlength=k).astype(np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.bincount(codes[ok], weights=x[ok], minlength=k) / cnt
+        dev = x - mean[codes]
+        ss = np.bincount(codes[ok], weights=dev[ok] ** 2, minlength=k)
+        std = np.sqrt(ss / (cnt - 1))
+        std[cnt < 2] = np.nan
+        out = dev / std[codes]
+    out[codes < 0] = np.nan
+    return pd.Series(out.astype(float_dtype(), copy=False), index=s.index, name=s.name)
+
+
+# ============================================================================
+# 分组内核（数据按 symbol 排成连续块，offsets 为各块边界）
+# ============================================================================
+def group_layout(keys) -> tuple[np.ndarray, np.ndarray]:
+    """计算按分组键排列的连续块布局。
+
+    Args:
+        keys: 分组键（通常为 symbol 列），不能含空值。
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]:
+            - order: 稳定排序后的行号，``values[order]`` 即按组连续排列；
+            - offsets: 长度为 组数+1 的块边界，第 g 组为 ``[offsets[g], offsets[g+1])``。
+
+    Notes:
+        - 稳定排序保证组内行顺序与原表一致，与 ``groupby`` 的语义相同；
+        - 分类类型的键按类别顺序分块（类别已排序时与字符串排序一致）。
+    """
+    if isinstance(getattr(keys, "dtype", None), pd.CategoricalDtype):
+        # 分类列直接用整数编码分组，不必逐个哈希字符串
+        codes, uniques = pd.factorize(np.asarray(keys.cat.codes), sort=True)
+    else:
+        codes, uniques = pd.factorize(np.asarray(keys), sort=True)
+    order = np.argsort(codes, kind="stable")
+    offsets = np.zeros(len(uniques) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(codes, minlength=len(uniques)), out=offsets[1:])
+    return order, offsets
+
+
+# Series 算子名 -> ops_nb 内核名（同名的不必列出）
+_NB_NAMES = {"adv": "rolling_mean"}
+
+
+def _run_nb(kernel_name: str, arr: np.ndarray, offsets: np.ndarray, *args):
+    """调用 ops_nb 中的分组内核；不可用或出错时返回 None。"""
+    if not _NB:
+        return None
+    try:
+        out = np.empty_like(arr)
+        getattr(ops_nb, kernel_name)(arr, offsets, *args, out)
+        return out
+    except Exception:
+        return None
+
+
+def delay_grouped(values: np.ndarray, offsets: np.ndarray, n: int = 1) -> np.ndarray:
+    """按连续块计算滞后 n 期（块之间互不串值）。
+
+    Args:
+        values (np.ndarray): 按组连续排列的一维数组。
+        offsets (np.ndarray): 块边界，见 `group_layout`。
+        n (int): 滞后期数，需为正。
+
+    Returns:
+        np.ndarray: 与 values 同布局的结果。
+    """
+    if n <= 0:
+        raise ValueError(f"delay_grouped 仅支持正的滞后期数: {n}")
+    arr = np.ascontiguousarray(values, dtype=float_dtype())
+    out = _run_nb("delay", arr, offsets, n)
+    if out is not None:
+        return out
+    out = np.empty_like(arr)
+    for s, e in zip(offsets[:-1], offsets[1:]):
+        k = min(s + n, e)
+        out[s:k] = np.nan
+        out[k:e] = arr[s:e - (k - s)]
+    return out
+
+
+def delta_grouped(values: np.ndarray, offsets: np.ndarray, n: int = 1) -> np.ndarray:
+    """按连续块计算 n 期差分，语义同 `delta`。"""
+    arr = np.ascontiguousarray(values, dtype=float_dtype())
+    return arr - delay_grouped(arr, offsets, n)
+
+
+def sum_pair_corr_grouped(values: np.ndarray, offsets: np.ndarray,
+                          n1: int, n2: int, w: int) -> np.ndarray:
+    """按连续块计算两个滚动和之间的滚动相关：corr(sum(x, n1), sum(x, n2), w)。
+
+    Args:
+        values (np.ndarray): 按组连续排列的一维数组。
+        offsets (np.ndarray): 块边界，见 `group_layout`。
+        n1 (int): 第一个滚动和的窗口。
+        n2 (int): 第二个滚动和的窗口。
+        w (int): 相关系数窗口。
+
+    Returns:
+        np.ndarray: 与 values 同布局的结果。
+
+    Notes:
+        - numba 版本单遍完成两次求和与相关计算（如 Alpha045 的 corr(sum(close,5), sum(close,20), 2)）；
+        - 回退至逐块 pandas 实现。
+    """
+    arr = np.ascontiguousarray(values, dtype=float_dtype())
+    out = _run_nb("sum_pair_corr", arr, offsets, n1, n2, w)
+    if out is not None:
+        return out
+    out = np.empty_like(arr)
+    for s, e in zip(offsets[:-1], offsets[1:]):
+        x = pd.Series(arr[s:e])
+        out[s:e] = rolling_corr(rolling_sum(x, n1), rolling_sum(x, n2), w).to_numpy()
+    return out
+
+
+def sign_delta_sum_grouped(values: np.ndarray, offsets: np.ndarray, m: int) -> np.ndarray:
+    """按连续块计算 sum_{k=1..m} sign(delta(delay(x, k), 1))。
+
+    Args:
+        values (np.ndarray): 按组连续排列的一维数组。
+        offsets (np.ndarray): 块边界，见 `group_layout`。
+        m (int): 滞后期数（Alpha030 为 3）。
+
+    Returns:
+        np.ndarray: 与 values 同布局的结果；块内前 m+1 个位置为 NaN。
+
+    Notes:
+        - numba 版本单遍读取 x，不生成 delay/delta/sign 的中间数组；
+        - 回退至 NumPy：先求一阶差分的符号，再对其滞后 1..m 期求和。
+    """
+    arr = np.ascontiguousarray(values, dtype=float_dtype())
+    out = _run_nb("sign_delta_sum", arr, offsets, m)
+    if out is not None:
+        return out
+    d = np.sign(delta_grouped(arr, offsets, 1))
+    out = np.zeros_like(arr)
+    for k in range(1, m + 1):
+        out += delay_grouped(d, offsets, k)
+    return out
+
+
+def _head_mask(offsets: np.ndarray, n: int) -> np.ndarray:
+    """返回各块前 n 个位置为 True 的布尔掩码。"""
+    counts = np.diff(offsets)
+    pos = np.arange(offsets[-1]) - np.repeat(offsets[:-1], counts)
+    return pos < n
+
+
+def rolling_grouped(fn, values: np.ndarray, offsets: np.ndarray, n: int) -> np.ndarray:
+    """按连续块计算单序列窗口算子。
+
+    优先调用 ops_nb 中的同名内核（adv 对应 rolling_mean）；否则把 fn 一次作用于
+    整个数组，再屏蔽各块前 n-1 个跨块的窗口，结果与逐组计算等价。
+    只适用于窗口不满 n 期即为 NaN 的算子（rolling_* / adv / ts_rank / decay_linear / argmin）。
+
+    Args:
+        fn: 签名为 fn(s, n) 的 Series 算子。
+        values (np.ndarray): 按组连续排列的一维数组。
+        offsets (np.ndarray): 块边界，见 `group_layout`。
+        n (int): 窗口大小。
+
+    Returns:
+        np.ndarray: 与 values 同布局的结果。
+
+    Notes:
+        - 数组含 inf 时，滚动累加会把 inf - inf 产生的 NaN 带入后续各块，此时改为逐块计算。
+    """
+    arr = np.ascontiguousarray(values, dtype=float_dtype())
+    out = _run_nb(_NB_NAMES.get(fn.__name__, fn.__name__), arr, offsets, n)
+    if out is not None:
+        return out
+    if np.isinf(arr).any():
+        out = np.empty_like(arr)
+        for s, e in zip(offsets[:-1], offsets[1:]):
+            out[s:e] = fn(pd.Series(arr[s:e]), n).to_numpy(dtype=arr.dtype)
+        return out
+    out = np.require(fn(pd.Series(arr), n).to_numpy(dtype=arr.dtype), requirements="W")
+    out[_head_mask(offsets, n - 1)] = np.nan
+    return out
+
+
+def argmin_grouped(values: np.ndarray, offsets: np.ndarray, n: int) -> np.ndarray:
+    """按连续块计算滚动窗口内最小值的位置，语义同 `argmin`。"""
+    return rolling_grouped(argmin, values, offsets, n)
+
+
+def rolling_corr_grouped(x: np.ndarray, y: np.ndarray, offsets: np.ndarray, n: int) -> np.ndarray:
+    """按连续块计算两个序列的滚动相关系数，语义同 `rolling_corr`。
+
+    Args:
+        x (np.ndarray): 按组连续排列的一维数组。
+        y (np.ndarray): 与 x 同布局的一维数组。
+        offsets (np.ndarray): 块边界，见 `group_layout`。
+        n (int): 窗口大小。
+
+    Returns:
+        np.ndarray: 与 x 同布局的结果。
+    """
+    x = np.ascontiguousarray(x, dtype=float_dtype())
+    y = np.ascontiguousarray(y, dtype=float_dtype())
+    if _NB:
+        try:
+            out = np.empty_like(x)
+            ops_nb.rolling_corr(x, y, offsets, n, out)
+            return out
+        except Exception:
+            pass
+    out = np.empty_like(x)
+    for s, e in zip(offsets[:-1], offsets[1:]):
+        out[s:e] = rolling_corr(pd.Series(x[s:e]), pd.Series(y[s:e]), n).to_numpy()
+    return out
+
+
+def rolling_cov_grouped(x: np.ndarray, y: np.ndarray, offsets: np.ndarray, n: int) -> np.ndarray:
+    """按连续块计算两个序列的滚动协方差，语义同 `rolling_cov`。
+
+    Args:
+        x (np.ndarray): 按组连续排列的一维数组。
+        y (np.ndarray): 与 x 同布局的一维数组。
+        offsets (np.ndarray): 块边界，见 `group_layout`。
+        n (int): 窗口大小。
+
+    Returns:
+        np.ndarray: 与 x 同布局的结果。
+    """
+    x = np.ascontiguousarray(x, dtype=float_dtype())
+    y = np.ascontiguousarray(y, dtype=float_dtype())
+    if _NB:
+        try:
+            out = np.empty_like(x)
+            ops_nb.rolling_cov(x, y, offsets, n, out)
+            return out
+        except Exception:
+            pass
+    out = np.empty_like(x)
+    for s, e in zip(offsets[:-1], offsets[1:]):
+        out[s:e] = rolling_cov(pd.Series(x[s:e]), pd.Series(y[s:e]), n).to_numpy()
+    return out
+
+
+def cs_rank_grouped(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """按连续块计算分位排名（块为同一日期的截面时即 cs_rank）。
+
+    Args:
+        values (np.ndarray): 按组连续排列的一维数组。
+        offsets (np.ndarray): 块边界，见 `group_layout`。
+
+    Returns:
+        np.ndarray: 与 values 同布局的结果；相同值取平均名次，NaN 保持为 NaN。
+    """
+    arr = np.ascontiguousarray(values, dtype=float_dtype())
+    out = _run_nb("cs_rank", arr, offsets)
+    if out is not None:
+        return out
+    codes = np.repeat(np.arange(offsets.size - 1), np.diff(offsets))
+    return pd.Series(arr).groupby(codes).rank(pct=True).to_numpy(dtype=arr.dtype)
+
+
+def warmup_kernels(dtypes=(np.float32, np.float64)) -> int:
+    """预先编译（或从磁盘缓存加载）ops_nb 中的分组内核，见 `ops_nb.warmup`。
+
+    Args:
+        dtypes: 需要预热的精度。
+
+    Returns:
+        int: 预热的内核调用数；numba 不可用或预热失败时返回 0。
+    """
+    if not _NB:
+        return 0
+    try:
+        return sum(ops_nb.warmup(np.dtype(dt)) for dt in dtypes)
+    except Exception:
+        return 0
+
+
+# Series 算子 -> 分组内核；分组调用方（如因子模块的 `_g`）据此绕过 groupby
+_GROUPED_KERNELS = {
+    delay: delay_grouped,
+    delta: delta_grouped,
+    argmin: argmin_grouped,
+    rolling_sum: partial(rolling_grouped, rolling_sum),
+    rolling_min: partial(rolling_grouped, rolling_min),
+    rolling_max: partial(rolling_grouped, rolling_max),
+    rolling_std: partial(rolling_grouped, rolling_std),
+    adv: partial(rolling_grouped, adv),
+    ts_rank: partial(rolling_grouped, ts_rank),
+    decay_linear: partial(rolling_grouped, decay_linear),
+}
+
+
+def grouped_kernel(fn):
+    """返回 Series 算子对应的分组内核，未注册时返回 None。"""
+    return _GROUPED_KERNELS.get(fn)
+
+
+# 双输入算子：kernel(x, y, offsets, *args)
+_PAIR_KERNELS = {
+    rolling_corr: rolling_corr_grouped,
+    rolling_cov: rolling_cov_grouped,
+}
+
+
+def pair_kernel(fn):
+    """返回双输入 Series 算子（rolling_corr/rolling_cov）对应的分组内核，未注册时返回 None。"""
+    return _PAIR_KERNELS.get(fn)
+
+
+# ============================================================================
+# 融合逐元素表达式 (numexpr)
+# ============================================================================
+# numexpr 不可用时，表达式中允许出现的函数映射到 NumPy 实现
+_NE_FALLBACK_FUNCS = {
+    "where": np.where,
+    "sign": np.sign,
+    "abs": np.abs,
+    "sqrt": np.sqrt,
+    "log": np.log,
+    "exp": np.exp,
+}
+
+
+def evaluate(expr: str, **arrays) -> np.ndarray:
+    """一次遍历计算逐元素表达式。
+
+    Args:
+        expr (str): numexpr 语法的表达式，例如 ``"-sign(a - b) * (1.0 + c)"``。
+        **arrays: 表达式中引用的变量，需为等长的一维数组（或标量）。
+
+    Returns:
+        np.ndarray: 计算结果。
+
+    Notes:
+        - 优先使用 numexpr：按 L1 大小分块、多线程执行，避免生成中间数组；
+        - 回退至 NumPy 逐步计算，结果一致。
+        - 传入 Series 时只取其 values，调用方需保证各输入已按同一行顺序对齐。
+    """
+    local = {k: (v.to_numpy() if isinstance(v, pd.Series) else v) for k, v in arrays.items()}
+    try:
+        if _NE:
+            return ne.evaluate(expr, local_dict=local)
+    except Exception:
+        pass
+    return eval(expr, {"__builtins__": {}}, {**_NE_FALLBACK_FUNCS, **local})
 
 
 # ============================================================================
@@ -272,5 +771,15 @@ def by_symbol(df: pd.DataFrame, col: str, func, *args, **kwargs) -> pd.Series:
 
     Returns:
         pd.Series: 分组计算结果。
+
+    Notes:
+        func 为已注册分组内核的算子（rolling_* / adv / ts_rank / delta 等，见 `grouped_kernel`）
+        且没有关键字参数时，整列按 symbol 排成连续块后调用一次内核，不再逐组回调 Python。
     """
-    return df.groupby("symbol", group_keys=False)[col].apply(lambda x: func(x, *args, **kwargs))
+    kernel = grouped_kernel(func)
+    if kernel is not None and not kwargs:
+        order, offsets = group_layout(df["symbol"])
+        out = np.empty(len(df), dtype=float_dtype())
+        out[order] = kernel(df[col].to_numpy(dtype=float_dtype())[order], offsets, *args)
+        return pd.Series(out, index=df.index, name=col)
+    return df.groupby("symbol", group_keys=False, observed=True)[col].apply(lambda x: func(x, *args, **kwargs))
@@ -0,0 +1,592 @@
+# -*- coding: utf-8 -*-
+"""
+Numba 分组内核模块 (Grouped Numba Kernels)
+
+本模块实现按 symbol 连续排列（块布局，见 `ops.group_layout`）的数组上的时序算子，
+以及按日期分块的截面排名：
+    - 每个公开内核的签名为 ``kernel(arr, offsets, ..., out)``，结果写入 out；
+    - 各块之间用 prange 并行，块内单遍扫描；
+    - 窗口不满 n 期或窗口内含 NaN 时结果为 NaN（与 bottleneck 的 min_count=n 一致）；
+    - 输入/输出精度随 arr 的 dtype（float32 / float64），内部累加使用 float64。
+
+本模块依赖 numba，导入失败时由 `ops` 回退至 NumPy/pandas 实现。
+"""
+
+import numpy as np
+from numba import njit, prange
+
+
+# ============================================================================
+# 单块内核（供并行驱动调用）
+# ============================================================================
+@njit(cache=True, nogil=True)
+def _sum_block(arr, s, e, n, scale, out):
+    """arr[s:e] 上的滚动和，结果乘以 scale（scale=1/n 即滚动均值）。"""
+    acc = 0.0
+    nans = 0
+    for i in range(s, e):
+        v = arr[i]
+        if np.isnan(v):
+            nans += 1
+        else:
+            acc += v
+        if i - n >= s:
+            old = arr[i - n]
+            if np.isnan(old):
+                nans -= 1
+            else:
+                acc -= old
+        if i - s < n - 1 or nans > 0:
+            out[i] = np.nan
+        else:
+            out[i] = acc * scale
+
+
+@njit(cache=True, nogil=True)
+def _extreme_block(arr, s, e, n, want_max, out):
+    """单调队列求 arr[s:e] 上的滚动最值，O(N) 复杂度。"""
+    dq = np.empty(max(e - s, 1), dtype=np.int64)  # 按块长分配，下标只增不回绕
+    head = 0
+    tail = 0
+    last_nan = s - n
+    for i in range(s, e):
+        while tail > head and dq[head] <= i - n:
+            head += 1
+        v = arr[i]
+        if np.isnan(v):
+            last_nan = i
+        else:
+            while tail > head and ((arr[dq[tail - 1]] <= v) if want_max
+                                   else (arr[dq[tail - 1]] >= v)):
+                tail -= 1
+            dq[tail] = i
+            tail += 1
+        if i - s < n - 1 or i - last_nan < n:
+            out[i] = np.nan
+        else:
+            out[i] = arr[dq[head]]
+
+
+@njit(cache=True, nogil=True)
+def _argmin_block(arr, s, e, n, out):
+    """单调队列求 arr[s:e] 上的滚动 argmin（窗口内偏移，相等时取较早者）。"""
+    dq = np.empty(max(e - s, 1), dtype=np.int64)  # 按块长分配，下标只增不回绕
+    head = 0
+    tail = 0
+    last_nan = s - n
+    for i in range(s, e):
+        while tail > head and dq[head] <= i - n:
+            head += 1
+        v = arr[i]
+        if np.isnan(v):
+            last_nan = i
+        else:
+            while tail > head and arr[dq[tail - 1]] > v:
+                tail -= 1
+            dq[tail] = i
+            tail += 1
+        if i - s < n - 1 or i - last_nan < n:
+            out[i] = np.nan
+        else:
+            out[i] = dq[head] - (i - n + 1)
+
+
+@njit(cache=True, nogil=True)
+def _std_block(arr, s, e, n, out):
+    """滑动 Welford 求 arr[s:e] 上的滚动标准差（ddof=0）。"""
+    cnt = 0
+    mean = 0.0
+    m2 = 0.0
+    nans = 0
+    same = 0
+    for i in range(s, e):
+        v = arr[i]
+        if np.isnan(v):
+            nans += 1
+            same = 0
+        else:
+            same = same + 1 if (i > s and arr[i - 1] == v) else 1
+            cnt += 1
+            d = v - mean
+            mean += d / cnt
+            m2 += d * (v - mean)
+        if i - n >= s:
+            old = arr[i - n]
+            if np.isnan(old):
+                nans -= 1
+            else:
+                cnt -= 1
+                if cnt == 0:
+                    mean = 0.0
+                    m2 = 0.0
+                else:
+                    d = old - mean
+                    mean -= d / cnt
+                    m2 -= d * (old - mean)
+        if i - s < n - 1 or nans > 0:
+            out[i] = np.nan
+        elif same >= n or m2 <= 0.0:
+            # 窗口内值全部相同：直接给 0，避免累计误差产生极小的非零值
+            out[i] = 0.0
+        else:
+            out[i] = np.sqrt(m2 / n)
+
+
+@njit(cache=True, nogil=True)
+def _corr_block(x, y, s, e, n, out):
+    """滑动 Welford 求 x[s:e] 与 y[s:e] 的滚动相关系数。
+
+    任一序列窗口内为常数时方差为 0，结果为 NaN（与 pandas 一致）。
+    """
+    cnt = 0
+    mx = 0.0
+    my = 0.0
+    m2x = 0.0
+    m2y = 0.0
+    cxy = 0.0
+    nans = 0
+    same_x = 0
+    same_y = 0
+    for i in range(s, e):
+        a = x[i]
+        b = y[i]
+        if np.isnan(a) or np.isnan(b):
+            nans += 1
+            same_x = 0
+            same_y = 0
+        else:
+            same_x = same_x + 1 if (i > s and x[i - 1] == a) else 1
+            same_y = same_y + 1 if (i > s and y[i - 1] == b) else 1
+            cnt += 1
+            dx = a - mx
+            mx += dx / cnt
+            dy = b - my
+            my += dy / cnt
+            m2x += dx * (a - mx)
+            m2y += dy * (b - my)
+            cxy += dx * (b - my)
+        if i - n >= s:
+            a = x[i - n]
+            b = y[i - n]
+            if np.isnan(a) or np.isnan(b):
+                nans -= 1
+            else:
+                cnt -= 1
+                if cnt == 0:
+                    mx = 0.0
+                    my = 0.0
+                    m2x = 0.0
+                    m2y = 0.0
+                    cxy = 0.0
+                else:
+                    dx = a - mx
+                    mx -= dx / cnt
+                    dy = b - my
+                    my -= dy / cnt
+                    m2x -= dx * (a - mx)
+                    m2y -= dy * (b - my)
+                    cxy -= dx * (b - my)
+        if i - s < n - 1 or nans > 0 or same_x >= n or same_y >= n or m2x <= 0.0 or m2y <= 0.0:
+            out[i] = np.nan
+        else:
+            out[i] = cxy / np.sqrt(m2x * m2y)
+
+
+@njit(cache=True, nogil=True)
+def _cov_block(x, y, s, e, n, out):
+    """滑动 Welford 求 x[s:e] 与 y[s:e] 的滚动样本协方差（ddof=1，与 pandas 一致）。"""
+    cnt = 0
+    mx = 0.0
+    my = 0.0
+    cxy = 0.0
+    nans = 0
+    for i in range(s, e):
+        a = x[i]
+        b = y[i]
+        if np.isnan(a) or np.isnan(b):
+            nans += 1
+        else:
+            cnt += 1
+            dx = a - mx
+            mx += dx / cnt
+            my += (b - my) / cnt
+            cxy += dx * (b - my)
+        if i - n >= s:
+            a = x[i - n]
+            b = y[i - n]
+            if np.isnan(a) or np.isnan(b):
+                nans -= 1
+            else:
+                cnt -= 1
+                if cnt == 0:
+                    mx = 0.0
+                    my = 0.0
+                    cxy = 0.0
+                else:
+                    dx = a - mx
+                    mx -= dx / cnt
+                    my -= (b - my) / cnt
+                    cxy -= dx * (b - my)
+        if i - s < n - 1 or nans > 0 or cnt < 2:
+            out[i] = np.nan
+        else:
+            out[i] = cxy / (cnt - 1)
+
+
+# 窗口不小于该值时 ts_rank 改用树状数组（O(log n) 每步）；更小的窗口直接逐个比较更快
+TS_RANK_FENWICK_MIN = 32
+
+
+@njit(cache=True, nogil=True)
+def _fenwick_add(tree, i, v):
+    while i < tree.size:
+        tree[i] += v
+        i += i & -i
+
+
+@njit(cache=True, nogil=True)
+def _fenwick_sum(tree, i):
+    acc = 0
+    while i > 0:
+        acc += tree[i]
+        i -= i & -i
+    return acc
+
+
+@njit(cache=True, nogil=True)
+def _ts_rank_block_fenwick(arr, s, e, n, out):
+    """`_ts_rank_block` 的 O(m log m) 版本。
+
+    先把块内取值映射为从 1 开始的稠密名次（相等取值名次相同，NaN 记 0 不入树），
+    再在树状数组上滑动窗口：移入新值、移出旧值，窗口内 <= last 的个数即 last 名次处的前缀和。
+    """
+    m = e - s
+    seg = arr[s:e]
+    idx = np.argsort(seg)
+    ids = np.zeros(m, dtype=np.int64)
+    k = 0
+    prev = 0.0
+    for t in range(m):
+        v = seg[idx[t]]
+        if np.isnan(v):
+            break
+        if k == 0 or v != prev:
+            k += 1
+            prev = v
+        ids[idx[t]] = k
+    tree = np.zeros(k + 1, dtype=np.int64)
+    valid = 0
+    for i in range(m):
+        if ids[i] > 0:
+            _fenwick_add(tree, ids[i], 1)
+            valid += 1
+        if i >= n and ids[i - n] > 0:
+            _fenwick_add(tree, ids[i - n], -1)
+            valid -= 1
+        if i < n - 1 or valid == 0:
+            out[s + i] = np.nan
+        elif ids[i] == 0:
+            out[s + i] = 0.0
+        else:
+            out[s + i] = _fenwick_sum(tree, ids[i]) / valid
+
+
+@njit(cache=True, nogil=True)
+def _ts_rank_block(arr, s, e, n, out):
+    """arr[s:e] 上窗口最后一个元素的分位排名（<= 计数 / 有效个数）。"""
+    if n >= TS_RANK_FENWICK_MIN:
+        _ts_rank_block_fenwick(arr, s, e, n, out)
+        return
+    for i in range(s, e):
+        if i - s < n - 1:
+            out[i] = np.nan
+            continue
+        cnt = 0.0
+        valid = 0.0
+        last = arr[i]
+        for j in range(i - n + 1, i + 1):
+            v = arr[j]
+            if not np.isnan(v):
+                valid += 1.0
+                if v <= last:
+                    cnt += 1.0
+        out[i] = cnt / valid if valid > 0 else np.nan
+
+
+@njit(cache=True, nogil=True)
+def _decay_linear_block(arr, s, e, n, out):
+    """arr[s:e] 上的线性衰减加权平均，权重 1..n 归一化，越新权重越大。
+
+    NaN 先置 0 并单独维护窗口内的 NaN 个数，权重预先算好，内层点积没有分支与除法。
+    不开启 fastmath 重排加法：结果与逐项累加逐位一致，下游 ts_rank 的并列关系不受影响。
+    """
+    total = n * (n + 1) / 2.0
+    w = np.empty(n, dtype=np.float64)
+    for k in range(n):
+        w[k] = (k + 1) / total
+    m = e - s
+    filled = np.empty(m, dtype=np.float64)
+    bad = np.empty(m, dtype=np.bool_)
+    for t in range(m):
+        v = arr[s + t]
+        bad[t] = np.isnan(v)
+        filled[t] = 0.0 if bad[t] else v
+    nans = 0
+    for i in range(m):
+        if bad[i]:
+            nans += 1
+        if i >= n and bad[i - n]:
+            nans -= 1
+        if i < n - 1 or nans > 0:
+            out[s + i] = np.nan
+            continue
+        acc = 0.0
+        base = i - n + 1
+        for k in range(n):
+            acc += filled[base + k] * w[k]
+        out[s + i] = acc
+
+
+@njit(cache=True, nogil=True)
+def _rank_pct_block(arr, s, e, out):
+    """arr[s:e] 的分位排名：相同值取平均名次，除以有效个数；NaN 保持为 NaN。"""
+    m = 0
+    idx = np.empty(e - s, dtype=np.int64)
+    for i in range(s, e):
+        if np.isnan(arr[i]):
+            out[i] = np.nan
+        else:
+            idx[m] = i
+            m += 1
+    if m == 0:
+        return
+    idx = idx[:m]
+    vals = np.empty(m, dtype=np.float64)
+    for k in range(m):
+        vals[k] = arr[idx[k]]
+    order = np.argsort(vals)
+    k = 0
+    while k < m:
+        j = k
+        while j + 1 < m and vals[order[j + 1]] == vals[order[k]]:
+            j += 1
+        r = (k + j + 2) / 2.0 / m
+        for t in range(k, j + 1):
+            out[idx[order[t]]] = r
+        k = j + 1
+
+
+# ============================================================================
+# 并行驱动（各块并行）
+# ============================================================================
+@njit(cache=True, nogil=True, parallel=True)
+def delay(arr, offsets, n, out):
+    """逐块滞后 n 期（n > 0）。"""
+    for g in prange(offsets.size - 1):
+        s, e = offsets[g], offsets[g + 1]
+        for i in range(s, min(s + n, e)):
+            out[i] = np.nan
+        for i in range(s + n, e):
+            out[i] = arr[i - n]
+
+
+@njit(cache=True, nogil=True, parallel=True)
+def rolling_sum(arr, offsets, n, out):
+    """逐块滚动求和。"""
+    for g in prange(offsets.size - 1):
+        _sum_block(arr, offsets[g], offsets[g + 1], n, 1.0, out)
+
+
+@njit(cache=True, nogil=True, parallel=True)
+def rolling_mean(arr, offsets, n, out):
+    """逐块滚动均值（adv 即成交量的滚动均值）。"""
+    for g in prange(offsets.size - 1):
+        _sum_block(arr, offsets[g], offsets[g + 1], n, 1.0 / n, out)
+
+
+@njit(cache=True, nogil=True, parallel=True)
+def rolling_min(arr, offsets, n, out):
+    """逐块滚动最小值。"""
+    for g in prange(offsets.size - 1):
+        _extreme_block(arr, offsets[g], offsets[g + 1], n, False, out)
+
+
+@njit(cache=True, nogil=True, parallel=True)
+def rolling_max(arr, offsets, n, out):
+    """逐块滚动最大值。"""
+    for g in prange(offsets.size - 1):
+        _extreme_block(arr, offsets[g], offsets[g + 1], n, True, out)
+
+
+@njit(cache=True, nogil=True, parallel=True)
+def rolling_std(arr, offsets, n, out):
+    """逐块滚动标准差（ddof=0）。"""
+    for g in prange(offsets.size - 1):
+        _std_block(arr, offsets[g], offsets[g + 1], n, out)
+
+
+@njit(cache=True, nogil=True, parallel=True)
+def rolling_corr(x, y, offsets, n, out):
+    """逐块滚动相关系数。"""
+    for g in prange(offsets.size - 1):
+        _corr_block(x, y, offsets[g], offsets[g + 1], n, out)
+
+
+@njit(cache=True, nogil=True, parallel=True)
+def rolling_cov(x, y, offsets, n, out):
+    """逐块滚动协方差。"""
+    for g in prange(offsets.size - 1):
+        _cov_block(x, y, offsets[g], offsets[g + 1], n, out)
+
+
+@njit(cache=True, nogil=True, parallel=True)
+def ts_rank(arr, offsets, n, out):
+    """逐块 ts_rank。"""
+    for g in prange(offsets.size - 1):
+        _ts_rank_block(arr, offsets[g], offsets[g + 1], n, out)
+
+
+@njit(cache=True, nogil=True, parallel=True)
+def decay_linear(arr, offsets, n, out):
+    """逐块线性衰减加权平均。"""
+    for g in prange(offsets.size - 1):
+        _decay_linear_block(arr, offsets[g], offsets[g + 1], n, out)
+
+
+@njit(cache=True, nogil=True, parallel=True)
+def argmin(arr, offsets, n, out):
+    """逐块滚动 argmin。"""
+    for g in prange(offsets.size - 1):
+        _argmin_block(arr, offsets[g], offsets[g + 1], n, out)
+
+
+@njit(cache=True, nogil=True, parallel=True)
+def sum_pair_corr(arr, offsets, n1, n2, w, out):
+    """逐块单遍计算 corr(sum(x, n1), sum(x, n2), w)。
+
+    两个滚动和用增量方式维护，最近 w 对 (sum1, sum2) 存在环形缓冲中，
+    每步直接在缓冲上求相关系数；窗口内出现 NaN 时结果为 NaN。
+    """
+    for g in prange(offsets.size - 1):
+        s, e = offsets[g], offsets[g + 1]
+        xs = np.empty(w, dtype=np.float64)
+        ys = np.empty(w, dtype=np.float64)
+        sum1 = 0.0
+        sum2 = 0.0
+        nan1 = 0
+        nan2 = 0
+        for i in range(s, e):
+            v = arr[i]
+            if np.isnan(v):
+                nan1 += 1
+                nan2 += 1
+            else:
+                sum1 += v
+                sum2 += v
+            if i - n1 >= s:
+                old = arr[i - n1]
+                if np.isnan(old):
+                    nan1 -= 1
+                else:
+                    sum1 -= old
+            if i - n2 >= s:
+                old = arr[i - n2]
+                if np.isnan(old):
+                    nan2 -= 1
+                else:
+                    sum2 -= old
+            k = i - s
+            xs[k % w] = sum1 if (k >= n1 - 1 and nan1 == 0) else np.nan
+            ys[k % w] = sum2 if (k >= n2 - 1 and nan2 == 0) else np.nan
+            if k < w - 1:
+                out[i] = np.nan
+                continue
+            mx = 0.0
+            my = 0.0
+            for j in range(w):
+                mx += xs[j]
+                my += ys[j]
+            mx /= w
+            my /= w
+            sxx = 0.0
+            syy = 0.0
+            sxy = 0.0
+            for j in range(w):
+                dx = xs[j] - mx
+                dy = ys[j] - my
+                sxx += dx * dx
+                syy += dy * dy
+                sxy += dx * dy
+            den = np.sqrt(sxx * syy)
+            out[i] = sxy / den if den > 0 else np.nan
+
+
+@njit(cache=True, nogil=True, parallel=True)
+def sign_delta_sum(arr, offsets, m, out):
+    """逐块单遍计算 sum_{k=1..m} sign(delta(delay(x, k), 1))。
+
+    每个位置只读一次 x：当步的涨跌符号 (a > b) - (a < b) 放入长度 m+1 的环形缓冲，
+    滑动维护最近 m 个（不含当步）符号之和；窗口内出现 NaN 时结果为 NaN。
+    """
+    for g in prange(offsets.size - 1):
+        s, e = offsets[g], offsets[g + 1]
+        buf = np.zeros(m + 1, dtype=np.float64)
+        acc = 0.0
+        nans = 0
+        for i in range(s, e):
+            k = i - s
+            if k == 0:
+                d = np.nan
+            else:
+                a = arr[i]
+                b = arr[i - 1]
+                d = np.nan if (np.isnan(a) or np.isnan(b)) else float(int(a > b) - int(a < b))
+            # 窗口为 i-m .. i-1 的符号：先移入上一步的符号，再移出 i-m-1 的符号
+            if k >= 1:
+                prev = buf[(k - 1) % (m + 1)]
+                if np.isnan(prev):
+                    nans += 1
+                else:
+                    acc += prev
+            if k >= m + 1:
+                old = buf[(k - m - 1) % (m + 1)]
+                if np.isnan(old):
+                    nans -= 1
+                else:
+                    acc -= old
+            buf[k % (m + 1)] = d
+            out[i] = acc if (k >= m + 1 and nans == 0) else np.nan
+
+
+@njit(cache=True, nogil=True, parallel=True)
+def cs_rank(arr, offsets, out):
+    """逐块（按日期分块时即逐个截面）计算分位排名。"""
+    for g in prange(offsets.size - 1):
+        _rank_pct_block(arr, offsets[g], offsets[g + 1], out)
+
+
+# ============================================================================
+# 预热
+# ============================================================================
+def warmup(dtype) -> int:
+    """以 dtype 精度在极小的输入上调用一遍全部公开内核。
+
+    首次调用时 numba 才会编译（或从 cache=True 的磁盘缓存加载）对应精度的机器码；
+    在进程启动时集中做完，避免计算途中各线程/进程在首个任务上等待编译。
+
+    Returns:
+        int: 调用的内核个数。
+    """
+    arr = np.arange(4, dtype=dtype)
+    out = np.empty_like(arr)
+    offsets = np.array([0, 4], dtype=np.int64)
+    calls = 0
+    for kernel in (delay, rolling_sum, rolling_mean, rolling_min, rolling_max, rolling_std,
+                   ts_rank, decay_linear, argmin, sign_delta_sum):
+        kernel(arr, offsets, 2, out)
+        calls += 1
+    rolling_corr(arr, arr, offsets, 2, out)
+    rolling_cov(arr, arr, offsets, 2, out)
+    sum_pair_corr(arr, offsets, 1, 2, 2, out)
+    cs_rank(arr, offsets, out)
+    return calls + 4
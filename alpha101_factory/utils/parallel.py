@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+进程池工具模块
+
+tmp 特征构建、因子批量计算与因子可视化都按任务分发到 spawn 进程池，
+本模块提供它们共用的启动与失败回退逻辑。
+"""
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Iterable, List, Optional
+
+from loguru import logger
+from tqdm import tqdm
+
+
+def run_spawned(fn: Callable, items: Iterable, workers: int,
+                initializer: Optional[Callable] = None, initargs: tuple = (),
+                chunksize: int = 1, desc: Optional[str] = None,
+                fallback: str = "改为在当前进程内执行") -> Optional[List]:
+    """在 spawn 进程池中按顺序对 items 逐个调用 fn，返回结果列表。
+
+    使用 spawn 而非 fork：父进程可能已启动 numba 并行线程池（TBB/OpenMP），fork 出的子进程会死锁。
+
+    Args:
+        fn (Callable): 任务函数，须为模块级函数（或其 partial）以便序列化。
+        items (Iterable): 任务参数。
+        workers (int): 进程数。
+        initializer (Optional[Callable]): 工作进程初始化函数（如重设日志、预热内核）。
+        initargs (tuple): 传给 initializer 的参数。
+        chunksize (int): 每次分发给工作进程的任务数。
+        desc (Optional[str]): 提供时用 tqdm 显示进度。
+        fallback (str): 进程池异常退出时警告日志中说明的回退方式。
+
+    Returns:
+        Optional[List]: 与 items 顺序一致的结果；进程池无法启动或异常退出时返回 None，由调用方回退。
+    """
+    items = list(items)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"),
+                                 initializer=initializer, initargs=initargs) as ex:
+            results = ex.map(fn, items, chunksize=chunksize)
+            if desc is not None:
+                results = tqdm(results, total=len(items), desc=desc)
+            return list(results)
+    except BrokenProcessPool as e:
+        # 常见于调用脚本缺少 `if __name__ == "__main__":` 保护，spawn 子进程无法启动
+        logger.warning(f"进程池异常退出，{fallback}: {e}")
+        return None
@@ -14,6 +14,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
 from typing import List, Mapping, MutableMapping, Optional, Sequence
 
@@ -21,17 +22,20 @@ import pandas as pd
 from loguru import logger
 
 from alpha101_factory.config import (
+    CPU_WORKERS,
     IMG_FACTORS_CS_DIR,
     IMG_FACTORS_HEATMAP_DIR,
     IMG_FACTORS_TS_DIR,
     PARQ_DIR_FACT,
 )
 from alpha101_factory.utils.io import read_parquet
+from alpha101_factory.utils.log import setup_logger
+from alpha101_factory.utils.parallel import run_spawned
 from alpha101_factory.viz.plots import (
     plot_factor_cross_section,
     plot_factor_timeseries,
     plot_heatmap,
-    save_fig,
+    save_figs,
 )
 
 
@@ -46,9 +50,9 @@ class FactorVisualArtifacts:
 
 
 def _coerce_datetime(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    if "datetime" in df.columns:
-        df["datetime"] = pd.to_datetime(df["datetime"], errors="coerce")
+    # 已是 datetime64 时不转换，也不做防御性整表复制
+    if "datetime" in df.columns and not pd.api.types.is_datetime64_any_dtype(df["datetime"]):
+        df = df.assign(datetime=pd.to_datetime(df["datetime"], errors="coerce"))
     return df.dropna(subset=["datetime", "symbol", "value"], how="any")
 
 
@@ -149,10 +153,11 @@ def generate_factor_visuals(
         heat_name = "_".join(heatmap_list[:5]) or "all"
         heat_path = IMG_FACTORS_HEATMAP_DIR / f"{factor_name}_{heat_name}.png"
 
-        outputs["timeseries"] = save_fig(ts_fig, ts_path)
-        outputs["cross_section"] = save_fig(cs_fig, cs_path)
+        # 同一因子的几张图一起导出，共用一次 kaleido 会话
+        jobs = {"timeseries": (ts_fig, ts_path), "cross_section": (cs_fig, cs_path)}
         if heat_fig is not None:
-            outputs["heatmap"] = save_fig(heat_fig, heat_path)
+            jobs["heatmap"] = (heat_fig, heat_path)
+        outputs.update(zip(jobs, save_figs(list(jobs.values()))))
     else:
         outputs["timeseries"] = ts_fig
         outputs["cross_section"] = cs_fig
@@ -168,6 +173,18 @@ def _discover_factor_names(prefix: str = "Alpha") -> List[str]:
     return names
 
 
+# 自动模式下因子数少于该值时不开进程池：spawn 子进程导入 pandas/plotly 需要数秒，少量因子得不偿失
+PROCESS_MIN_FACTORS = 8
+
+
+def _init_render_worker() -> None:
+    """渲染进程初始化：重设日志，并预先加载默认的 plotly 模板。"""
+    import plotly.io as pio
+
+    setup_logger()
+    pio.templates[pio.templates.default]
+
+
 def generate_all_factor_visuals(
     *,
     factors: Optional[Sequence[str]] = None,
@@ -177,25 +194,46 @@ def generate_all_factor_visuals(
     heatmap_top: int = 12,
     limit: Optional[int] = None,
     save: bool = True,
+    max_workers: Optional[int] = None,
 ) -> Mapping[str, FactorVisualArtifacts]:
-    """批量渲染多个因子的可视化。"""
+    """批量渲染多个因子的可视化。
+
+    因子之间互不依赖，可用进程池并行（图形构造与 kaleido 导出大多在 GIL 内）：
+    `max_workers` 为 None 且 `save=True` 时取 `CPU_WORKERS`，且因子数不少于 `PROCESS_MIN_FACTORS`
+    才启用进程池；`save=False` 时默认在当前进程内渲染（否则每张图都要序列化传回父进程）；
+    显式指定大于 1 的值则总是启用；设为 1 则在当前进程内逐个渲染。
+    """
 
     if factors is None or not factors:
         factors = _discover_factor_names(prefix)
 
     if limit is not None and limit > 0:
         factors = list(factors)[:limit]
+    factors = list(factors)
+
+    render = partial(
+        generate_factor_visuals,
+        ts_symbol=ts_symbol,
+        heatmap_symbols=heatmap_symbols,
+        heatmap_top=heatmap_top,
+        save=save,
+    )
+
+    if max_workers is None:
+        workers = CPU_WORKERS if save and len(factors) >= PROCESS_MIN_FACTORS else 1
+    else:
+        workers = max_workers
+    workers = min(workers, len(factors))
+    arts = None
+    if workers > 1:
+        # 每个进程自行读取各自的因子文件
+        arts = run_spawned(render, factors, workers, initializer=_init_render_worker,
+                           fallback="改为逐个渲染")
+    if arts is None:
+        arts = [render(name) for name in factors]
 
     results: MutableMapping[str, FactorVisualArtifacts] = {}
-
-    for name in factors:
-        art = generate_factor_visuals(
-            name,
-            ts_symbol=ts_symbol,
-            heatmap_symbols=heatmap_symbols,
-            heatmap_top=heatmap_top,
-            save=save,
-        )
+    for name, art in zip(factors, arts):
         if art.outputs:
             results[name] = art
     return results
@@ -7,22 +7,53 @@
 2. 因子时间序列绘制；
 3. 因子截面分布绘制；
 4. 因子热力图绘制；
-5. 通用图像保存函数。
+5. 通用图像保存函数（`save_fig` 单张保存，`save_figs` 批量保存）。
 
 内部辅助函数 `_ensure_datetime_series` 与 `_datetime_array_for_plot`
-用于时间数据的标准化，确保绘图时兼容各种输入格式。
+用于时间数据的标准化，确保绘图时兼容各种输入格式；`_parsed_datetime`
+在同一张表被多次绘图时复用解析结果。
 """
 
+import weakref
 from pathlib import Path
-from typing import Sequence, Union
+from typing import Callable, Dict, List, Sequence, Tuple, Union
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
+import plotly.io as pio
 from loguru import logger
 from plotly.subplots import make_subplots
 from typing import Optional
 
+try:
+    import polars as pl
+    _PL = True
+except Exception:
+    _PL = False
+
+try:
+    from numba import njit
+    _NB = True
+except Exception:
+    _NB = False
+
+try:
+    import orjson  # noqa: F401  plotly 的 orjson 序列化引擎
+    _ORJSON = True
+except Exception:
+    _ORJSON = False
+
+# 单条折线/K线超过该点数时先降采样再交给 Plotly（None 或 0 表示不降采样）
+MAX_PLOT_POINTS = 5000
+# 热力图格子数超过该值时按块求均值栅格化到至多 HEATMAP_WIDTH × HEATMAP_HEIGHT
+HEATMAP_MAX_CELLS = 10_000
+HEATMAP_WIDTH = 800
+HEATMAP_HEIGHT = 600
+
+# 日期横轴的默认样式；各绘图函数据此一次性构造布局，不再单独调用 update_xaxes
+_XAXIS_DATE = dict(type="date", tickformat="%Y-%m-%d", tickangle=-45, ticks="outside")
+
 
 def _ensure_datetime_series(s: pd.Series) -> pd.Series:
     """确保序列转换为 pandas datetime 类型。
@@ -43,9 +74,11 @@ def _ensure_datetime_series(s: pd.Series) -> pd.Series:
 
     if pd.api.types.is_integer_dtype(s) or pd.api.types.is_float_dtype(s):
         v = pd.to_numeric(s, errors="coerce")
-        m = v.dropna().abs().median()
         # ===== 基于数量级的启发式判断时间戳单位 =====
-        # ~1e18: ns, ~1e12: ms, ~1e9: s
+        # ~1e18: ns, ~1e12: ms, ~1e9: s；只需区分数量级，取前 256 个非空值的最大值即可，无需整列排序求中位数
+        arr = v.to_numpy(dtype=np.float64)
+        sample = arr[np.flatnonzero(~np.isnan(arr))[:256]]
+        m = np.abs(sample).max() if sample.size else 0.0
         if m > 1e14:
             unit = "ns"
         elif m > 1e11:
@@ -54,29 +87,236 @@ def _ensure_datetime_series(s: pd.Series) -> pd.Series:
             unit = "s"
         return pd.to_datetime(v, unit=unit, errors="coerce")
 
-    # 默认：字符串或 object 类型
-    return pd.to_datetime(s, errors="coerce")
+    # 默认：字符串或 object 类型。先走 ISO8601 的 C 解析路径（同时兼容仅日期 / 日期+时间混排），
+    # 存在非 ISO 格式的值时再回退为逐值推断并把无法解析的值置为 NaT
+    try:
+        return pd.to_datetime(s, format="ISO8601", cache=True)
+    except (ValueError, TypeError):
+        return pd.to_datetime(s, errors="coerce", cache=True)
+
+
+# (id(DataFrame), 名称) -> (表的弱引用, 行数, 结果)
+_FRAME_CACHE: Dict[Tuple[int, str], Tuple[weakref.ref, int, object]] = {}
+
+
+def _frame_cached(fdf: pd.DataFrame, name: str, compute: Callable[[], object]):
+    """按表缓存派生结果：弱引用校验是同一对象且行数未变，表被回收时条目随之删除。"""
+    key = (id(fdf), name)
+    hit = _FRAME_CACHE.get(key)
+    if hit is not None and hit[0]() is fdf and hit[1] == len(fdf):
+        return hit[2]
+
+    value = compute()
+    _FRAME_CACHE[key] = (weakref.ref(fdf, lambda _, k=key: _FRAME_CACHE.pop(k, None)),
+                         len(fdf), value)
+    return value
+
+
+def _parsed_datetime(fdf: pd.DataFrame) -> pd.Series:
+    """返回 `fdf["datetime"]` 的 datetime 版本，已是 datetime64 时不做任何解析。
+
+    非 datetime 列的解析结果按表缓存，同一张因子表依次绘制时间序列、截面与热力图时只解析一次。
+
+    Args:
+        fdf (pd.DataFrame): 含 "datetime" 列的数据表。
+
+    Returns:
+        pd.Series: 与 `fdf` 同索引的 datetime 序列。
+    """
+    col = fdf["datetime"]
+    if pd.api.types.is_datetime64_any_dtype(col):
+        return col
+    return _frame_cached(fdf, "datetime", lambda: _ensure_datetime_series(col))
+
+
+def _index_by_symbol(fdf: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """股票代码 -> 该股票在 `fdf` 中的行号数组（升序）；按表缓存，逐只绘图时只分组一次。
+
+    Args:
+        fdf (pd.DataFrame): 含 "symbol" 列的数据表。
+
+    Returns:
+        Dict[str, np.ndarray]: `groupby("symbol").indices` 的结果。
+    """
+    return _frame_cached(fdf, "symbol_index",
+                         lambda: fdf.groupby("symbol", sort=False).indices)
 
 
 def _datetime_array_for_plot(s: Union[pd.Series, Sequence]) -> np.ndarray:
-    """将输入序列转换为无时区的 Python datetime 数组。
+    """将输入序列转换为无时区的 datetime64[ms] 数组。
+
+    不再逐元素生成 Python datetime 对象；Plotly 直接把 datetime64 数组识别为日期轴。
 
     Args:
         s (Union[pd.Series, Sequence]): 输入序列，可为 pandas.Series 或 list。
 
     Returns:
-        np.ndarray: datetime 对象数组，dtype=object。
+        np.ndarray: dtype 为 datetime64[ms] 的数组（无法解析的值为 NaT）。
     """
     if not isinstance(s, pd.Series):
         s = pd.Series(s)
 
-    dt = pd.to_datetime(s, errors="coerce")
-    dt = dt.dt.tz_localize(None)  # 去除时区，避免绘图库报错
-    return np.array(dt.dt.to_pydatetime())
+    dt = _ensure_datetime_series(s)
+    if dt.dt.tz is not None:
+        dt = dt.dt.tz_localize(None)  # 去除时区，避免绘图库报错
+    return dt.to_numpy(dtype="datetime64[ms]")
+
+
+def _date_xaxis(tickformat: str, tickangle: int, **extra) -> dict:
+    """日期横轴的布局字典；参数与默认值相同且无额外项时直接复用 `_XAXIS_DATE`。"""
+    if (not extra and tickformat == _XAXIS_DATE["tickformat"]
+            and tickangle == _XAXIS_DATE["tickangle"]):
+        return _XAXIS_DATE
+    return {**_XAXIS_DATE, "tickformat": tickformat, "tickangle": tickangle, **extra}
+
+
+def _is_polars(fdf) -> bool:
+    """是否为 polars.DataFrame（未安装 polars 时恒为 False）。"""
+    return _PL and isinstance(fdf, pl.DataFrame)
+
+
+def _polars_column(d, name: str) -> pd.Series:
+    """把 polars 表的一列取为 pandas Series（经 numpy，不做整表 to_pandas）。"""
+    return pd.Series(d.get_column(name).to_numpy())
+
+
+def _trace_values(s: pd.Series) -> np.ndarray:
+    """把数值列转换为连续的 float32 ndarray 再交给 Plotly。
+
+    Plotly 对 ndarray 直接以 base64 typed array 序列化，省去对 Series 的逐元素复制；
+    float32 的精度对绘图足够，且传给浏览器的字节数减半。
+
+    Args:
+        s (pd.Series): 数值列。
+
+    Returns:
+        np.ndarray: float32 数组（缺失值为 NaN）。
+    """
+    return np.ascontiguousarray(s.to_numpy(dtype=np.float32, na_value=np.nan))
+
+
+if _NB:
+    @njit(cache=True, nogil=True)
+    def _lttb_kernel(x, y, edges, out):
+        """LTTB 的单遍循环（下标写入 out[1:-1]），与 `_lttb_indices` 的 NumPy 实现逐点一致。"""
+        n = x.size
+        a = 0
+        for i in range(out.size - 2):
+            lo, hi = edges[i], edges[i + 1]
+            nhi = edges[i + 2] if i + 2 < edges.size else n
+            cx = 0.0
+            cy = 0.0
+            for j in range(hi, nhi):
+                cx += x[j]
+                cy += y[j]
+            cx /= nhi - hi
+            cy /= nhi - hi
+            best = -1.0
+            pick = lo
+            for j in range(lo, hi):
+                area = abs((x[a] - cx) * (y[j] - y[a]) - (x[a] - x[j]) * (cy - y[a]))
+                if area > best:
+                    best = area
+                    pick = j
+            a = pick
+            out[i + 1] = a
+
+    @njit(cache=True, nogil=True)
+    def _ohlc_bucket_kernel(o, h, l, c, starts, out_o, out_h, out_l, out_c):
+        """按 starts 分桶单遍合并 OHLC：开=首、高=最大、低=最小、收=末。"""
+        n = o.size
+        for b in range(starts.size):
+            s = starts[b]
+            e = starts[b + 1] if b + 1 < starts.size else n
+            hi = h[s]
+            lo = l[s]
+            for i in range(s + 1, e):
+                if h[i] > hi:
+                    hi = h[i]
+                if l[i] < lo:
+                    lo = l[i]
+            out_o[b] = o[s]
+            out_h[b] = hi
+            out_l[b] = lo
+            out_c[b] = c[e - 1]
+
+
+def _lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets 降采样，返回保留点的下标。
+
+    首尾两点必选；其余点均分为 n_out-2 个桶，每个桶选出与“上一个已选点”和
+    “下一个桶均值”构成三角形面积最大的点，折线形状在视觉上与原序列基本一致。
+
+    Args:
+        x (np.ndarray): 横坐标（数值，单调递增）。
+        y (np.ndarray): 纵坐标（不含 NaN）。
+        n_out (int): 输出点数（≥3）。
+
+    Returns:
+        np.ndarray: 升序的保留点下标。
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    if _NB:
+        _lttb_kernel(np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64), edges, out)
+        return out
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = hi, (edges[i + 2] if i + 2 < len(edges) else n)
+        cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def _downsample_line(x: np.ndarray, y: np.ndarray, max_points: Optional[int]):
+    """折线超过 max_points 个点时用 LTTB 降采样（只保留 y 非空的点）。"""
+    if not max_points or len(x) <= max_points:
+        return x, y
+    is_dt = np.issubdtype(x.dtype, np.datetime64)
+    ok = ~np.isnan(y) & (~np.isnat(x) if is_dt else True)
+    x, y = x[ok], y[ok]
+    idx = _lttb_indices(x.astype(np.int64) if is_dt else x, y.astype(np.float64), max_points)
+    return x[idx], y[idx]
+
+
+def _downsample_ohlc(x: np.ndarray, o: np.ndarray, h: np.ndarray, l: np.ndarray,
+                     c: np.ndarray, max_points: Optional[int]):
+    """K线超过 max_points 根时按等长分桶合并：开=首、高=最大、低=最小、收=末，保持 OHLC 语义。"""
+    n = len(x)
+    if not max_points or n <= max_points:
+        return x, o, h, l, c
+    starts = np.linspace(0, n, max_points, endpoint=False).astype(np.int64)
+    if _NB:
+        out = [np.empty(len(starts), dtype=v.dtype) for v in (o, h, l, c)]
+        _ohlc_bucket_kernel(o, h, l, c, starts, *out)
+        return (x[starts], *out)
+    ends = np.append(starts[1:], n) - 1
+    return (x[starts], o[starts], np.maximum.reduceat(h, starts),
+            np.minimum.reduceat(l, starts), c[ends])
+
+
+_OHLC_COLS = ["datetime", "open", "high", "low", "close"]
+
+
+def _ohlc_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """取出 OHLC 字段齐全的行并按时间排序；已有序时不再排序，也不做整表复制。"""
+    d = df.dropna(subset=_OHLC_COLS)
+    if not d["datetime"].is_monotonic_increasing:
+        d = d.sort_values("datetime", kind="stable")
+    return d
 
 
 def plot_kline(df: pd.DataFrame, title: str = "Kline",
-               tickformat: str = "%Y-%m-%d", tickangle: int = -45):
+               tickformat: str = "%Y-%m-%d", tickangle: int = -45,
+               max_points: Optional[int] = MAX_PLOT_POINTS):
     """绘制 K 线图。
 
     Args:
@@ -84,44 +324,89 @@ def plot_kline(df: pd.DataFrame, title: str = "Kline",
         title (str): 图表标题。
         tickformat (str): x 轴日期格式。
         tickangle (int): x 轴刻度角度。
+        max_points (Optional[int]): K 线根数上限，超出时按等长分桶合并；None 表示不合并。
 
     Returns:
         go.Figure: Plotly K线图对象。
     """
-    d = df.dropna().copy().sort_values("datetime")
-    x = _datetime_array_for_plot(d["datetime"])
-    fig = go.Figure(data=[go.Candlestick(
-        x=x, open=d["open"], high=d["high"], low=d["low"], close=d["close"]
-    )])
-    fig.update_layout(title=title, xaxis_rangeslider_visible=False, height=520)
-    fig.update_xaxes(type="date", tickformat=tickformat,
-                     tickangle=tickangle, ticks="outside")
-    return fig
+    d = _ohlc_rows(df)
+    x, o, h, l, c = _downsample_ohlc(
+        _datetime_array_for_plot(d["datetime"]), _trace_values(d["open"]),
+        _trace_values(d["high"]), _trace_values(d["low"]), _trace_values(d["close"]),
+        max_points)
+    layout = dict(title=title, height=520,
+                  xaxis=_date_xaxis(tickformat, tickangle, rangeslider={"visible": False}))
+    return go.Figure(data=[go.Candlestick(x=x, open=o, high=h, low=l, close=c)], layout=layout)
+
+
+def _symbol_series(fdf, symbol: str,
+                   symbol_index: Optional[Dict[str, np.ndarray]] = None) -> Tuple[pd.Series, pd.Series]:
+    """取出单只股票按时间排序的 (datetime, value) 两列，不复制整表。
+
+    pandas 表经按表缓存的 股票 -> 行号 映射与 datetime 解析结果取行；polars 表在 polars 中筛选排序。
+    """
+    if _is_polars(fdf):
+        d = fdf.filter(pl.col("symbol") == symbol).sort("datetime")
+        return _polars_column(d, "datetime"), _polars_column(d, "value")
+
+    if symbol_index is None:
+        symbol_index = _index_by_symbol(fdf)
+    # 时间取自按表缓存的解析结果，同一张表的时间序列/截面/热力图共用一次解析
+    rows = symbol_index.get(symbol, np.empty(0, dtype=np.intp))
+    dts, vals = _parsed_datetime(fdf).take(rows), fdf["value"].take(rows)
+    if not dts.is_monotonic_increasing:
+        order = np.argsort(dts.to_numpy(), kind="stable")
+        dts, vals = dts.take(order), vals.take(order)
+    return dts, vals
 
 
 def plot_factor_timeseries(fdf: pd.DataFrame, symbol: str, title: str,
-                           tickformat: str = "%Y-%m-%d", tickangle: int = -45):
+                           tickformat: str = "%Y-%m-%d", tickangle: int = -45,
+                           max_points: Optional[int] = MAX_PLOT_POINTS,
+                           symbol_index: Optional[Dict[str, np.ndarray]] = None):
     """绘制单只股票的因子时间序列。
 
     Args:
-        fdf (pd.DataFrame): 因子结果表，需包含 ["datetime","symbol","value"]。
+        fdf (pd.DataFrame): 因子结果表，需包含 ["datetime","symbol","value"]；
+            也可直接传入 polars.DataFrame，筛选与排序在 polars 中完成。
         symbol (str): 股票代码。
         title (str): 图表标题。
         tickformat (str): x 轴日期格式。
         tickangle (int): x 轴刻度角度。
+        max_points (Optional[int]): 点数上限，超出时用 LTTB 降采样；None 表示不降采样。
+        symbol_index (Optional[Dict[str, np.ndarray]]): 预先构建的 股票 -> 行号 映射
+            （见 `_index_by_symbol`）；缺省时按表自动构建并缓存。
 
     Returns:
         go.Figure: Plotly 折线图对象。
     """
-    d = fdf[fdf["symbol"] == symbol].copy().sort_values("datetime")
-    x = _datetime_array_for_plot(d["datetime"])
-    fig = px.line(x=x, y=d["value"], title=f"{title} | {symbol}")
-    fig.update_layout(height=420)
-    fig.update_xaxes(type="date", tickformat=tickformat,
-                     tickangle=tickangle, ticks="outside")
+    dts, vals = _symbol_series(fdf, symbol, symbol_index)
+    x, y = _downsample_line(_datetime_array_for_plot(dts), _trace_values(vals), max_points)
+    fig = px.line({"x": x, "value": y}, x="x", y="value",
+                  title=f"{title} | {symbol}")
+    fig.update_layout(height=420, xaxis=_date_xaxis(tickformat, tickangle))
     return fig
 
 
+def _rows_on(dts: pd.Series, dt) -> Union[slice, np.ndarray]:
+    """`dts` 中等于 `dt` 的行位置：有序时二分查找得到切片，否则比较 int64 视图得到布尔掩码。"""
+    if pd.isna(dt):
+        return slice(0, 0)
+    if getattr(dts.dt, "tz", None) is not None:
+        return (dts == pd.Timestamp(dt)).to_numpy()
+
+    values = dts.to_numpy()
+    wanted = np.datetime64(pd.Timestamp(dt))
+    target = wanted.astype(values.dtype)
+    if target != wanted:  # 列的时间精度表示不了 dt，不可能有相等的行
+        return slice(0, 0)
+    if dts.is_monotonic_increasing:
+        lo = np.searchsorted(values, target, side="left")
+        hi = np.searchsorted(values, target, side="right")
+        return slice(lo, hi)
+    return values.view("i8") == target.view("i8")
+
+
 def plot_factor_cross_section(fdf: pd.DataFrame, dt=None, topn: int = 100,
                               title: str = "Factor cross-section",
                               tickformat: str = "%Y-%m-%d", tickangle: int = -45):
@@ -138,28 +423,105 @@ def plot_factor_cross_section(fdf: pd.DataFrame, dt=None, topn: int = 100,
     Returns:
         go.Figure: Plotly 柱状图对象。
     """
+    dts = _parsed_datetime(fdf)
     if dt is None:
-        dt = pd.to_datetime(fdf["datetime"]).max()
-
-    d = fdf.copy()
-    d["datetime"] = _ensure_datetime_series(d["datetime"])
-    d = d[d["datetime"] == pd.to_datetime(dt)].copy()
-
-    d["abs"] = d["value"].abs()
-    d = d.sort_values("abs", ascending=False).head(topn)
-
-    fig = px.bar(d, x="symbol", y="value",
+        dt = dts.max()
+
+    # 先按日期筛出当日的少量行，避免整表 copy
+    d = fdf.iloc[_rows_on(dts, dt)]
+
+    # 先用 argpartition 以 O(N) 选出 |value| 最大的 topn 行，再只对这 topn 行排序
+    neg_abs = -np.abs(d["value"].to_numpy(dtype=np.float64, na_value=np.nan))
+    if len(d) > topn > 0:
+        idx = np.argpartition(neg_abs, topn - 1)[:topn]
+    else:
+        idx = np.arange(len(d))[:max(topn, 0)]
+    idx = idx[np.argsort(neg_abs[idx], kind="stable")]
+    d = d.iloc[idx]
+
+    fig = px.bar({"symbol": d["symbol"].to_numpy(), "value": _trace_values(d["value"])},
+                 x="symbol", y="value",
                  title=f"{title} | {pd.to_datetime(dt).date()}")
     fig.update_layout(height=420, xaxis={'categoryorder': 'total descending'})
     return fig
 
 
+def _pivot_values(dts: pd.Series, syms: pd.Series, values: pd.Series) -> pd.DataFrame:
+    """把长表 (datetime, symbol, value) 铺成 日期 × 股票 的宽表，不走 pivot_table 的聚合路径。
+
+    日期与股票各 factorize 一次后直接写入预分配的 float32 矩阵；同一 (日期, 股票)
+    出现多次时保留最后一条。与 `pivot_table` 一样会丢弃缺失的日期/股票以及全空的行列。
+
+    Args:
+        dts (pd.Series): datetime 列。
+        syms (pd.Series): 股票代码列。
+        values (pd.Series): 因子值列。
+
+    Returns:
+        pd.DataFrame: index 为排序后的日期，columns 为排序后的股票代码。
+    """
+    di, dates = pd.factorize(dts, sort=True)
+    si, names = pd.factorize(syms, sort=True)
+    v = values.to_numpy(dtype=np.float32, na_value=np.nan)
+
+    ok = (di >= 0) & (si >= 0)
+    flat = di[ok] * len(names) + si[ok]
+    v = v[ok]
+    if flat.size and np.bincount(flat).max() > 1:
+        # 重复键：倒序后取首次出现位置，即原序的最后一条
+        _, first = np.unique(flat[::-1], return_index=True)
+        keep = flat.size - 1 - first
+        flat, v = flat[keep], v[keep]
+
+    grid = np.full(len(dates) * len(names), np.nan, dtype=np.float32)
+    grid[flat] = v
+    grid = grid.reshape(len(dates), len(names))
+
+    rows = ~np.isnan(grid).all(axis=1)
+    cols = ~np.isnan(grid).all(axis=0)
+    return pd.DataFrame(grid[rows][:, cols],
+                        index=pd.Index(dates[rows], name="datetime"),
+                        columns=pd.Index(names[cols], name="symbol"))
+
+
+def _bin_mean(grid: np.ndarray, axis: int, n_bins: int):
+    """沿 axis 把 grid 等长分为 n_bins 块并对每块求 nan 均值（全空的块为 NaN）。
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (分块均值后的矩阵, 每块起始下标)。
+    """
+    n = grid.shape[axis]
+    if n <= n_bins:
+        return grid, np.arange(n)
+    starts = np.linspace(0, n, n_bins, endpoint=False).astype(np.int64)
+    finite = ~np.isnan(grid)
+    total = np.add.reduceat(np.where(finite, grid, 0), starts, axis=axis)
+    count = np.add.reduceat(finite, starts, axis=axis)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (total / count).astype(grid.dtype, copy=False), starts
+
+
+def _rasterize(pvt: pd.DataFrame) -> pd.DataFrame:
+    """把 日期 × 股票 的宽表按块均值压缩到至多 HEATMAP_WIDTH 个日期 × HEATMAP_HEIGHT 只股票。
+
+    日期块以块内首个日期作为标签，股票块以“首~尾”代码作为标签。
+    """
+    grid, rows = _bin_mean(pvt.to_numpy(), 0, HEATMAP_WIDTH)
+    grid, cols = _bin_mean(grid, 1, HEATMAP_HEIGHT)
+    names = pvt.columns
+    if len(cols) < len(names):
+        ends = np.append(cols[1:], len(names)) - 1
+        names = pd.Index([f"{names[a]}~{names[b]}" if a != b else names[a]
+                          for a, b in zip(cols, ends)], name=names.name)
+    return pd.DataFrame(grid, index=pvt.index[rows], columns=names)
+
+
 def plot_heatmap(fdf: pd.DataFrame, symbols: list[str], title: str = "Factor heatmap",
                  tickformat: str = "%Y-%m-%d", tickangle: int = -45):
     """绘制因子热力图（时间 × 股票）。
 
     Args:
-        fdf (pd.DataFrame): 因子结果表。
+        fdf (pd.DataFrame): 因子结果表；也可直接传入 polars.DataFrame，股票筛选在 polars 中完成。
         symbols (list[str]): 股票代码列表。
         title (str): 图表标题。
         tickformat (str): x 轴日期格式。
@@ -168,20 +530,45 @@ def plot_heatmap(fdf: pd.DataFrame, symbols: list[str], title: str = "Factor hea
     Returns:
         go.Figure: Plotly 热力图对象。
     """
-    d = fdf[fdf["symbol"].isin(symbols)].copy()
-    d["datetime"] = _ensure_datetime_series(d["datetime"])
-    pvt = d.pivot_table(index="datetime", columns="symbol", values="value")
+    if _is_polars(fdf):
+        d = fdf.filter(pl.col("symbol").is_in(list(symbols)))
+        pvt = _pivot_values(_ensure_datetime_series(_polars_column(d, "datetime")),
+                            _polars_column(d, "symbol"), _polars_column(d, "value"))
+    else:
+        # 由按表缓存的 股票 -> 行号 映射拼出选中行，不再对每行做字符串哈希（isin）
+        index = _index_by_symbol(fdf)
+        parts = [index[sym] for sym in dict.fromkeys(symbols) if sym in index]
+        rows = np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.intp)
+        pvt = _pivot_values(_parsed_datetime(fdf).take(rows), fdf["symbol"].take(rows),
+                            fdf["value"].take(rows))
+    if pvt.size > HEATMAP_MAX_CELLS:
+        # 大面板只把固定分辨率的栅格发给浏览器
+        pvt = _rasterize(pvt)
 
     fig = px.imshow(pvt.T, aspect="auto", origin="lower", title=title)
-    fig.update_layout(height=500)
-    fig.update_xaxes(type="date", tickformat=tickformat,
-                     tickangle=tickangle, ticks="outside")
+    fig.update_layout(height=500, xaxis=_date_xaxis(tickformat, tickangle))
     return fig
 
 
+def _write_text_fig(fig, path: Path) -> bool:
+    """按后缀以 JSON / HTML 保存（不经 kaleido 渲染）；其他后缀返回 False。"""
+    suffix = path.suffix.lower()
+    if suffix == ".json":
+        # orjson 引擎直接序列化 numpy 数组，比默认 json 编码快得多
+        path.write_text(pio.to_json(fig, engine="orjson" if _ORJSON else "json", pretty=False),
+                        encoding="utf-8")
+        return True
+    if suffix == ".html":
+        fig.write_html(str(path), include_plotlyjs="cdn")
+        return True
+    return False
+
+
 def save_fig(fig, path: Path) -> Path:
     """保存图像为文件。
 
+    后缀为 .json / .html 时直接序列化，无需启动 kaleido；其他后缀（png/svg/pdf 等）经 kaleido 渲染。
+
     Args:
         fig: Plotly 图表对象。
         path (Path): 输出文件路径。
@@ -191,13 +578,47 @@ def save_fig(fig, path: Path) -> Path:
     """
     try:
         path.parent.mkdir(parents=True, exist_ok=True)
-        fig.write_image(str(path))  # 依赖 `kaleido`
+        if not _write_text_fig(fig, path):
+            fig.write_image(str(path))  # 依赖 `kaleido`
         logger.info(f"图像已保存至: {path}")
     except Exception as e:
         logger.error(f"保存图像失败: {path}, 错误: {e}")
     return path
 
 
+def save_figs(items: Sequence[Tuple[object, Path]]) -> List[Path]:
+    """批量保存图像：需要渲染的图在同一个 kaleido 会话中一次导出，省去逐张启动浏览器的开销。
+
+    Args:
+        items (Sequence[Tuple[object, Path]]): (Plotly 图表对象, 输出路径) 列表。
+
+    Returns:
+        List[Path]: 与输入顺序一致的输出路径。
+    """
+    figs, paths = [], []
+    for fig, path in items:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if _write_text_fig(fig, path):
+                logger.info(f"图像已保存至: {path}")
+                continue
+        except Exception as e:
+            logger.error(f"保存图像失败: {path}, 错误: {e}")
+            continue
+        figs.append(fig)
+        paths.append(path)
+
+    if len(figs) == 1:
+        save_fig(figs[0], paths[0])
+    elif figs:
+        try:
+            pio.write_images(figs, [str(p) for p in paths])  # 依赖 `kaleido`
+            for path in paths:
+                logger.info(f"图像已保存至: {path}")
+        except Exception as e:
+            logger.error(f"批量保存图像失败: {[str(p) for p in paths]}, 错误: {e}")
+    return [path for _, path in items]
+
 
 def plot_kline_with_factor(
     kline_df: pd.DataFrame,
@@ -207,6 +628,7 @@ def plot_kline_with_factor(
     tickformat: str = "%Y-%m-%d",
     tickangle: int = -45,
     factor_label: Optional[str] = None,
+    max_points: Optional[int] = MAX_PLOT_POINTS,
 ):
     """绘制 K线 + 因子时序的组合图（上下两个子图）。
 
@@ -218,18 +640,22 @@ def plot_kline_with_factor(
         tickformat (str): x 轴日期格式。
         tickangle (int): x 轴刻度角度。
         factor_label (Optional[str]): 因子名称，用于 y 轴标题。
+        max_points (Optional[int]): 每个子图的点数上限（K 线分桶合并、因子 LTTB）；None 表示不降采样。
 
     Returns:
         go.Figure: Plotly 子图对象。
     """
     # 筛选并排序行情数据
-    d_price = kline_df.dropna().copy()
-    d_price = d_price.sort_values("datetime")
-    x_price = _datetime_array_for_plot(d_price["datetime"])
+    d_price = _ohlc_rows(kline_df)
+    x_price, o, h, l, c = _downsample_ohlc(
+        _datetime_array_for_plot(d_price["datetime"]), _trace_values(d_price["open"]),
+        _trace_values(d_price["high"]), _trace_values(d_price["low"]),
+        _trace_values(d_price["close"]), max_points)
 
     # 筛选并排序因子数据
-    d_fac = factor_df[factor_df["symbol"] == symbol].copy().sort_values("datetime")
-    x_fac = _datetime_array_for_plot(d_fac["datetime"])
+    fac_dts, fac_vals = _symbol_series(factor_df, symbol)
+    x_fac, y_fac = _downsample_line(_datetime_array_for_plot(fac_dts),
+                                    _trace_values(fac_vals), max_points)
 
     # 子图布局：2 行 1 列，X 轴共享
     fig = make_subplots(
@@ -244,10 +670,10 @@ def plot_kline_with_factor(
     fig.add_trace(
         go.Candlestick(
             x=x_price,
-            open=d_price["open"],
-            high=d_price["high"],
-            low=d_price["low"],
-            close=d_price["close"],
+            open=o,
+            high=h,
+            low=l,
+            close=c,
             name="Kline"
         ),
         row=1, col=1
@@ -257,7 +683,7 @@ def plot_kline_with_factor(
     fig.add_trace(
         go.Scatter(
             x=x_fac,
-            y=d_fac["value"],
+            y=y_fac,
             mode="lines",
             name=factor_label or "Factor",
             line=dict(color="royalblue", width=2)
@@ -269,9 +695,8 @@ def plot_kline_with_factor(
     fig.update_layout(
         title=title,
         height=720,
-        xaxis_rangeslider_visible=False
+        xaxis=_date_xaxis(tickformat, tickangle, rangeslider={"visible": False}),
+        xaxis2=_date_xaxis(tickformat, tickangle),
     )
-    fig.update_xaxes(type="date", tickformat=tickformat,
-                     tickangle=tickangle, ticks="outside")
 
     return fig
\ No newline at end of file
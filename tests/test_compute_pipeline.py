@@ -0,0 +1,91 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from alpha101_factory.factors import tmp_features
+from alpha101_factory.pipeline import compute_factor as cf
+
+FACTORS = ["Alpha001", "Alpha009", "Alpha054", "Alpha101"]
+
+
+@pytest.fixture
+def data_root(tmp_path, monkeypatch):
+    """在 tmp_path 下写 3 只不等长、带缺口的股票的 K线与 tmp 文件。"""
+    dirs = {name: tmp_path / sub for name, sub in
+            [("PARQ_DIR_KLINES", "klines_daily"), ("PARQ_DIR_TMP", "tmp_features"),
+             ("PARQ_DIR_FACT", "factors")]}
+    for path in dirs.values():
+        path.mkdir()
+    for name, path in dirs.items():
+        monkeypatch.setattr(cf, name, path)
+        if hasattr(tmp_features, name):
+            monkeypatch.setattr(tmp_features, name, path)
+    # spawn 出的工作进程重新导入 config，看不到上面的 monkeypatch
+    monkeypatch.setenv("ALPHA101_DATA_ROOT", str(tmp_path))
+
+    rng = np.random.default_rng(7)
+    dates = pd.bdate_range("2021-01-01", periods=60)
+    layout = {"600000": dates, "000001": dates[10:50], "300750": dates.delete([3, 4, 20, 41])}
+    for sym, ds in layout.items():
+        close = 10 + rng.normal(size=ds.size).cumsum() * 0.2
+        k = pd.DataFrame({
+            "datetime": ds, "symbol": sym,
+            "open": close + rng.normal(size=ds.size) * 0.05,
+            "high": close + 0.3, "low": close - 0.3, "close": close,
+            "volume": rng.integers(1_000, 5_000, size=ds.size).astype(float),
+        })
+        k["amount"] = k["volume"] * k["close"]
+        k.to_parquet(cf._paths(sym)[0], index=False)
+    assert tmp_features.build_tmp_all(list(layout), max_workers=1) == len(layout)
+    return sorted(layout)
+
+
+def _normalized(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.sort_values(["datetime", "symbol"]).reset_index(drop=True)
+    return df.astype({c: np.float64 for c in df.columns if c not in ("datetime", "symbol")})
+
+
+def test_loaders_agree_with_and_without_projection(data_root, monkeypatch):
+    full = _normalized(cf._load_dataset(data_root))
+    assert len(full) == 60 + 40 + 56
+    pd.testing.assert_frame_equal(_normalized(cf._load_threaded(data_root)), full)
+    monkeypatch.setattr(cf, "_PA", False)
+    pd.testing.assert_frame_equal(_normalized(cf._load_threaded(data_root)), full)
+    monkeypatch.setattr(cf, "_PA", True)
+
+    columns = ["close", "vwap", "adv20"]
+    expected = full[["datetime", "symbol", *columns]]
+    for loader in (cf._load_dataset, cf._load_threaded):
+        got = _normalized(loader(data_root, columns))
+        pd.testing.assert_frame_equal(got[expected.columns], expected)
+
+
+def _factor_files():
+    return {name: pd.read_parquet(cf.PARQ_DIR_FACT / f"{name}.parquet") for name in FACTORS}
+
+
+def test_shared_key_writer_matches_reset_index_path(data_root):
+    assert cf.compute_and_save_many(FACTORS, data_root, max_workers=2) == len(FACTORS)
+    shared = _factor_files()
+
+    df = cf._load_join(data_root)
+    for name in FACTORS:
+        assert cf.compute_and_save_df(name, df, keys=None)
+    for name, out in _factor_files().items():
+        pd.testing.assert_frame_equal(shared[name], out, check_dtype=False)
+
+
+def test_process_executor_matches_threads(data_root):
+    assert cf.compute_and_save_many(FACTORS, data_root, max_workers=2) == len(FACTORS)
+    threaded = _factor_files()
+    for name in FACTORS:
+        (cf.PARQ_DIR_FACT / f"{name}.parquet").unlink()
+    assert cf.compute_and_save_many(FACTORS, data_root, max_workers=2,
+                                    executor="process") == len(FACTORS)
+    for name, out in _factor_files().items():
+        pd.testing.assert_frame_equal(threaded[name], out)
@@ -56,3 +56,90 @@ def test_generate_all_factor_visuals_reads_parquet():
     finally:
         if path.exists():
             path.unlink()
+
+
+def test_cross_section_parses_string_datetime_once():
+    from alpha101_factory.viz import plots
+
+    df = _sample_frame()
+    df["datetime"] = df["datetime"].dt.strftime("%Y-%m-%d")
+
+    fig = plots.plot_factor_cross_section(df, title="AlphaTest")
+    parsed = plots._parsed_datetime(df)
+    assert parsed is plots._parsed_datetime(df)
+    assert list(fig.data[0].x) == ["000003", "000002", "000001"]
+    assert fig.layout.title.text.endswith("2021-01-06")
+
+
+def test_pivot_values_matches_pivot_table():
+    from alpha101_factory.viz.plots import _pivot_values
+
+    df = _sample_frame().sample(frac=1.0, random_state=0)
+    df.loc[df["symbol"] == "000003", "value"] = float("nan")
+
+    expected = df.pivot_table(index="datetime", columns="symbol", values="value")
+    got = _pivot_values(df["datetime"], df["symbol"], df["value"])
+
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False, atol=1e-6)
+
+
+def test_downsampling_keeps_extremes_and_ohlc_semantics():
+    import numpy as np
+    from alpha101_factory.viz.plots import _downsample_ohlc, _lttb_indices
+
+    y = np.sin(np.linspace(0, 20, 2000)) + np.linspace(0, 1, 2000)
+    idx = _lttb_indices(np.arange(2000, dtype=float), y, 200)
+    assert len(idx) == 200 and idx[0] == 0 and idx[-1] == 1999
+    assert (np.diff(idx) > 0).all()
+    assert y[idx].max() == y.max()
+
+    x = np.arange(10)
+    o, h, l, c = x + 0.5, x + 1.0, x - 1.0, x + 0.25
+    bx, bo, bh, bl, bc = _downsample_ohlc(x, o, h, l, c, 5)
+    assert list(bx) == [0, 2, 4, 6, 8]
+    assert list(bo) == list(o[[0, 2, 4, 6, 8]])
+    assert list(bh) == list(h[[1, 3, 5, 7, 9]])
+    assert list(bl) == list(l[[0, 2, 4, 6, 8]])
+    assert list(bc) == list(c[[1, 3, 5, 7, 9]])
+
+
+def test_save_figs_writes_json_without_kaleido(tmp_path):
+    import json
+
+    from alpha101_factory.viz.plots import plot_factor_timeseries, save_figs
+
+    fig = plot_factor_timeseries(_sample_frame(), symbol="000001", title="AlphaTest")
+    paths = save_figs([(fig, tmp_path / "ts.json"), (fig, tmp_path / "sub" / "ts.html")])
+
+    assert paths == [tmp_path / "ts.json", tmp_path / "sub" / "ts.html"]
+    assert json.loads(paths[0].read_text(encoding="utf-8"))["data"][0]["type"] == "scatter"
+    assert paths[1].exists()
+
+
+def _figure_json(fig):
+    import json
+
+    out = json.loads(fig.to_json())
+    out["layout"].pop("template", None)  # 模板在子进程中已展开，内容相同但序列化形式不同
+    return out
+
+
+def test_generate_all_factor_visuals_process_pool_matches_sequential():
+    names = ["AlphaVisualP0", "AlphaVisualP1"]
+    paths = [PARQ_DIR_FACT / f"{name}.parquet" for name in names]
+    for i, path in enumerate(paths):
+        _sample_frame().assign(value=lambda d: d["value"] * (i + 1)).to_parquet(path, index=False)
+
+    try:
+        seq = generate_all_factor_visuals(factors=names, save=False, max_workers=1)
+        par = generate_all_factor_visuals(factors=names, save=False, max_workers=2)
+        assert list(par) == list(seq) == names
+        for name in names:
+            assert par[name].ts_symbol == seq[name].ts_symbol
+            assert par[name].cross_section_dt == seq[name].cross_section_dt
+            for kind, fig in seq[name].outputs.items():
+                assert _figure_json(par[name].outputs[kind]) == _figure_json(fig)
+    finally:
+        for path in paths:
+            if path.exists():
+                path.unlink()
@@ -0,0 +1,43 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from alpha101_factory.utils import io
+
+
+def test_write_parquet_round_trips_in_row_groups(tmp_path, monkeypatch):
+    monkeypatch.setattr(io, "ROW_GROUP_ROWS", 4)
+    df = pd.DataFrame({
+        "datetime": pd.bdate_range("2021-01-01", periods=10),
+        "symbol": pd.Categorical(["600000", "600001"] * 5),
+        "value": np.arange(10, dtype=np.float32),
+    })
+    path = tmp_path / "out" / "f.parquet"
+    io.write_parquet(df, path)
+
+    meta = pq.ParquetFile(path).metadata
+    assert meta.num_row_groups == 3
+    assert meta.row_group(0).column(2).compression == "ZSTD"
+    pd.testing.assert_frame_equal(io.read_parquet(path), df)
+
+
+def test_read_parquet_mmap_matches_read_parquet(tmp_path):
+    df = pd.DataFrame({"symbol": ["600000", "600001"], "close": [1.5, 2.5]})
+    path = tmp_path / "k.parquet"
+    io.write_parquet(df, path)
+    pd.testing.assert_frame_equal(io.read_parquet_mmap(path), io.read_parquet(path))
+    assert io.read_parquet_mmap(tmp_path / "missing.parquet").empty
+
+
+def test_read_parquet_projects_existing_columns(tmp_path):
+    df = pd.DataFrame({"symbol": ["600000"], "close": [1.5], "volume": [10.0]})
+    path = tmp_path / "k.parquet"
+    io.write_parquet(df, path)
+    for read in (io.read_parquet, io.read_parquet_mmap):
+        out = read(path, ["volume", "symbol", "missing"])
+        assert out.columns.tolist() == ["symbol", "volume"]
@@ -16,3 +16,16 @@ def test_resolve_kline_path_without_range(tmp_path, monkeypatch):
     monkeypatch.setattr(loader, "PARQ_DIR_KLINES", tmp_path)
     path = loader._resolve_kline_path("600000", "", None, "qfq")
     assert path == tmp_path / "600000.parquet"
+
+
+def test_scan_symbols_strips_configured_suffix(tmp_path, monkeypatch):
+    from alpha101_factory.pipeline import compute_factor as cf
+
+    monkeypatch.setattr(cf, "START_DATE", "20200101")
+    monkeypatch.setattr(cf, "END_DATE", "20210101")
+    monkeypatch.setattr(cf, "ADJUST", "hfq")
+    for name in ["600000_20200101_20210101_hfq.parquet", "000001_20200101_20210101_hfq.parquet",
+                 "600000.parquet", "notes.txt"]:
+        (tmp_path / name).touch()
+    assert cf._scan_symbols(tmp_path) == {"600000", "000001"}
+    assert cf._scan_symbols(tmp_path / "missing") == set()
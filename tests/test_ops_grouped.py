@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from alpha101_factory.utils import ops
+
+
+def _sample_groups():
+    rng = np.random.default_rng(7)
+    symbols = np.array(["600000"] * 40 + ["000001"] * 3 + ["300750"] * 25)
+    rng.shuffle(symbols)
+    values = rng.normal(size=symbols.size)
+    values[[4, 17]] = np.nan
+    return symbols, values
+
+
+def test_group_layout_keeps_row_order_within_groups():
+    symbols, _ = _sample_groups()
+    order, offsets = ops.group_layout(symbols)
+    assert offsets[0] == 0 and offsets[-1] == symbols.size
+    for s, e in zip(offsets[:-1], offsets[1:]):
+        block = order[s:e]
+        assert len(set(symbols[block])) == 1
+        assert np.all(np.diff(block) > 0)
+
+
+def test_group_layout_accepts_categorical_keys():
+    symbols, _ = _sample_groups()
+    cat = pd.Series(pd.Categorical(symbols, categories=sorted(set(symbols)), ordered=True))
+    for got, want in zip(ops.group_layout(cat), ops.group_layout(symbols)):
+        np.testing.assert_array_equal(got, want)
+
+
+def test_delay_grouped_matches_groupby_shift():
+    symbols, values = _sample_groups()
+    order, offsets = ops.group_layout(symbols)
+    expected = pd.Series(values).groupby(symbols).shift(5).to_numpy()
+    out = np.empty_like(values)
+    out[order] = ops.delay_grouped(values[order], offsets, 5)
+    np.testing.assert_allclose(out, expected, equal_nan=True)
+
+
+def test_sum_pair_corr_grouped_matches_pandas():
+    symbols, values = _sample_groups()
+    order, offsets = ops.group_layout(symbols)
+    x = pd.Series(values)
+    expected = x.groupby(symbols, group_keys=False).apply(
+        lambda s: ops.rolling_corr(ops.rolling_sum(s, 5), ops.rolling_sum(s, 20), 2)
+    ).reindex(x.index).to_numpy()
+    out = np.empty_like(values)
+    out[order] = ops.sum_pair_corr_grouped(values[order], offsets, 5, 20, 2)
+    np.testing.assert_allclose(out, expected, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+def test_precision_context_switches_kernel_dtype():
+    symbols, values = _sample_groups()
+    order, offsets = ops.group_layout(symbols)
+    with ops.precision(np.float32):
+        out = ops.delay_grouped(values[order], offsets, 3)
+        ranked = ops.ts_rank(pd.Series(values), 5)
+    assert out.dtype == np.float32 and ranked.dtype == np.float32
+    assert ops.float_dtype() == np.float64
+    np.testing.assert_allclose(out, ops.delay_grouped(values[order], offsets, 3), rtol=1e-6, equal_nan=True)
+
+
+def test_argmin_grouped_matches_rolling_apply():
+    symbols, values = _sample_groups()
+    values = np.round(values, 1)  # 制造相等值，检查取第一个最小值
+    order, offsets = ops.group_layout(symbols)
+    expected = pd.Series(values).groupby(symbols).transform(
+        lambda s: s.rolling(4, min_periods=4).apply(np.argmin, raw=True)
+    ).to_numpy()
+    out = np.empty_like(values)
+    out[order] = ops.argmin_grouped(values[order], offsets, 4)
+    np.testing.assert_array_equal(out, expected)
+
+
+def test_rolling_grouped_masks_windows_across_blocks():
+    symbols, values = _sample_groups()
+    order, offsets = ops.group_layout(symbols)
+    for fn in (ops.rolling_sum, ops.rolling_max, ops.adv, ops.ts_rank, ops.decay_linear):
+        expected = pd.Series(values).groupby(symbols).transform(lambda s: fn(s, 5)).to_numpy()
+        out = np.empty_like(values)
+        out[order] = ops.grouped_kernel(fn)(values[order], offsets, 5)
+        np.testing.assert_allclose(out, expected, rtol=1e-9, atol=1e-12, equal_nan=True)
+
+
+def test_ts_rank_grouped_large_window_matches_direct_count():
+    symbols, values = _sample_groups()
+    values = np.round(values, 1)  # 制造相等值，检查 <= 计数
+    order, offsets = ops.group_layout(symbols)
+    n = 32  # 走树状数组分支（见 ops_nb.TS_RANK_FENWICK_MIN）
+
+    def direct(s):
+        def last_rank(w):
+            v = w[~np.isnan(w)]
+            return np.sum(v <= w[-1]) / v.size if v.size else np.nan
+        out = s.rolling(n, min_periods=1).apply(last_rank, raw=True)
+        out.iloc[:n - 1] = np.nan  # 窗口按位置计满 n 期，窗口内的 NaN 只是不参与计数
+        return out
+
+    expected = pd.Series(values).groupby(symbols).transform(direct).to_numpy()
+    out = np.empty_like(values)
+    out[order] = ops.grouped_kernel(ops.ts_rank)(values[order], offsets, n)
+    np.testing.assert_allclose(out, expected, rtol=1e-12, equal_nan=True)
+
+
+def test_by_symbol_uses_grouped_kernels():
+    symbols, values = _sample_groups()
+    df = pd.DataFrame({"symbol": symbols, "x": values}, index=np.arange(values.size) * 2)
+    for fn in (ops.rolling_sum, ops.rolling_std, ops.adv, ops.delta):
+        expected = df.groupby("symbol", group_keys=False)["x"].apply(lambda s: fn(s, 3))
+        pd.testing.assert_series_equal(ops.by_symbol(df, "x", fn, 3), expected.reindex(df.index),
+                                       check_names=False, rtol=1e-9)
+
+
+def test_rolling_corr_grouped_matches_pandas():
+    symbols, x = _sample_groups()
+    y = np.cos(np.arange(x.size)) + x * 0.3
+    order, offsets = ops.group_layout(symbols)
+    frame = pd.DataFrame({"x": x, "y": y})
+    expected = frame.groupby(symbols, group_keys=False).apply(
+        lambda d: ops.rolling_corr(d["x"], d["y"], 6)
+    ).reindex(frame.index).to_numpy()
+    out = np.empty_like(x)
+    out[order] = ops.rolling_corr_grouped(x[order], y[order], offsets, 6)
+    np.testing.assert_allclose(out, expected, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+def test_rolling_cov_grouped_matches_pandas():
+    symbols, x = _sample_groups()
+    y = np.sin(np.arange(x.size)) - x * 0.5
+    order, offsets = ops.group_layout(symbols)
+    frame = pd.DataFrame({"x": x, "y": y})
+    expected = frame.groupby(symbols, group_keys=False).apply(
+        lambda d: ops.rolling_cov(d["x"], d["y"], 5)
+    ).reindex(frame.index).to_numpy()
+    out = np.empty_like(x)
+    out[order] = ops.rolling_cov_grouped(x[order], y[order], offsets, 5)
+    np.testing.assert_allclose(out, expected, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+def test_cs_rank_grouped_matches_groupby_rank():
+    dates, values = _sample_groups()
+    values = np.round(values, 1)  # 制造相同值，检查平均名次
+    order, offsets = ops.group_layout(dates)
+    expected = pd.Series(values).groupby(dates).rank(pct=True).to_numpy()
+    out = np.empty_like(values)
+    out[order] = ops.cs_rank_grouped(values[order], offsets)
+    np.testing.assert_allclose(out, expected, equal_nan=True)
+
+
+def test_cs_rank_and_zscore_match_groupby():
+    rng = np.random.default_rng(3)
+    dates = np.repeat(pd.bdate_range("2021-01-01", periods=6), 5)
+    idx = pd.MultiIndex.from_arrays([dates, np.tile(list("abcde"), 6)], names=["datetime", "symbol"])
+    s = pd.Series(np.round(rng.normal(size=30), 1), index=idx, name="x")
+    s.iloc[[3, 7]] = np.nan
+    s.iloc[25:] = 1.0  # 截面内全部相等：标准差为 0
+    g = s.groupby(level=0)
+    pd.testing.assert_series_equal(ops.cs_rank(s), g.rank(pct=True), check_dtype=False)
+    expected = (s - g.transform("mean")) / g.transform("std")
+    np.testing.assert_allclose(ops.cs_zscore(s).to_numpy(), expected.to_numpy(), rtol=1e-9, equal_nan=True)
+
+
+def test_adv_many_matches_rolling_mean():
+    rng = np.random.default_rng(5)
+    vol = pd.Series(rng.uniform(1e5, 1e7, 300))
+    vol.iloc[[17, 150]] = np.nan
+    out = ops.adv_many(vol, [5, 20, 120, 400])
+    for n in (5, 20, 120):
+        expected = vol.rolling(n, min_periods=n).mean()
+        pd.testing.assert_series_equal(out[n], expected, check_names=False, rtol=1e-9)
+    assert out[400].isna().all()
+
+
+def test_sign_delta_sum_grouped_matches_composition():
+    symbols, x = _sample_groups()
+    order, offsets = ops.group_layout(symbols)
+    frame = pd.DataFrame({"x": x})
+    expected = frame.groupby(symbols, group_keys=False)["x"].apply(
+        lambda s: sum(np.sign(ops.delta(ops.delay(s, k), 1)) for k in (1, 2, 3))
+    ).reindex(frame.index).to_numpy()
+    out = np.empty_like(x)
+    out[order] = ops.sign_delta_sum_grouped(x[order], offsets, 3)
+    np.testing.assert_array_equal(out, expected)
+
+
+def test_safe_div_masks_zero_denominators():
+    num = pd.Series([1.0, 2.0, np.nan, 4.0, 5.0])
+    den = pd.Series([2.0, 0.0, 1.0, np.nan, -0.0])
+    expected = (num / den.replace(0, np.nan)).to_numpy()
+    np.testing.assert_array_equal(ops.safe_div(num, den), expected)
+
+
+def test_warmup_kernels_compiles_every_public_kernel():
+    if not ops._NB:
+        assert ops.warmup_kernels((np.float32,)) == 0
+        return
+
+    import numba
+    from numba.core.registry import CPUDispatcher
+    from alpha101_factory.utils import ops_nb
+
+    assert ops.warmup_kernels((np.float32,)) > 0
+    kernels = {name: fn for name, fn in vars(ops_nb).items()
+               if isinstance(fn, CPUDispatcher) and not name.startswith("_")}
+    missing = [name for name, fn in kernels.items()
+               if not any(sig[0].dtype == numba.float32 for sig in fn.signatures)]
+    assert not missing, f"warmup 未覆盖的内核: {missing}"
+
+    # 预热之后的正式调用不应再触发编译
+    before = len(ops_nb.rolling_sum.signatures)
+    x = np.arange(10, dtype=np.float32)
+    ops_nb.rolling_sum(x, np.array([0, 10], dtype=np.int64), 3, np.empty_like(x))
+    assert len(ops_nb.rolling_sum.signatures) == before
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from alpha101_factory.factors.alphas_basic import _g
+from alpha101_factory.factors.base import Factor, Panel
+from alpha101_factory.utils import ops
+
+
+def _sample_panel():
+    rng = np.random.default_rng(3)
+    dates = pd.bdate_range("2021-01-01", periods=30)
+    frames = []
+    for sym in ["600000", "000001", "300750"]:
+        frames.append(pd.DataFrame({
+            "datetime": dates,
+            "symbol": sym,
+            "close": 10 + rng.normal(size=dates.size).cumsum(),
+        }))
+    df = pd.concat(frames, ignore_index=True)
+    # 去掉部分行，模拟停牌
+    df = df.drop(index=[5, 40, 41])
+    return df.sort_values(["datetime", "symbol"]).reset_index(drop=True)
+
+
+def test_panel_is_cached_per_frame():
+    df = _sample_panel()
+    panel = Panel.of(df)
+    assert Panel.of(df) is panel
+    assert Panel.of(df.copy()) is not panel
+    np.testing.assert_array_equal(panel.to_native(panel.col("close")), df["close"].to_numpy())
+
+
+def test_g_matches_groupby_apply():
+    df = _sample_panel()
+    expected = df.groupby("symbol", group_keys=False)["close"].apply(lambda s: ops.rolling_sum(s, 5))
+    out = _g(df, "close", lambda s: ops.rolling_sum(s, 5))
+    assert out.index.equals(df.index)
+    pd.testing.assert_series_equal(out, expected.reindex(df.index), check_names=False)
+
+
+def test_panel_ts_memoizes_column_results():
+    df = _sample_panel()
+    panel = Panel.of(df)
+    kernel = ops.grouped_kernel(ops.rolling_sum)
+    first = panel.ts("close", kernel, 5)
+    assert panel.ts("close", kernel, 5) is first
+    assert not first.flags.writeable
+    expected = df.groupby("symbol")["close"].transform(lambda s: ops.rolling_sum(s, 5))
+    np.testing.assert_allclose(panel.to_native(first), expected.to_numpy(), equal_nan=True)
+
+
+def test_as_cs_series_reuses_panel_index():
+    df = _sample_panel()
+    a = Factor.as_cs_series(df, df["close"])
+    b = Factor.as_cs_series(df, df["close"] * 2)
+    assert a.index is b.index
+    expected = pd.MultiIndex.from_frame(df[["datetime", "symbol"]])
+    assert a.index.equals(expected)
+    np.testing.assert_array_equal(a.to_numpy(), df["close"].to_numpy())
+
+
+def test_prewarm_panel_feeds_get_delay():
+    from alpha101_factory.factors.base import prewarm_panel
+
+    class _Lagged(Factor):
+        delays = [("close", 2), ("missing", 1)]
+
+        def compute(self, df):
+            return self.as_cs_series(df, self.get_delay(df, "close", 2))
+
+    df = _sample_panel()
+    assert prewarm_panel(df, [_Lagged]) == 1
+    panel = Panel.of(df)
+    with ops.precision(np.float32):
+        cached = panel.ts("close", ops.delay_grouped, 2)
+        out = _Lagged().compute(df)
+    expected = df.groupby("symbol")["close"].shift(2)
+    np.testing.assert_allclose(out.to_numpy(), expected.to_numpy(), rtol=1e-6, equal_nan=True)
+    assert len(panel._memo) == 1 and next(iter(panel._memo.values())) is cached
+
+
+def test_prewarm_panel_memoizes_column_ranks():
+    from alpha101_factory.factors.base import prewarm_panel
+
+    class _Ranked(Factor):
+        ranks = ["close"]
+
+    df = _sample_panel()
+    assert prewarm_panel(df, [_Ranked]) == 1
+    panel = Panel.of(df)
+    with ops.precision(np.float32):
+        cached = panel.cs("close", ops.cs_rank_grouped)
+        assert panel.cs("close", ops.cs_rank_grouped) is cached
+    expected = df.groupby("datetime")["close"].rank(pct=True)
+    np.testing.assert_allclose(cached, expected.to_numpy(), rtol=1e-6)
+    assert len(panel._memo) == 1
+
+
+def test_prewarm_panel_shares_common_subexpressions():
+    from alpha101_factory.factors.base import prewarm_panel
+
+    class _A(Factor):
+        common = [("close", ops.delta, 1), ("missing", ops.delta, 1)]
+
+    class _B(Factor):
+        common = [("close", ops.delta, 1), ("close", ops.rolling_sum, 3)]
+
+    df = _sample_panel()
+    assert prewarm_panel(df, [_A, _B]) == 2
+    panel = Panel.of(df)
+    with ops.precision(np.float32):
+        cached = panel.ts("close", ops.grouped_kernel(ops.delta), 1)
+    expected = df.groupby("symbol")["close"].diff(1)
+    np.testing.assert_allclose(panel.series(cached).to_numpy(), expected.to_numpy(), rtol=1e-5, equal_nan=True)
+    assert len(panel._memo) == 2
+
+
+def test_row_alignment_on_filtered_frame_without_reset():
+    from alpha101_factory.factors.alphas_basic import Alpha009
+
+    full = _sample_panel()
+    df = full[full["symbol"] != "600000"]  # 不 reset_index：索引不再是 0..n-1
+    reset = df.reset_index(drop=True)
+    values = np.arange(len(df), dtype=float)
+
+    # 默认 RangeIndex 的 Series 按位置对齐
+    positional = Factor.as_cs_series(df, pd.Series(values))
+    np.testing.assert_array_equal(positional.to_numpy(), values)
+    panel = Panel.of(df)
+    np.testing.assert_array_equal(panel.take(pd.Series(values)), values[panel.order])
+
+    # 按 symbol 分组拼接（索引为 df 标签的排列）的 Series 按标签对齐
+    grouped = pd.Series(values, index=df.index).sort_index(ascending=False)
+    np.testing.assert_array_equal(Factor.as_cs_series(df, grouped).to_numpy(), values)
+    np.testing.assert_array_equal(panel.cs(grouped, ops.cs_rank_grouped),
+                                  panel.cs(pd.Series(values, index=df.index), ops.cs_rank_grouped))
+
+    a = Alpha009().compute(df)
+    b = Alpha009().compute(reset)
+    np.testing.assert_allclose(a.to_numpy(dtype=float), b.to_numpy(dtype=float), equal_nan=True)
+
+
+def test_alpha010_matches_pandas_reference():
+    from alpha101_factory.factors.alphas_basic import Alpha010
+
+    df = _sample_panel()
+    d1 = df.groupby("symbol")["close"].diff(1)
+    lo = d1.groupby(df["symbol"]).transform(lambda s: s.rolling(4).min())
+    hi = d1.groupby(df["symbol"]).transform(lambda s: s.rolling(4).max())
+    raw = pd.Series(np.where(lo > 0, d1, np.where(hi < 0, d1, -d1)), index=df.index)
+    expected = raw.groupby(df["datetime"]).rank(pct=True)
+    out = Alpha010().compute(df)
+    np.testing.assert_allclose(out.to_numpy(dtype=float), expected.to_numpy(), rtol=1e-5, equal_nan=True)
+
+
+def test_alpha020_ranks_within_each_date():
+    from alpha101_factory.factors.alphas_basic import Alpha020
+
+    df = _sample_panel()
+    df = df.assign(open=df["close"] * 1.01, high=df["close"] * 1.02, low=df["close"] * 0.98)
+    g = df.groupby("symbol")
+
+    def rank(x):
+        return x.groupby(df["datetime"]).rank(pct=True)
+
+    expected = (-rank(df["open"] - g["high"].shift(1)) * rank(df["open"] - g["close"].shift(1))
+                * rank(df["open"] - g["low"].shift(1)))
+    out = Alpha020().compute(df)
+    np.testing.assert_allclose(out.to_numpy(dtype=float), expected.to_numpy(), rtol=1e-5, equal_nan=True)
+    assert out.nunique() > 1
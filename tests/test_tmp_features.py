@@ -0,0 +1,30 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from alpha101_factory.factors import tmp_features
+
+
+def _write_tmp(tmp_path, sym, dates, close):
+    df = pd.DataFrame({"symbol": sym, "datetime": dates, "close": close,
+                       "adv20": np.arange(dates.size, dtype=np.float64)})
+    df.to_parquet(tmp_features._tmp_path(sym), index=False)
+
+
+def test_load_panel_sorts_and_projects(tmp_path, monkeypatch):
+    monkeypatch.setattr(tmp_features, "PARQ_DIR_TMP", tmp_path)
+    dates = pd.bdate_range("2021-01-01", periods=4)
+    _write_tmp(tmp_path, "600001", dates, [1.0, 2.0, 3.0, 4.0])
+    _write_tmp(tmp_path, "600000", dates[1:], [5.0, 6.0, 7.0])
+
+    df = tmp_features.load_panel(["600001", "600000", "missing"], columns=["adv20"])
+    assert df.columns.tolist() == ["datetime", "symbol", "adv20"]
+    assert df["adv20"].dtype == np.float32
+    assert df["symbol"].cat.categories.tolist() == ["600000", "600001"]
+    expected = df.sort_values(["datetime", "symbol"]).reset_index(drop=True)
+    pd.testing.assert_frame_equal(df, expected)
+    assert df["symbol"].tolist()[:3] == ["600001", "600000", "600001"]